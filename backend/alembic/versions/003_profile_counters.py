@@ -0,0 +1,32 @@
+"""
+backend/alembic/versions/003_profile_counters.py
+Alembic migration — denormalized follower / following / post counters on forum_users.
+Run: alembic upgrade head
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision      = "003_profile_counters"
+down_revision = "002_forum_news"
+branch_labels = None
+depends_on    = None
+
+
+def upgrade():
+    for col in ("followers_count", "following_count", "posts_count"):
+        op.add_column("forum_users", sa.Column(col, sa.Integer, nullable=False, server_default="0"))
+
+    # ── Backfill from the source tables ───────────────────────────────────
+    op.execute("""
+        UPDATE forum_users u SET
+            followers_count = (SELECT count(*) FROM user_follows f WHERE f.following_id = u.id),
+            following_count = (SELECT count(*) FROM user_follows f WHERE f.follower_id  = u.id),
+            posts_count     = (SELECT count(*) FROM forum_posts p
+                               WHERE p.author_id = u.id AND p.is_published AND NOT p.is_deleted)
+    """)
+
+
+def downgrade():
+    op.drop_column("forum_users", "posts_count")
+    op.drop_column("forum_users", "following_count")
+    op.drop_column("forum_users", "followers_count")
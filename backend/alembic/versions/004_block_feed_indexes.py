@@ -0,0 +1,22 @@
+"""
+backend/alembic/versions/004_block_feed_indexes.py
+Alembic migration — indexes backing the feed's block-list filter.
+Run: alembic upgrade head
+"""
+from alembic import op
+
+revision      = "004_block_feed_indexes"
+down_revision = "003_profile_counters"
+branch_labels = None
+depends_on    = None
+
+
+def upgrade():
+    # user_blocks PK covers (blocker_id, …); this serves the "who blocked me" side
+    op.create_index("ix_user_blocks_blocked_id", "user_blocks", ["blocked_id"])
+    op.create_index("ix_forum_posts_author_id", "forum_posts", ["author_id"])
+
+
+def downgrade():
+    op.drop_index("ix_forum_posts_author_id", "forum_posts")
+    op.drop_index("ix_user_blocks_blocked_id", "user_blocks")
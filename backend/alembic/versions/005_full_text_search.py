@@ -0,0 +1,31 @@
+"""
+backend/alembic/versions/005_full_text_search.py
+Alembic migration — weighted full-text search columns + GIN indexes
+on forum_posts and news_articles (see app/forum/search.py).
+Run: alembic upgrade head
+"""
+from alembic import op
+
+from app.forum.search import weighted_tsvector
+
+revision      = "005_full_text_search"
+down_revision = "004_block_feed_indexes"
+branch_labels = None
+depends_on    = None
+
+
+def upgrade():
+    for table in ("forum_posts", "news_articles"):
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({weighted_tsvector('title', 'body')}) STORED"
+        )
+    op.create_index("ix_forum_posts_search",   "forum_posts",   ["search_vector"], postgresql_using="gin")
+    op.create_index("ix_news_articles_search", "news_articles", ["search_vector"], postgresql_using="gin")
+
+
+def downgrade():
+    op.drop_index("ix_news_articles_search", "news_articles")
+    op.drop_index("ix_forum_posts_search",   "forum_posts")
+    op.drop_column("news_articles", "search_vector")
+    op.drop_column("forum_posts",   "search_vector")
@@ -0,0 +1,25 @@
+"""
+backend/alembic/versions/006_user_trigram_search.py
+Alembic migration — pg_trgm GIN indexes and prefix indexes for user search
+and typeahead (see app/forum/search.py).
+Run: alembic upgrade head
+"""
+from alembic import op
+
+from app.forum.search import USER_SEARCH_INDEXES
+
+revision      = "006_user_trigram_search"
+down_revision = "005_full_text_search"
+branch_labels = None
+depends_on    = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for _, ddl in USER_SEARCH_INDEXES:
+        op.execute(ddl)
+
+
+def downgrade():
+    for name, _ in reversed(USER_SEARCH_INDEXES):
+        op.drop_index(name, "forum_users")
@@ -0,0 +1,20 @@
+"""
+backend/alembic/versions/007_governorate_index.py
+Alembic migration — index on forum_users.governorate for the news
+notification fan-out.
+Run: alembic upgrade head
+"""
+from alembic import op
+
+revision      = "007_governorate_index"
+down_revision = "006_user_trigram_search"
+branch_labels = None
+depends_on    = None
+
+
+def upgrade():
+    op.create_index("ix_forum_users_governorate", "forum_users", ["governorate"])
+
+
+def downgrade():
+    op.drop_index("ix_forum_users_governorate", "forum_users")
@@ -0,0 +1,48 @@
+"""
+backend/alembic/versions/008_sync_change_feed.py
+Alembic migration — change stamps, tombstones and triggers behind the
+/api/forum/sync delta feed (see app/forum/sync.py).
+Run: alembic upgrade head
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from app.forum.sync import SYNC_DDL, TRACKED_TABLES
+
+revision      = "008_sync_change_feed"
+down_revision = "007_governorate_index"
+branch_labels = None
+depends_on    = None
+
+
+def upgrade():
+    op.create_table(
+        "sync_tombstones",
+        sa.Column("change_seq", sa.BigInteger, primary_key=True, autoincrement=False),
+        sa.Column("change_xid", sa.BigInteger, nullable=False),
+        sa.Column("table_name", sa.String(50), nullable=False),
+        sa.Column("row_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("owner_ids", postgresql.ARRAY(postgresql.UUID(as_uuid=True))),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_sync_tombstones_change", "sync_tombstones", ["change_xid", "change_seq"])
+    for ddl in SYNC_DDL:   # sequence, trigger functions, change_* columns, triggers
+        op.execute(ddl)
+    for table in ("forum_posts", "forum_comments", "news_articles"):
+        op.create_index(f"ix_{table}_change", table, ["change_xid", "change_seq"])
+    op.create_index("ix_notifications_user_change", "notifications", ["user_id", "change_xid", "change_seq"])
+    op.create_index("ix_messages_sender_change", "messages", ["sender_id", "change_xid", "change_seq"])
+    op.create_index("ix_messages_receiver_change", "messages", ["receiver_id", "change_xid", "change_seq"])
+
+
+def downgrade():
+    for table in TRACKED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_sync_stamp ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_sync_tombstone ON {table}")
+        op.drop_column(table, "change_seq")   # drops the change indexes with it
+        op.drop_column(table, "change_xid")
+    op.execute("DROP FUNCTION IF EXISTS sync_stamp()")
+    op.execute("DROP FUNCTION IF EXISTS sync_tombstone()")
+    op.execute("DROP SEQUENCE IF EXISTS sync_change_seq")
+    op.drop_table("sync_tombstones")
@@ -0,0 +1,25 @@
+"""
+backend/alembic/versions/009_notification_coalescing.py
+Alembic migration — group_key / group_count on notifications so repeated
+events on the same target update one row (see app/forum/notifications.py).
+Run: alembic upgrade head
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision      = "009_notification_coalescing"
+down_revision = "008_sync_change_feed"
+branch_labels = None
+depends_on    = None
+
+
+def upgrade():
+    op.add_column("notifications", sa.Column("group_key", sa.String(120)))
+    op.add_column("notifications", sa.Column("group_count", sa.Integer, nullable=False, server_default="1"))
+    op.create_index("uq_notifications_user_group", "notifications", ["user_id", "group_key"], unique=True)
+
+
+def downgrade():
+    op.drop_index("uq_notifications_user_group", "notifications")
+    op.drop_column("notifications", "group_count")
+    op.drop_column("notifications", "group_key")
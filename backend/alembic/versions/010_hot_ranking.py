@@ -0,0 +1,37 @@
+"""
+backend/alembic/versions/010_hot_ranking.py
+Alembic migration — stored hot_score column on forum_posts plus the partial
+index the hot feed scans (see app/forum/ranking.py). Also backfills
+comments_count, which nothing maintained before.
+Run: alembic upgrade head
+"""
+from alembic import op
+
+from app.forum.ranking import hot_score_expression
+
+revision      = "010_hot_ranking"
+down_revision = "009_notification_coalescing"
+branch_labels = None
+depends_on    = None
+
+
+def upgrade():
+    op.execute(
+        "UPDATE forum_posts AS p SET comments_count = c.n "
+        "FROM (SELECT post_id, count(*) AS n FROM forum_comments "
+        "      WHERE NOT is_deleted GROUP BY post_id) AS c "
+        "WHERE p.id = c.post_id"
+    )
+    op.execute(
+        f"ALTER TABLE forum_posts ADD COLUMN hot_score double precision "
+        f"GENERATED ALWAYS AS ({hot_score_expression()}) STORED"
+    )
+    op.execute(
+        "CREATE INDEX ix_forum_posts_hot ON forum_posts (hot_score DESC) "
+        "WHERE is_published = true AND is_deleted = false"
+    )
+
+
+def downgrade():
+    op.drop_index("ix_forum_posts_hot", "forum_posts")
+    op.drop_column("forum_posts", "hot_score")
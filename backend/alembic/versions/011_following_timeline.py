@@ -0,0 +1,36 @@
+"""
+backend/alembic/versions/011_following_timeline.py
+Alembic migration — timeline_entries for the fan-out-on-write "following"
+feed, the (author_id, created_at) index its pull path reads, and an initial
+fill from the existing follows (see app/forum/timeline.py).
+Run: alembic upgrade head
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.forum.timeline import SEED_SQL
+
+revision      = "011_following_timeline"
+down_revision = "010_hot_ranking"
+branch_labels = None
+depends_on    = None
+
+
+def upgrade():
+    op.create_table(
+        "timeline_entries",
+        sa.Column("user_id",    UUID(as_uuid=True), sa.ForeignKey("forum_users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("post_id",    UUID(as_uuid=True), sa.ForeignKey("forum_posts.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("author_id",  UUID(as_uuid=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.execute("CREATE INDEX ix_timeline_entries_page ON timeline_entries (user_id, created_at DESC, post_id DESC)")
+    op.create_index("ix_timeline_entries_post", "timeline_entries", ["post_id"])
+    op.create_index("ix_forum_posts_author_created", "forum_posts", ["author_id", "created_at"])
+    op.execute(SEED_SQL)
+
+
+def downgrade():
+    op.drop_index("ix_forum_posts_author_created", "forum_posts")
+    op.drop_table("timeline_entries")
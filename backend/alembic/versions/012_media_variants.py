@@ -0,0 +1,23 @@
+"""
+backend/alembic/versions/012_media_variants.py
+Alembic migration — post_media.variants, the resized WebP / JPEG renditions
+generated for image attachments (see app/forum/imaging.py). Existing rows
+stay NULL until scripts/generate_media_variants.py is run.
+Run: alembic upgrade head
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision      = "012_media_variants"
+down_revision = "011_following_timeline"
+branch_labels = None
+depends_on    = None
+
+
+def upgrade():
+    op.add_column("post_media", sa.Column("variants", JSONB))
+
+
+def downgrade():
+    op.drop_column("post_media", "variants")
@@ -0,0 +1,47 @@
+"""
+backend/alembic/versions/013_hot_query_indexes.py
+Alembic migration — composite and partial indexes for the hot forum and
+news queries: the "new" feed (and its governorate filter), comment threads,
+the profile activity timeline, notification lists, direct message
+conversations and news by region / date.
+forum_users.governorate is already indexed (007_governorate_index).
+
+Built CONCURRENTLY so the tables stay writable while it runs; a failed run
+can leave an INVALID index behind, which IF NOT EXISTS would then skip —
+drop it and re-run. scripts/check_query_plans.py verifies the plans.
+Run: alembic upgrade head
+"""
+from alembic import op
+
+revision      = "013_hot_query_indexes"
+down_revision = "012_media_variants"
+branch_labels = None
+depends_on    = None
+
+_LIVE_POST = "WHERE is_published = true AND is_deleted = false"
+
+INDEXES = [
+    ("ix_forum_posts_feed_new",          "forum_posts (created_at DESC, id) " + _LIVE_POST),
+    ("ix_forum_posts_feed_governorate",  "forum_posts (governorate, created_at DESC, id) " + _LIVE_POST),
+    ("ix_forum_comments_post_created",   "forum_comments (post_id, created_at) WHERE is_deleted = false"),
+    ("ix_forum_comments_author_created", "forum_comments (author_id, created_at, id) WHERE is_deleted = false"),
+    ("ix_post_likes_user_created",       "post_likes (user_id, created_at, post_id)"),
+    ("ix_post_shares_user_created",      "post_shares (user_id, created_at, post_id)"),
+    ("ix_notifications_user_created",    "notifications (user_id, created_at DESC)"),
+    ("ix_notifications_user_unread",     "notifications (user_id, created_at DESC) WHERE is_read = false"),
+    ("ix_messages_conversation",         "messages (sender_id, receiver_id, created_at)"),
+    ("ix_news_articles_published_at",    "news_articles (published_at)"),
+    ("ix_news_articles_governorates",    "news_articles USING gin (governorates)"),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,62 @@
+"""
+backend/alembic/versions/014_partition_notifications.py
+Alembic migration — rebuild notifications as a table partitioned by month on
+created_at (see app/forum/partitions.py), so old months are dropped whole
+instead of deleted row by row.
+
+The primary key becomes (id, created_at) and the (user_id, group_key) unique
+index becomes a plain one: a unique index on a partitioned table has to
+include the partition key. Coalescing serializes on an advisory lock instead
+(app/forum/notifications.py).
+
+The rows are copied inside the migration's transaction and notifications is
+locked until it commits: run it in a quiet window.
+Run: alembic upgrade head (or, without alembic: python -m scripts.partition_notifications)
+"""
+from alembic import op
+from sqlalchemy import text
+
+from app.forum.partitions import NOTIFICATION_FOREIGN_KEYS, NOTIFICATION_INDEXES, convert_notifications
+from app.forum.sync import SYNC_DDL
+
+revision      = "014_partition_notifications"
+down_revision = "013_hot_query_indexes"
+branch_labels = None
+depends_on    = None
+
+# The notifications entries of SYNC_DDL (the triggers went with the old table)
+SYNC_TRIGGERS = [ddl for ddl in SYNC_DDL if "TRIGGER notifications_" in ddl]
+
+
+def upgrade():
+    # Shared with scripts/partition_notifications.py, the path for databases set up without alembic
+    convert_notifications(op.get_bind())
+
+
+def downgrade():
+    conn = op.get_bind()
+    # Coalescing without the unique index may have left duplicate open groups: keep the newest
+    conn.execute(text(
+        "UPDATE notifications n SET group_key = NULL FROM ("
+        "  SELECT id, row_number() OVER (PARTITION BY user_id, group_key ORDER BY created_at DESC) AS rank"
+        "  FROM notifications WHERE group_key IS NOT NULL"
+        ") d WHERE n.id = d.id AND d.rank > 1"
+    ))
+    op.execute("ALTER TABLE notifications RENAME TO notifications_old")
+    op.execute("CREATE TABLE notifications (LIKE notifications_old INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    op.execute("INSERT INTO notifications SELECT * FROM notifications_old")
+    op.execute("ALTER TABLE notifications ALTER COLUMN created_at DROP NOT NULL")
+    op.execute("DROP TABLE notifications_old")
+    op.execute("ALTER TABLE notifications ADD CONSTRAINT notifications_pkey PRIMARY KEY (id)")
+    for name, column, target, on_delete in NOTIFICATION_FOREIGN_KEYS:
+        op.execute(
+            f"ALTER TABLE notifications ADD CONSTRAINT {name} FOREIGN KEY ({column}) "
+            f"REFERENCES {target} (id) ON DELETE {on_delete}"
+        )
+    for name, definition in NOTIFICATION_INDEXES:
+        if name == "ix_notifications_user_group":
+            op.execute(f"CREATE UNIQUE INDEX uq_notifications_user_group ON notifications {definition}")
+        else:
+            op.execute(f"CREATE INDEX {name} ON notifications {definition}")
+    for ddl in SYNC_TRIGGERS:
+        op.execute(ddl)
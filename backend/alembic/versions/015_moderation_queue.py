@@ -0,0 +1,38 @@
+"""
+backend/alembic/versions/015_moderation_queue.py
+Alembic migration — moderation_jobs, the queue posts wait in for their AI
+moderation verdict (see app/forum/moderation_queue.py).
+Run: alembic upgrade head
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import UUID
+
+revision      = "015_moderation_queue"
+down_revision = "014_partition_notifications"
+branch_labels = None
+depends_on    = None
+
+
+def upgrade():
+    op.create_table(
+        "moderation_jobs",
+        sa.Column("id",           sa.BigInteger, primary_key=True, autoincrement=True),
+        sa.Column("post_id",      UUID(as_uuid=True), sa.ForeignKey("forum_posts.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("status",       sa.String(20), nullable=False, server_default="pending"),
+        sa.Column("attempts",     sa.Integer, nullable=False, server_default="0"),
+        sa.Column("available_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("locked_at",    sa.DateTime(timezone=True)),
+        sa.Column("last_error",   sa.Text),
+        sa.Column("created_at",   sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_moderation_jobs_ready", "moderation_jobs", ["available_at"],
+                    postgresql_where=sa.text("status = 'pending'"))
+    op.create_index("ix_moderation_jobs_running", "moderation_jobs", ["locked_at"],
+                    postgresql_where=sa.text("status = 'running'"))
+    op.create_index("uq_moderation_jobs_pending_post", "moderation_jobs", ["post_id"], unique=True,
+                    postgresql_where=sa.text("status = 'pending'"))
+
+
+def downgrade():
+    op.drop_table("moderation_jobs")
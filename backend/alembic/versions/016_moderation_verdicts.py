@@ -0,0 +1,38 @@
+"""
+backend/alembic/versions/016_moderation_verdicts.py
+Alembic migration — moderation_verdicts, AI moderation results remembered by
+normalized-content hash and model/prompt key, with SimHash bands for the
+near-duplicate lookup (see app/forum/moderation_cache.py).
+Run: alembic upgrade head
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import ARRAY
+
+revision      = "016_moderation_verdicts"
+down_revision = "015_moderation_queue"
+branch_labels = None
+depends_on    = None
+
+
+def upgrade():
+    op.create_table(
+        "moderation_verdicts",
+        sa.Column("content_hash",  sa.String(64), primary_key=True),
+        sa.Column("model_key",     sa.String(120), primary_key=True),
+        sa.Column("approved",      sa.Boolean, nullable=False),
+        sa.Column("reason",        sa.Text),
+        sa.Column("confidence",    sa.String(10)),
+        sa.Column("simhash",       sa.BigInteger),
+        sa.Column("simhash_bands", ARRAY(sa.Integer)),
+        sa.Column("hits",          sa.Integer, nullable=False, server_default="0"),
+        sa.Column("created_at",    sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("last_used_at",  sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_moderation_verdicts_bands", "moderation_verdicts", ["simhash_bands"],
+                    postgresql_using="gin", postgresql_where=sa.text("approved = false"))
+    op.create_index("ix_moderation_verdicts_last_used", "moderation_verdicts", ["last_used_at"])
+
+
+def downgrade():
+    op.drop_table("moderation_verdicts")
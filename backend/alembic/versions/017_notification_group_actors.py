@@ -0,0 +1,22 @@
+"""
+backend/alembic/versions/017_notification_group_actors.py
+Alembic migration — group_actor_ids on notifications, so a coalesced row
+counts each actor once (see app/forum/notifications.py).
+Run: alembic upgrade head
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+
+revision      = "017_notification_group_actors"
+down_revision = "016_moderation_verdicts"
+branch_labels = None
+depends_on    = None
+
+
+def upgrade():
+    op.add_column("notifications", sa.Column("group_actor_ids", ARRAY(UUID(as_uuid=True))))
+
+
+def downgrade():
+    op.drop_column("notifications", "group_actor_ids")
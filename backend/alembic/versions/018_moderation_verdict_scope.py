@@ -0,0 +1,25 @@
+"""
+backend/alembic/versions/018_moderation_verdict_scope.py
+Alembic migration — content_type and category on moderation_verdicts, so a
+near-duplicate rejection is only reused for the same kind of content in the
+same category (see app/forum/moderation_cache.py). Older rows keep NULLs and
+are still matched exactly, never approximately.
+Run: alembic upgrade head
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision      = "018_moderation_verdict_scope"
+down_revision = "017_notification_group_actors"
+branch_labels = None
+depends_on    = None
+
+
+def upgrade():
+    op.add_column("moderation_verdicts", sa.Column("content_type", sa.String(10)))
+    op.add_column("moderation_verdicts", sa.Column("category", sa.String(50)))
+
+
+def downgrade():
+    op.drop_column("moderation_verdicts", "category")
+    op.drop_column("moderation_verdicts", "content_type")
@@ -0,0 +1,27 @@
+"""
+backend/alembic/versions/019_spent_stream_tickets.py
+Alembic migration — spent_stream_tickets, the /events tickets already redeemed,
+so a ticket opens one stream across all workers (see app/forum/auth.py). Rows
+are pruned once the ticket has expired.
+Run: alembic upgrade head
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision      = "019_spent_stream_tickets"
+down_revision = "018_moderation_verdict_scope"
+branch_labels = None
+depends_on    = None
+
+
+def upgrade():
+    op.create_table(
+        "spent_stream_tickets",
+        sa.Column("jti",        sa.String(32), primary_key=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_spent_stream_tickets_expires_at", "spent_stream_tickets", ["expires_at"])
+
+
+def downgrade():
+    op.drop_table("spent_stream_tickets")
@@ -1,12 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import func, desc
-from app.database import SessionLocal
+from app.database import SessionLocal, pool_metrics
 from app.models.user import User
 from app.forum.models import (
     ForumPost, ForumComment, PostReport, CommentReport,
     UserReport, ForumUser, Notification, NewsArticle, Message, PriorityFeedback
 )
+from app.forum.auth import forget_principal
+from app.forum.cache import principals
+from app.forum import moderation_cache, moderation_queue, timeline
+from app.forum.crud import adjust_user_counters
+from app.forum.realtime import publish_invalidation
 from app.models.ml_model import MLModel
+from app.utils import password_hashing
 from app.admin.priority import classify_priority, classify_reports_bulk, evaluate_model, test_custom_text, retrain_model
 from datetime import datetime, timedelta
 import json
@@ -36,27 +43,36 @@ class PriorityFeedbackInput(BaseModel):
 
 router = APIRouter()
 
+def _load_admin(email: str):
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == email).first()
+    finally:
+        db.close()
+    if user is not None:
+        principals.set(f"admin:{email}", user)
+    return user
+
 async def require_admin(request: Request):
     token = request.session.get('token')
     if not token:
         raise HTTPException(401, "Not authenticated")
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get('sub')
-        if not email:
-            raise HTTPException(401, "Invalid token")
-        db = SessionLocal()
-        try:
-            user = db.query(User).filter(User.email == email).first()
-            if not user or not user.is_admin:
-                raise HTTPException(403, "Not authorized")
-            return user
-        finally:
-            db.close()
     except jwt.ExpiredSignatureError:
         raise HTTPException(401, "Session expired")
     except jwt.InvalidTokenError:
         raise HTTPException(401, "Invalid token")
+    email = payload.get('sub')
+    if not email:
+        raise HTTPException(401, "Invalid token")
+    # Cached for a few seconds (forum/cache.py); forget_principal(db, "admin:<email>") drops it
+    user = principals.get(f"admin:{email}")
+    if user is None:
+        user = await run_in_threadpool(_load_admin, email)
+    if not user or not user.is_admin:
+        raise HTTPException(403, "Not authorized")
+    return user
 
 SUPERSET_BASE = os.getenv("SUPERSET_BASE", "http://superset:8088")
 SUPERSET_LOGIN = os.getenv("SUPERSET_LOGIN_USER", "admin")
@@ -206,7 +222,8 @@ def get_stats():
         )
 
         ai_approved = db.query(ForumPost).filter(ForumPost.ai_approved == True, ForumPost.is_deleted == False).count()
-        ai_rejected = db.query(ForumPost).filter(ForumPost.ai_approved == False, ForumPost.is_deleted == False).count()
+        ai_rejected = db.query(ForumPost).filter(ForumPost.ai_approved == False, ForumPost.ai_checked_at != None,
+                                                 ForumPost.is_deleted == False).count()
 
         top_governorates = (
             db.query(ForumPost.governorate, func.count(ForumPost.id))
@@ -238,6 +255,30 @@ def get_stats():
     finally:
         db.close()
 
+@router.get("/db-pool")
+def db_pool(_=Depends(require_admin)):
+    """Connection pool usage and checkout waits for this worker (sync and async engines)."""
+    return pool_metrics()
+
+@router.get("/password-hashing")
+def password_hashing_metrics(_=Depends(require_admin)):
+    """Hashing pool queue depth, 503s shed, queue wait and bcrypt time for this worker."""
+    return password_hashing.stats.snapshot()
+
+@router.get("/moderation-queue")
+def moderation_queue_metrics(_=Depends(require_admin)):
+    """Posts waiting for AI moderation (all workers) and this worker's outcomes and model latency."""
+    db = SessionLocal()
+    try:
+        return {**moderation_queue.depth(db), **moderation_queue.stats.snapshot()}
+    finally:
+        db.close()
+
+@router.get("/moderation-cache")
+def moderation_cache_metrics(_=Depends(require_admin)):
+    """Where this worker's AI moderation verdicts came from: memory, stored, near-duplicate or the model."""
+    return moderation_cache.stats.snapshot()
+
 @router.get("/stats")
 def dashboard_stats(_=Depends(require_admin)):
     return get_stats()
@@ -308,6 +349,7 @@ def toggle_ban(user_id: str, _=Depends(require_admin)):
         if not user:
             raise HTTPException(404, "User not found")
         user.is_banned = not user.is_banned
+        forget_principal(db, user.id)
         db.commit()
         return {"success": True, "is_banned": user.is_banned}
     except Exception as e:
@@ -325,6 +367,14 @@ def toggle_approve(post_id: str, _=Depends(require_admin)):
             raise HTTPException(404, "Post not found")
         post.is_published = not post.is_published
         post.ai_approved = post.is_published
+        if not post.is_deleted:
+            adjust_user_counters(db, post.author_id, posts=+1 if post.is_published else -1)
+            db.flush()
+            if post.is_published:
+                timeline.fan_out(db, post.id)
+            else:
+                timeline.remove_post(db, post.id)
+            publish_invalidation(db, "forum")
         db.commit()
         return {"success": True, "is_published": post.is_published}
     except Exception as e:
@@ -340,7 +390,11 @@ def soft_delete_post(post_id: str, _=Depends(require_admin)):
         post = db.query(ForumPost).filter(ForumPost.id == post_id).first()
         if not post:
             raise HTTPException(404, "Post not found")
+        if post.is_published and not post.is_deleted:
+            adjust_user_counters(db, post.author_id, posts=-1)
+            publish_invalidation(db, "forum")
         post.is_deleted = True
+        timeline.remove_post(db, post.id)
         db.commit()
         return {"success": True}
     except Exception as e:
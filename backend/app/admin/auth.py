@@ -2,14 +2,14 @@
 from fastapi import Request
 from app.models.user import User
 from app.database import SessionLocal
-from passlib.context import CryptContext
+from app.utils import password_hashing
+from app.utils.password_hashing import users_context
 import jwt
 from datetime import datetime, timedelta
 import os
 
 SECRET_KEY = os.getenv('FORUM_SECRET_KEY', 'weatherguardtn-admin-secret-2026')
 ALGORITHM = 'HS256'
-pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
 
 class AdminAuth(AuthenticationBackend):
     async def login(self, request: Request) -> bool:
@@ -23,12 +23,14 @@ class AdminAuth(AuthenticationBackend):
         db = SessionLocal()
         try:
             user = db.query(User).filter(User.email == email).first()
-            if not user:
-                return False
 
-            # Use the correct field name from your model
-            if not user.password_hash or not pwd_context.verify(password, user.password_hash):
+            # Checked on the password-hashing pool; same hash formats as the email login
+            valid, new_hash = await password_hashing.verify(users_context, password, user.password_hash if user else None)
+            if not user or not valid:
                 return False
+            if new_hash:
+                user.password_hash = new_hash
+                db.commit()
 
             # Check admin flag
             if not getattr(user, 'is_admin', False):
@@ -5,6 +5,9 @@ from sqladmin import Admin
 from app.database import engine
 from app.admin.auth import admin_auth_backend
 from app.admin.api import require_admin
+from app.utils.static_files import versioned_url
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'static')
 
 def setup_admin(app: FastAPI) -> None:
     admin = Admin(
@@ -13,6 +16,8 @@ def setup_admin(app: FastAPI) -> None:
         title='WeatherGuardTN Admin Panel',
         authentication_backend=admin_auth_backend,
     )
+    # {{ static_url('admin-custom.css') }} -> /static/admin-custom.css?v=<hash>, cached as immutable
+    admin.templates.env.globals['static_url'] = lambda name: versioned_url('/static', STATIC_DIR, name)
 
     from app.admin.api import router as admin_api_router
     app.include_router(admin_api_router, prefix='/api/admin')
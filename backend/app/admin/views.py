@@ -1,7 +1,10 @@
 ﻿from sqladmin import ModelView
 from markupsafe import Markup
+from starlette.concurrency import run_in_threadpool
 
+from app.database import SessionLocal
 from app.models.user import User
+from app.forum.auth import forget_principal
 
 from app.forum.models import (
     ForumUser, ForumPost, ForumComment, NewsArticle, Notification,
@@ -57,6 +60,16 @@ def fmt_truncate(max=60):
     return lambda obj, prop: truncate(getattr(obj, prop, None), max)
 
 
+def _forget_principal(key):
+    """Edits below change who may do what: drop the cached principal in every worker."""
+    db = SessionLocal()
+    try:
+        forget_principal(db, key)
+        db.commit()
+    finally:
+        db.close()
+
+
 class UserAdmin(ModelView, model=User):
     column_list = ['id', 'email', 'name', 'is_admin', 'governorate', 'user_type', 'last_login', 'created_at']
     column_searchable_list = ['email', 'name']
@@ -78,6 +91,12 @@ class UserAdmin(ModelView, model=User):
         'created_at': fmt_dt,
     }
 
+    async def after_model_change(self, data, model, is_created, request):
+        await run_in_threadpool(_forget_principal, f"admin:{model.email}")
+
+    async def after_model_delete(self, model, request):
+        await run_in_threadpool(_forget_principal, f"admin:{model.email}")
+
 
 class ForumUserAdmin(ModelView, model=ForumUser):
     column_list = ['id', 'username', 'email', 'display_name', 'role', 'is_active', 'is_banned', 'governorate', 'posts_count', 'created_at']
@@ -100,6 +119,12 @@ class ForumUserAdmin(ModelView, model=ForumUser):
         'created_at': fmt_dt,
     }
 
+    async def after_model_change(self, data, model, is_created, request):
+        await run_in_threadpool(_forget_principal, model.id)
+
+    async def after_model_delete(self, model, request):
+        await run_in_threadpool(_forget_principal, model.id)
+
 
 class ForumPostAdmin(ModelView, model=ForumPost):
     column_list = ['id', 'title', 'author_id', 'category', 'risk_level', 'ai_approved', 'is_published', 'is_deleted', 'likes_count', 'comments_count', 'created_at']
@@ -1,27 +1,46 @@
 ﻿from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
 import os
-import psycopg2
+from contextlib import contextmanager
 from jose import jwt
 from datetime import timedelta, timezone
 from datetime import datetime
+from app.database import raw_connection
 from app.services.email_service import send_welcome_email, send_account_deleted
 
 router = APIRouter()
 
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "932539718184-1rrvuua9t4907c8nkirk8n18cglm17hk.apps.googleusercontent.com")
-DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://weatheruser:weatherpass@db:5432/weatherguard")
 
 def get_db():
-    return psycopg2.connect(DATABASE_URL, connect_timeout=10, sslmode='require')
+    # Pooled psycopg2 connection from the shared engine (app/database.py);
+    # conn.close() returns it to the pool. TLS is off unless DB_SSLMODE (or
+    # sslmode= in DATABASE_URL) is set: this used to force sslmode=require.
+    return raw_connection()
+
+
+@contextmanager
+def _connection():
+    """get_db() for a with-block: the connection goes back to the pool however the block ends."""
+    conn = get_db()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+# The handlers stay async for the password-hashing pool; everything that can
+# block (the pool checkout, psycopg2 cursors, Google's certificate fetch, SMTP)
+# runs through run_in_threadpool so a drained pool never stalls the event loop.
 
 import traceback
 import secrets
-from passlib.context import CryptContext
-_pwd_ctx = CryptContext(schemes=['bcrypt_sha256'], deprecated='auto')
+from app.forum.auth import hash_password_async
+from app.utils import password_hashing
+from app.utils.password_hashing import users_context
 
 FORUM_SECRET = os.getenv('FORUM_SECRET_KEY', 'change-me-in-production-use-long-random-string')
 
@@ -31,13 +50,30 @@ def _make_forum_token(user_id: str) -> str:
     return jwt.encode(payload, FORUM_SECRET, algorithm='HS256')
 
 
-def _ensure_forum_user(cur, email, name, governorate=None):
+def _forum_user_exists(email):
+    with _connection() as conn:
+        cur = conn.cursor()
+        cur.execute('SELECT 1 FROM forum_users WHERE email = %s', (email,))
+        return cur.fetchone() is not None
+
+
+async def _forum_password(email):
+    """Throwaway hash for a forum account created on the user's behalf; None if it exists already."""
+    exists = await run_in_threadpool(_forum_user_exists, email)
+    # Hashed on the forum's password pool, outside any open transaction
+    return None if exists else await hash_password_async(secrets.token_hex(16))
+
+
+def _ensure_forum_user(cur, email, name, governorate=None, random_pw=None):
+    if random_pw is None:
+        # Forum account exists already (see _forum_password): refresh the profile fields only
+        cur.execute('UPDATE forum_users SET display_name = COALESCE(%s, display_name), governorate = COALESCE(%s, governorate), updated_at = NOW() WHERE email = %s', (name, governorate, email))
+        return
     username = email.split('@')[0].lower().replace('.','_').replace('+','_')[:50]
     cur.execute('SELECT id FROM forum_users WHERE username = %s AND email != %s', (username, email))
     if cur.fetchone():
         import secrets as _s
         username = username[:45] + '_' + _s.token_hex(2)
-    random_pw = _pwd_ctx.hash(secrets.token_hex(16))
     cur.execute('INSERT INTO forum_users (username, email, hashed_password, display_name, governorate) VALUES (%s, %s, %s, %s, %s) ON CONFLICT (email) DO UPDATE SET display_name = COALESCE(EXCLUDED.display_name, forum_users.display_name), governorate  = COALESCE(EXCLUDED.governorate,  forum_users.governorate), updated_at   = NOW()', (username, email, random_pw, name or username, governorate))
 
 
@@ -67,21 +103,9 @@ class DeleteRequest(BaseModel):
 
 # ─── GOOGLE AUTH ──────────────────────────────────────────────────────────────
 
-@router.post("/google")
-async def google_auth(request: GoogleAuthRequest):
-    try:
-        print(f"DEBUG: Received token (first 50 chars): {request.token[:50]}")
-        print("DEBUG: Step 1 - Verifying token...")
-        idinfo = id_token.verify_oauth2_token(
-            request.token,
-            google_requests.Request(),
-            GOOGLE_CLIENT_ID,
-            clock_skew_in_seconds=10,
-        )
-        print(f"DEBUG: Step 2 - Token verified OK, email={idinfo.get('email')}")
-        print("DEBUG: Step 3 - Connecting to database...")
-        conn = get_db()
-        print("DEBUG: Step 4 - Connected, creating cursor...")
+def _save_google_user(idinfo, request, forum_pw):
+    print("DEBUG: Step 3 - Connecting to database...")
+    with _connection() as conn:
         cur = conn.cursor()
         print("DEBUG: Step 5 - Executing INSERT...")
         cur.execute("""
@@ -98,22 +122,32 @@ async def google_auth(request: GoogleAuthRequest):
             datetime.now(),
             datetime.now(), request.governorate, request.user_type
         ))
-        print("DEBUG: Step 6 - Fetching result...")
         row = cur.fetchone()
         print(f"DEBUG: Step 7 - User row: id={row[0] if row else None}")
-        print("DEBUG: Step 8 - Ensuring forum user...")
-        _ensure_forum_user(cur, row[1], row[2], row[4])
-        print("DEBUG: Step 9 - Fetching forum user...")
+        _ensure_forum_user(cur, row[1], row[2], row[4], forum_pw)
         cur.execute("SELECT id FROM forum_users WHERE email = %s", (row[1],))
         frow = cur.fetchone()
-        print("DEBUG: Step 10 - Committing...")
         conn.commit()
-        print("DEBUG: Step 11 - Closing connection...")
-        cur.close()
-        conn.close()
+        return row, frow
+
+
+@router.post("/google")
+async def google_auth(request: GoogleAuthRequest):
+    try:
+        print(f"DEBUG: Received token (first 50 chars): {request.token[:50]}")
+        print("DEBUG: Step 1 - Verifying token...")
+        idinfo = await run_in_threadpool(
+            id_token.verify_oauth2_token,
+            request.token,
+            google_requests.Request(),
+            GOOGLE_CLIENT_ID,
+            clock_skew_in_seconds=10,
+        )
+        print(f"DEBUG: Step 2 - Token verified OK, email={idinfo.get('email')}")
+        forum_pw = await _forum_password(idinfo["email"])
+        row, frow = await run_in_threadpool(_save_google_user, idinfo, request, forum_pw)
         print("DEBUG: Step 12 - Sending welcome email...")
-        send_welcome_email(row[1], row[2])
-        print("DEBUG: Step 13 - Returning response...")
+        await run_in_threadpool(send_welcome_email, row[1], row[2])
         return {
             "id": row[0], "email": row[1], "name": row[2],
             "picture": row[3], "governorate": row[4],
@@ -126,6 +160,8 @@ async def google_auth(request: GoogleAuthRequest):
         print("TRACEBACK:", _tb.format_exc())
         return JSONResponse(status_code=401, content={"detail": f"Invalid Google token: {str(e)}"})
     except Exception as e:
+        if isinstance(e, HTTPException):
+            raise
         import traceback as _tb
         _tb.print_exc()
         print(f"AUTH 500 ERROR: {str(e)}")
@@ -134,12 +170,8 @@ async def google_auth(request: GoogleAuthRequest):
 
 # ─── REGISTER ─────────────────────────────────────────────────────────────────
 
-@router.post("/register")
-async def register(request: EmailAuthRequest):
-    try:
-        import hashlib
-        password_hash = hashlib.sha256(request.password.encode()).hexdigest()
-        conn = get_db()
+def _create_user(request, password_hash, forum_pw):
+    with _connection() as conn:
         cur = conn.cursor()
         cur.execute("""
             INSERT INTO users (email, name, password_hash, governorate, user_type)
@@ -147,11 +179,21 @@ async def register(request: EmailAuthRequest):
             RETURNING id, email, name, governorate, user_type
         """, (request.email, request.name, password_hash, request.governorate, request.user_type))
         row = cur.fetchone()
-        _ensure_forum_user(cur, row[1], row[2], row[3])
+        _ensure_forum_user(cur, row[1], row[2], row[3], forum_pw)
         conn.commit()
-        cur.close()
-        conn.close()
-        send_welcome_email(row[1], row[2])
+        return row
+
+
+@router.post("/register")
+async def register(request: EmailAuthRequest):
+    if not request.password:
+        raise HTTPException(status_code=400, detail="A password is required.")
+    # Both hashes run on the dedicated pool before a connection is taken; a full queue answers 503
+    password_hash = await password_hashing.hash(users_context, request.password)
+    forum_pw = await _forum_password(request.email)
+    try:
+        row = await run_in_threadpool(_create_user, request, password_hash, forum_pw)
+        await run_in_threadpool(send_welcome_email, row[1], row[2])
         return {"id": row[0], "email": row[1], "name": row[2], "governorate": row[3], "user_type": row[4]}
     except Exception as e:
         if "unique" in str(e).lower() or "duplicate" in str(e).lower():
@@ -160,30 +202,41 @@ async def register(request: EmailAuthRequest):
 
 # ─── LOGIN ────────────────────────────────────────────────────────────────────
 
-@router.post("/login")
-async def login(request: EmailAuthRequest):
-    try:
-        import hashlib
-        password_hash = hashlib.sha256(request.password.encode()).hexdigest()
-        conn = get_db()
+def _find_user(email):
+    with _connection() as conn:
         cur = conn.cursor()
         cur.execute("""
-            SELECT id, email, name, governorate, user_type, picture
-            FROM users WHERE email = %s AND password_hash = %s
-        """, (request.email, password_hash))
-        row = cur.fetchone()
-        if not row:
-            cur.close()
-            conn.close()
-            raise HTTPException(status_code=401, detail="Invalid email or password.")
+            SELECT id, email, name, governorate, user_type, picture, password_hash
+            FROM users WHERE email = %s
+        """, (email,))
+        return cur.fetchone()
+
+
+def _record_login(request, row, new_hash, forum_pw):
+    with _connection() as conn:
+        cur = conn.cursor()
         cur.execute("UPDATE users SET last_login = %s WHERE email = %s", (datetime.now(), request.email))
+        if new_hash:
+            # Old unsalted SHA-256 digest, or hashed with an older cost: store the upgrade
+            cur.execute("UPDATE users SET password_hash = %s WHERE id = %s", (new_hash, row[0]))
         conn.commit()
-        _ensure_forum_user(cur, row[1], row[2], row[3])
+        _ensure_forum_user(cur, row[1], row[2], row[3], forum_pw)
         cur.execute("SELECT id FROM forum_users WHERE email = %s", (row[1],))
         frow = cur.fetchone()
         conn.commit()
-        cur.close()
-        conn.close()
+        return frow
+
+
+@router.post("/login")
+async def login(request: EmailAuthRequest):
+    try:
+        row = await run_in_threadpool(_find_user, request.email)
+        # The connection goes back to the pool while the hash is checked
+        valid, new_hash = await password_hashing.verify(users_context, request.password or "", row[6] if row else None)
+        if not row or not valid:
+            raise HTTPException(status_code=401, detail="Invalid email or password.")
+        forum_pw = await _forum_password(row[1])
+        frow = await run_in_threadpool(_record_login, request, row, new_hash, forum_pw)
         return {"id": row[0], "email": row[1], "name": row[2], "governorate": row[3], "user_type": row[4], "picture": row[5], "forum_token": _make_forum_token(frow[0]) if frow else None}
     except HTTPException:
         raise
@@ -193,30 +246,25 @@ async def login(request: EmailAuthRequest):
 # ─── UPDATE PROFILE ───────────────────────────────────────────────────────────
 
 @router.put("/update")
-async def update_profile(request: UpdateRequest):
+def update_profile(request: UpdateRequest):
     try:
-        conn = get_db()
-        cur = conn.cursor()
-        cur.execute("""
-            UPDATE users SET
-                name        = COALESCE(%s, name),
-                governorate = COALESCE(%s, governorate),
-                user_type   = COALESCE(%s, user_type)
-            WHERE email = %s
-            RETURNING id, email, name, governorate, user_type, picture
-        """, (request.name, request.governorate, request.user_type, request.email))
-        row = cur.fetchone()
-        conn.commit()
-        cur.close()
-        conn.close()
-        if not row:
-            raise HTTPException(status_code=404, detail="User not found.")
-        _ensure_forum_user(cur, row[1], row[2], row[3])
-        cur.execute("SELECT id FROM forum_users WHERE email = %s", (row[1],))
-        frow = cur.fetchone()
-        conn.commit()
-        cur.close()
-        conn.close()
+        with _connection() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                UPDATE users SET
+                    name        = COALESCE(%s, name),
+                    governorate = COALESCE(%s, governorate),
+                    user_type   = COALESCE(%s, user_type)
+                WHERE email = %s
+                RETURNING id, email, name, governorate, user_type, picture
+            """, (request.name, request.governorate, request.user_type, request.email))
+            row = cur.fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="User not found.")
+            _ensure_forum_user(cur, row[1], row[2], row[3])
+            cur.execute("SELECT id FROM forum_users WHERE email = %s", (row[1],))
+            frow = cur.fetchone()
+            conn.commit()
         return {"id": row[0], "email": row[1], "name": row[2], "governorate": row[3], "user_type": row[4], "picture": row[5], "forum_token": _make_forum_token(frow[0]) if frow else None}
     except HTTPException:
         raise
@@ -226,15 +274,13 @@ async def update_profile(request: UpdateRequest):
 # ─── DELETE ACCOUNT ───────────────────────────────────────────────────────────
 
 @router.delete("/delete")
-async def delete_account(request: DeleteRequest):
+def delete_account(request: DeleteRequest):
     try:
-        conn = get_db()
-        cur = conn.cursor()
-        cur.execute("DELETE FROM users WHERE email = %s RETURNING id", (request.email,))
-        row = cur.fetchone()
-        conn.commit()
-        cur.close()
-        conn.close()
+        with _connection() as conn:
+            cur = conn.cursor()
+            cur.execute("DELETE FROM users WHERE email = %s RETURNING id", (request.email,))
+            row = cur.fetchone()
+            conn.commit()
         if not row:
             raise HTTPException(status_code=404, detail="User not found.")
         send_account_deleted(request.email)
@@ -242,4 +288,4 @@ async def delete_account(request: DeleteRequest):
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Delete error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Delete error: {str(e)}")
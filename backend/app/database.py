@@ -1,20 +1,192 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from collections import deque
+from uuid import uuid4
+import logging
 import os
+import threading
+import time
+
+import psycopg2
+
+logger = logging.getLogger(__name__)
 
 # Use the environment variable we set in docker-compose
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://weatheruser:weatherpass@db:5432/weatherguard")
 
-engine = create_engine(DATABASE_URL, connect_args={"connect_timeout": 10})
+# ── Pool settings (one pool per engine per worker process) ──────────────────
+# Every code path (ORM sessions, the auth routes' raw psycopg2 cursors, the
+# async reads) checks connections out of these engines.
+DB_POOL_SIZE             = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW          = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT_SECONDS  = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+DB_POOL_RECYCLE_SECONDS  = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+DB_POOL_PRE_PING         = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+# 0 = no limit. Set it (e.g. 30000) for API workers; migrations and the startup
+# DDL share this engine and can legitimately run longer.
+DB_STATEMENT_TIMEOUT_MS  = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+# TLS to Postgres is off unless this (or sslmode= in DATABASE_URL) is set. The
+# auth routes used to force sslmode=require on their own connections; hosted
+# databases that need TLS (Render, see render.yaml) must set DB_SSLMODE=require.
+DB_SSLMODE               = os.getenv("DB_SSLMODE")                               # e.g. "require"
+# Behind PgBouncer in transaction mode: no startup options, no named prepared
+# statements. Set the statement timeout on the role instead
+# (ALTER ROLE ... SET statement_timeout = '30s').
+DB_PGBOUNCER             = os.getenv("DB_PGBOUNCER", "0") == "1"
+# Checkouts that wait longer than this are logged
+DB_SLOW_CHECKOUT_SECONDS = float(os.getenv("DB_SLOW_CHECKOUT_SECONDS", "1"))
+
+
+class PoolStats:
+    """Checkout-wait and usage counters for one engine's pool."""
+
+    def __init__(self, name: str):
+        self.name      = name
+        self.checkouts = 0
+        self.timeouts  = 0
+        self.wait_total = 0.0
+        self.wait_max   = 0.0
+        self._recent   = deque(maxlen=1000)
+        self._lock     = threading.Lock()
+        self.engine    = None   # read .pool on use: dispose() swaps in a new pool
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self._recent.append(waited)
+        if waited >= DB_SLOW_CHECKOUT_SECONDS:
+            logger.warning("%s pool: waited %.2fs for a connection (%s)", self.name, waited,
+                           self.engine.pool.status() if self.engine is not None else "")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            recent = sorted(self._recent)
+            checkouts, timeouts, total, worst = self.checkouts, self.timeouts, self.wait_total, self.wait_max
+        pool = self.engine.pool if self.engine is not None else None
+        return {
+            "pool_size":      pool.size() if pool is not None else None,
+            "max_overflow":   DB_MAX_OVERFLOW,
+            "in_use":         pool.checkedout() if pool is not None else None,
+            "idle":           pool.checkedin() if pool is not None else None,
+            "overflow":       pool.overflow() if pool is not None else None,
+            "checkouts":      checkouts,
+            "timeouts":       timeouts,
+            "wait_avg_ms":    round(total / max(checkouts + timeouts, 1) * 1000, 2),
+            "wait_p99_ms":    round(recent[min(len(recent) - 1, int(len(recent) * .99))] * 1000, 2) if recent else 0.0,
+            "wait_max_ms":    round(worst * 1000, 2),
+        }
+
+
+def _instrumented(pool_class, stats: PoolStats):
+    class InstrumentedPool(pool_class):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except Exception:
+                stats.record(time.perf_counter() - started, timed_out=True)
+                raise
+            stats.record(time.perf_counter() - started)
+            return conn
+
+    return InstrumentedPool
+
+
+sync_pool_stats  = PoolStats("sync")
+async_pool_stats = PoolStats("async")
+
+_pool_options = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+
+_connect_args = {"connect_timeout": 10}
+if DB_SSLMODE:
+    _connect_args["sslmode"] = DB_SSLMODE
+if DB_STATEMENT_TIMEOUT_MS and not DB_PGBOUNCER:
+    _connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=_instrumented(QueuePool, sync_pool_stats),
+    connect_args=_connect_args,
+    **_pool_options,
+)
+sync_pool_stats.engine = engine
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+# Async engine (asyncpg) for the hot read endpoints, alongside the sync one.
+# Same database; psycopg2's sslmode= becomes asyncpg's ssl=.
+def _async_url(url: str):
+    url = make_url(url).set(drivername="postgresql+asyncpg")
+    sslmode = url.query.get("sslmode") or DB_SSLMODE
+    if sslmode:
+        url = url.difference_update_query(["sslmode"]).update_query_dict({"ssl": sslmode})
+    if DB_PGBOUNCER:
+        url = url.update_query_dict({"prepared_statement_cache_size": "0"})
+    return url
+
+_async_connect_args = {"timeout": 10}
+if DB_PGBOUNCER:
+    _async_connect_args["statement_cache_size"] = 0
+    _async_connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+elif DB_STATEMENT_TIMEOUT_MS:
+    _async_connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+
+async_engine = create_async_engine(
+    os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL),
+    poolclass=_instrumented(AsyncAdaptedQueuePool, async_pool_stats),
+    connect_args=_async_connect_args,
+    **_pool_options,
+)
+async_pool_stats.engine = async_engine.sync_engine
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # THIS IS THE MISSING LINE:
-Base = declarative_base() 
+Base = declarative_base()
 
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def raw_connection():
+    """
+    A pooled psycopg2 connection for code that works with cursors directly.
+    close() hands it back to the pool (rolled back) instead of disconnecting.
+    """
+    return engine.raw_connection()
+
+
+def dedicated_connection():
+    """
+    An unpooled psycopg2 connection with the engine's settings (DB_SSLMODE,
+    timeouts), for a long-lived LISTEN that must not hold a pool slot.
+    """
+    return psycopg2.connect(engine.url.set(drivername="postgresql").render_as_string(hide_password=False),
+                            **_connect_args)
+
+
+def pool_metrics() -> dict:
+    return {"sync": sync_pool_stats.snapshot(), "async": async_pool_stats.snapshot()}
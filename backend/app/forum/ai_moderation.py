@@ -129,7 +129,7 @@ def _parse_response(raw: str) -> AICheckResult:
 
 # ── Main public function ───────────────────────────────────────────────────────
 
-async def moderate_text(
+async def classify(
     content_type: Literal["post", "comment"],
     title: str | None,
     body: str,
@@ -140,10 +140,9 @@ async def moderate_text(
     Send text to Qwen2.5 (via Ollama) for relevance moderation.
 
     Uses the Ollama /api/chat endpoint with the system prompt above.
-    Returns AICheckResult(approved, reason, confidence).
-
-    Raises nothing — all errors are caught and return a safe "rejected" result
-    so a broken moderation service never accidentally publishes bad content.
+    Raises on connection errors, timeouts, HTTP errors and unparseable output,
+    so a caller that can retry later (moderation_queue.py) tells them apart
+    from a real verdict.
     """
     user_message = _build_user_message(content_type, title, body, category, governorate)
 
@@ -160,22 +159,24 @@ async def moderate_text(
         ],
     }
 
-    try:
-        async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-            response = await client.post(
-                f"{OLLAMA_BASE_URL}/api/chat",
-                json=payload,
-            )
-            response.raise_for_status()
+    async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
+        response = await client.post(
+            f"{OLLAMA_BASE_URL}/api/chat",
+            json=payload,
+        )
+        response.raise_for_status()
+
+    data = response.json()
+    # Ollama returns: {"message": {"role": "assistant", "content": "..."}, ...}
+    raw_text = data["message"]["content"]
+    logger.debug("Ollama raw response: %s", raw_text)
 
-        data = response.json()
-        # Ollama returns: {"message": {"role": "assistant", "content": "..."}, ...}
-        raw_text = data["message"]["content"]
-        logger.debug("Ollama raw response: %s", raw_text)
+    return _parse_response(raw_text)
 
-        return _parse_response(raw_text)
 
-    except httpx.ConnectError:
+def fallback_result(error: Exception) -> AICheckResult:
+    """The safe "rejected" result for a failed classify() call, with a reason the author can read."""
+    if isinstance(error, httpx.ConnectError):
         logger.error(
             "Cannot connect to Ollama at %s. Is 'ollama serve' running?", OLLAMA_BASE_URL
         )
@@ -184,34 +185,52 @@ async def moderate_text(
             reason="Moderation service is offline. Please start Ollama and retry.",
             confidence="low",
         )
-    except httpx.TimeoutException:
+    if isinstance(error, httpx.TimeoutException):
         logger.error("Ollama request timed out after %s seconds.", REQUEST_TIMEOUT)
         return AICheckResult(
             approved=False,
             reason="Moderation check timed out. Please retry.",
             confidence="low",
         )
-    except httpx.HTTPStatusError as e:
-        logger.error("Ollama HTTP error %s: %s", e.response.status_code, e.response.text)
+    if isinstance(error, httpx.HTTPStatusError):
+        logger.error("Ollama HTTP error %s: %s", error.response.status_code, error.response.text)
         return AICheckResult(
             approved=False,
-            reason=f"Moderation service error (HTTP {e.response.status_code}). Please retry.",
+            reason=f"Moderation service error (HTTP {error.response.status_code}). Please retry.",
             confidence="low",
         )
-    except json.JSONDecodeError as e:
-        logger.error("Failed to parse Ollama JSON response: %s", e)
+    if isinstance(error, json.JSONDecodeError):
+        logger.error("Failed to parse Ollama JSON response: %s", error)
         return AICheckResult(
             approved=False,
             reason="Moderation check returned an unreadable response. Please retry.",
             confidence="low",
         )
+    logger.error("Unexpected error in ai_moderation: %s", error, exc_info=error)
+    return AICheckResult(
+        approved=False,
+        reason="Unexpected moderation error. Please retry.",
+        confidence="low",
+    )
+
+
+async def moderate_text(
+    content_type: Literal["post", "comment"],
+    title: str | None,
+    body: str,
+    category: str | None = None,
+    governorate: str | None = None,
+) -> AICheckResult:
+    """
+    classify(), returning AICheckResult(approved, reason, confidence).
+
+    Raises nothing — all errors are caught and return a safe "rejected" result
+    so a broken moderation service never accidentally publishes bad content.
+    """
+    try:
+        return await classify(content_type, title, body, category, governorate)
     except Exception as e:
-        logger.exception("Unexpected error in ai_moderation: %s", e)
-        return AICheckResult(
-            approved=False,
-            reason="Unexpected moderation error. Please retry.",
-            confidence="low",
-        )
+        return fallback_result(e)
 
 
 # ── Quick smoke-test (run directly: python -m backend.forum.ai_moderation) ─────
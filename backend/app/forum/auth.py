@@ -5,24 +5,35 @@ JWT authentication helpers for the forum.
 import os
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import func, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 
-from app.database import get_db
-from app.forum.models import ForumUser
+from app.database import get_async_db, get_db
+from app.forum import realtime
+from app.forum.cache import invalidate_principals, principal_scope, principals
+from app.forum.models import ForumUser, SpentStreamTicket
+from app.utils import password_hashing
 
 SECRET_KEY      = os.getenv("FORUM_SECRET_KEY", "change-me-in-production-use-long-random-string")
 ALGORITHM       = "HS256"
 ACCESS_EXPIRE   = int(os.getenv("FORUM_ACCESS_EXPIRE_MINUTES", "60"))
 REFRESH_EXPIRE  = int(os.getenv("FORUM_REFRESH_EXPIRE_DAYS",  "30"))
+STREAM_TICKET_SECONDS = int(os.getenv("FORUM_STREAM_TICKET_SECONDS", "30"))
 
-pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_ctx = CryptContext(
+    schemes=["bcrypt"], deprecated="auto",
+    bcrypt__default_rounds=password_hashing.BCRYPT_ROUNDS, bcrypt__min_rounds=password_hashing.BCRYPT_ROUNDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/forum/auth/login")
+# Same header, but a missing token yields None instead of a 401
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/api/forum/auth/login", auto_error=False)
 
 
 # ── password helpers ──────────────────────────────────────────────────────────
@@ -34,6 +45,16 @@ def verify_password(plain: str, hashed: str) -> bool:
     return pwd_ctx.verify(plain[:72], hashed)
 
 
+# On the dedicated hashing pool (app/utils/password_hashing.py) — use these from handlers
+async def hash_password_async(plain: str) -> str:
+    return await password_hashing.hash(pwd_ctx, plain[:72])
+
+
+async def verify_password_async(plain: str, hashed: Optional[str]) -> tuple[bool, Optional[str]]:
+    """(matches, new hash to store when the cost settings changed)."""
+    return await password_hashing.verify(pwd_ctx, plain[:72], hashed)
+
+
 # ── token helpers ─────────────────────────────────────────────────────────────
 def _create_token(data: dict, expires_delta: timedelta) -> str:
     payload = data.copy()
@@ -49,6 +70,41 @@ def create_tokens(user_id: UUID) -> tuple[str, str]:
     return access, refresh
 
 
+# ── stream tickets ────────────────────────────────────────────────────────────
+# EventSource can't send headers, so /events authenticates with a ticket in the
+# query string instead of the access token: it ends up in access logs, so it only
+# opens a stream, expires in seconds and is redeemed once. Spent ticket ids go to
+# spent_stream_tickets, so a replay fails on every worker, not just the first one.
+_SPEND_TICKET_SQL = text("""
+    INSERT INTO spent_stream_tickets (jti, expires_at) VALUES (:jti, to_timestamp(:exp))
+    ON CONFLICT DO NOTHING
+    RETURNING 1
+""")
+
+
+def create_stream_ticket(user_id: UUID) -> str:
+    return _create_token({"sub": str(user_id), "type": "stream", "jti": uuid4().hex},
+                         timedelta(seconds=STREAM_TICKET_SECONDS))
+
+
+def redeem_stream_ticket(ticket: str, db: Session) -> ForumUser:
+    payload = decode_token(ticket)
+    if payload.get("type") != "stream" or not payload.get("jti"):
+        raise HTTPException(status_code=401, detail="Invalid token type")
+    spent = db.execute(_SPEND_TICKET_SQL, {"jti": payload["jti"], "exp": payload["exp"]}).first()
+    db.commit()
+    if spent is None:
+        raise HTTPException(status_code=401, detail="Stream ticket already used")
+    return _active_user(db, payload["sub"])
+
+
+def prune_stream_tickets(db: Session) -> int:
+    """Forget spent tickets past their expiry (decode_token rejects those on its own)."""
+    deleted = db.query(SpentStreamTicket).filter(SpentStreamTicket.expires_at < func.now()).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
 def decode_token(token: str) -> dict:
     try:
         return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -56,6 +112,38 @@ def decode_token(token: str) -> dict:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
 
 
+# ── principal cache ───────────────────────────────────────────────────────────
+_USER_COLUMNS = [attr.key for attr in inspect(ForumUser).column_attrs]
+
+
+def _load_user(db: Session, user_id: str) -> Optional[ForumUser]:
+    """
+    The token's user, attached to `db`. On a cache hit the row is rebuilt from
+    the cached values and merged without a SELECT; handlers can still modify
+    and commit it as if it had been queried.
+    """
+    values = principals.get(user_id)
+    if values is None:
+        user = db.query(ForumUser).filter(ForumUser.id == user_id).first()
+        if user is not None:
+            principals.set(user_id, {key: getattr(user, key) for key in _USER_COLUMNS})
+        return user
+    user = ForumUser(**values)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+
+def forget_principal(db: Session, key) -> None:
+    """
+    Call when a ban, deactivation or role change is written: drops the cached
+    principal in this worker now and, once `db` commits, in every worker.
+    `key` is a forum user id, or "admin:<email>" for the admin API.
+    """
+    scope = principal_scope(str(key))
+    invalidate_principals(scope)
+    realtime.publish_invalidation(db, scope)
+
+
 # ── dependency injection ──────────────────────────────────────────────────────
 def get_current_user(
     token: str = Depends(oauth2_scheme),
@@ -64,7 +152,11 @@ def get_current_user(
     payload = decode_token(token)
     if payload.get("type") != "access":
         raise HTTPException(status_code=401, detail="Invalid token type")
-    user = db.query(ForumUser).filter(ForumUser.id == payload["sub"]).first()
+    return _active_user(db, payload["sub"])
+
+
+def _active_user(db: Session, user_id: str) -> ForumUser:
+    user = _load_user(db, user_id)
     if not user or not user.is_active:
         raise HTTPException(status_code=401, detail="User not found or inactive")
     if user.is_banned:
@@ -73,7 +165,7 @@ def get_current_user(
 
 
 def get_current_user_optional(
-    token: Optional[str] = Depends(oauth2_scheme),
+    token: Optional[str] = Depends(oauth2_scheme_optional),
     db:    Session = Depends(get_db),
 ) -> Optional[ForumUser]:
     """Use this for endpoints where auth is optional (e.g. public feed)."""
@@ -85,6 +177,24 @@ def get_current_user_optional(
         return None
 
 
+# Same checks over the async session, for handlers that use get_async_db. The user
+# is loaded into that request's session, so the handler can keep using it.
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db:    AsyncSession = Depends(get_async_db),
+) -> ForumUser:
+    return await db.run_sync(lambda session: get_current_user(token, session))
+
+
+async def get_current_user_optional_async(
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+    db:    AsyncSession = Depends(get_async_db),
+) -> Optional[ForumUser]:
+    if not token:
+        return None
+    return await db.run_sync(lambda session: get_current_user_optional(token, session))
+
+
 def require_moderator(user: ForumUser = Depends(get_current_user)) -> ForumUser:
     if user.role not in ("moderator", "admin"):
         raise HTTPException(status_code=403, detail="Moderator access required")
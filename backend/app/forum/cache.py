@@ -0,0 +1,215 @@
+"""
+backend/forum/cache.py
+Small in-process caches for hot forum reads (and the public feed responses).
+Each worker process keeps its own copy, so entries carry a TTL that bounds
+how long another worker can serve a stale value after an invalidation.
+"""
+from __future__ import annotations
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate
+from typing import Any, Hashable, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.forum.models import UserBlock
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU map with a per-entry time-to-live."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl     = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock  = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# ─────────────────────────────────────────────
+# Block sets (authors hidden from a user's feed)
+# ─────────────────────────────────────────────
+# A block or unblock publishes both users' scopes, so every worker drops their
+# entries on commit; the TTL only covers a missed NOTIFY.
+_block_sets = LRUCache(
+    maxsize=int(os.getenv("FORUM_BLOCK_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("FORUM_BLOCK_CACHE_TTL_SECONDS", "60")),
+)
+
+
+def hidden_author_ids(db: Session, user_id: UUID) -> frozenset:
+    """Users that `user_id` blocked or was blocked by, cached per user."""
+    hidden = _block_sets.get(user_id)
+    if hidden is None:
+        rows = (
+            db.query(UserBlock.blocked_id).filter(UserBlock.blocker_id == user_id)
+            .union(db.query(UserBlock.blocker_id).filter(UserBlock.blocked_id == user_id))
+            .all()
+        )
+        hidden = frozenset(r[0] for r in rows)
+        _block_sets.set(user_id, hidden)
+    return hidden
+
+
+_BLOCK_SCOPE = "blocks:"
+
+
+def block_scope(user_id: UUID) -> str:
+    """Invalidation scope (see realtime.publish_invalidation) for one user's block set."""
+    return f"{_BLOCK_SCOPE}{user_id}"
+
+
+def invalidate_block_sets(*scopes: str):
+    """Block/unblock: publish both users' block_scope() and drop them here once committed."""
+    for scope in scopes:
+        if scope.startswith(_BLOCK_SCOPE):
+            _block_sets.pop(UUID(scope[len(_BLOCK_SCOPE):]))
+
+
+# ─────────────────────────────────────────────
+# Authenticated principals (see auth.get_current_user)
+# ─────────────────────────────────────────────
+# Column values of the user behind a token, keyed by str(user id) — or
+# "admin:<email>" for the admin API — so most authenticated requests skip the
+# user lookup. Kept short: profile counters and other workers' writes may
+# show up a few seconds late. Bans, deactivation and role changes go through
+# auth.forget_principal(), which drops the entry everywhere on commit.
+principals = LRUCache(
+    maxsize=int(os.getenv("FORUM_PRINCIPAL_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("FORUM_PRINCIPAL_CACHE_TTL_SECONDS", "5")),
+)
+_PRINCIPAL_SCOPE = "principal:"
+
+
+def principal_scope(key: str) -> str:
+    """Invalidation scope (see realtime.publish_invalidation) for one cached principal."""
+    return f"{_PRINCIPAL_SCOPE}{key}"
+
+
+def invalidate_principals(*scopes: str):
+    for scope in scopes:
+        if scope.startswith(_PRINCIPAL_SCOPE):
+            principals.pop(scope[len(_PRINCIPAL_SCOPE):])
+
+
+# ─────────────────────────────────────────────
+# AI moderation verdicts (see moderation_cache.py)
+# ─────────────────────────────────────────────
+# In front of the moderation_verdicts table, keyed by (content hash, model key).
+# A verdict never changes under its key: the TTL only lets cold entries go.
+moderation_verdicts = LRUCache(
+    maxsize=int(os.getenv("FORUM_MODERATION_CACHE_SIZE", "5000")),
+    ttl=float(os.getenv("FORUM_MODERATION_CACHE_TTL_SECONDS", "3600")),
+)
+
+
+# ─────────────────────────────────────────────
+# Typeahead (short, hot prefixes only)
+# ─────────────────────────────────────────────
+# One- to three-letter prefixes match the most rows and are typed by everyone,
+# longer ones are selective enough to go straight to the indexes.
+TYPEAHEAD_CACHED_PREFIX_LEN = int(os.getenv("FORUM_TYPEAHEAD_CACHE_MAX_PREFIX", "3"))
+
+typeahead_results = LRUCache(
+    maxsize=int(os.getenv("FORUM_TYPEAHEAD_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("FORUM_TYPEAHEAD_CACHE_TTL_SECONDS", "30")),
+)
+
+
+# ─────────────────────────────────────────────
+# Trending panel (recomputed at most once a minute per worker)
+# ─────────────────────────────────────────────
+trending_topics_cache = LRUCache(
+    maxsize=4,
+    ttl=float(os.getenv("FORUM_TRENDING_CACHE_TTL_SECONDS", "60")),
+)
+
+
+# ─────────────────────────────────────────────
+# Anonymous feed responses (see the middleware in main.py)
+# ─────────────────────────────────────────────
+# Rendered JSON of the public feeds, keyed by path + query. Writes bump the
+# scope's generation instead of scanning the cache: older keys just stop
+# matching and age out of the LRU. The generation bump reaches every worker
+# through realtime.publish_invalidation(); the TTL covers a missed NOTIFY.
+PUBLIC_RESPONSE_SCOPES = {
+    "forum": re.compile(r"^/api/forum/posts/?$"),
+    "news":  re.compile(r"^/api/news/(?:relevant|alerts|by-region/[^/]+)?/?$"),
+}
+
+public_responses = LRUCache(
+    maxsize=int(os.getenv("PUBLIC_RESPONSE_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("PUBLIC_RESPONSE_CACHE_TTL_SECONDS", "30")),
+)
+_generations = {scope: 0 for scope in PUBLIC_RESPONSE_SCOPES}
+
+
+@dataclass(frozen=True)
+class PublicResponse:
+    body:          bytes
+    media_type:    str
+    etag:          str
+    last_modified: str
+
+
+def public_response_scope(path: str) -> Optional[str]:
+    for scope, pattern in PUBLIC_RESPONSE_SCOPES.items():
+        if pattern.match(path):
+            return scope
+    return None
+
+
+def public_response_key(scope: str, path: str, query: str) -> tuple:
+    params = "&".join(sorted(query.split("&"))) if query else ""
+    return (scope, _generations[scope], path.rstrip("/"), params)
+
+
+def make_public_response(body: bytes, media_type: str) -> PublicResponse:
+    # Content hash: every worker hands out the same ETag for the same bytes
+    return PublicResponse(
+        body=body,
+        media_type=media_type,
+        etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+        last_modified=formatdate(time.time(), usegmt=True),
+    )
+
+
+def invalidate_public_responses(*scopes: str):
+    for scope in scopes:
+        if scope in _generations:
+            _generations[scope] += 1
@@ -0,0 +1,122 @@
+"""
+backend/forum/counters.py
+Write-behind engagement counters (likes / shares / comments on posts, comments, articles).
+
+Handlers record a delta with bump() instead of updating the hot row inside the
+request transaction; flush() runs every few seconds and applies all buffered
+deltas with one UPDATE ... FROM unnest(...) per counter column. Reads add
+pending() deltas on top of the stored value so a user sees their own tap at
+once. Buffers are per worker process: another worker's taps show up after its
+next flush, and a crash loses at most one flush interval of increments.
+"""
+from __future__ import annotations
+import logging
+import os
+import threading
+from collections import defaultdict
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import text
+
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SECONDS = float(os.getenv("FORUM_COUNTER_FLUSH_SECONDS", "5"))
+
+# (table, column) pairs that may be buffered — also guards the SQL built in flush()
+COUNTERS = {
+    ("forum_posts",    "likes_count"),
+    ("forum_posts",    "shares_count"),
+    ("forum_posts",    "comments_count"),
+    ("forum_comments", "likes_count"),
+    ("news_articles",  "likes_count"),
+    ("news_articles",  "shares_count"),
+    ("news_comments",  "likes_count"),
+}
+
+def _new_buffer() -> dict[tuple[str, str], dict[UUID, int]]:
+    return defaultdict(lambda: defaultdict(int))
+
+
+_lock       = threading.Lock()
+_flush_lock = threading.Lock()
+_deltas     = _new_buffer()
+# Batch being written by flush(); still counted by pending() until it commits
+_inflight: dict = {}
+
+
+def bump(table: str, column: str, row_id: UUID, delta: int = 1):
+    """Record a counter change. Call once the triggering row is committed."""
+    if (table, column) not in COUNTERS:
+        raise ValueError(f"Unknown counter {table}.{column}")
+    with _lock:
+        _deltas[(table, column)][row_id] += delta
+
+
+def pending(table: str, column: str, row_ids: Iterable[UUID]) -> dict[UUID, int]:
+    """Unflushed deltas for the given rows (only non-zero ones)."""
+    with _lock:
+        sources = [b for b in (_deltas.get((table, column)), _inflight.get((table, column))) if b]
+        if not sources:
+            return {}
+        result = {}
+        for rid in row_ids:
+            delta = sum(b.get(rid, 0) for b in sources)
+            if delta:
+                result[rid] = delta
+        return result
+
+
+def apply_pending(table: str, outs: list, *columns: str) -> list:
+    """Add unflushed deltas to serialized rows (response models with `id`), never ORM objects."""
+    ids = [o.id for o in outs]
+    for column in columns:
+        deltas = pending(table, column, ids)
+        for o in outs:
+            if o.id in deltas:
+                setattr(o, column, getattr(o, column) + deltas[o.id])
+    return outs
+
+
+def flush() -> int:
+    """Apply every buffered delta; returns the number of rows updated."""
+    global _deltas, _inflight
+    with _flush_lock:
+        with _lock:
+            batch, _deltas = _deltas, _new_buffer()
+            _inflight = batch
+
+        updated = 0
+        db = SessionLocal()
+        try:
+            for (table, column), deltas in batch.items():
+                # Sorted so concurrent flushes from several workers lock rows in the same order
+                ids = sorted((rid for rid, d in deltas.items() if d), key=str)
+                if not ids:
+                    continue
+                result = db.execute(
+                    text(
+                        f"UPDATE {table} AS t SET {column} = GREATEST(t.{column} + d.delta, 0) "
+                        f"FROM unnest(CAST(:ids AS uuid[]), CAST(:deltas AS int[])) AS d(id, delta) "
+                        f"WHERE t.id = d.id"
+                    ),
+                    {"ids": [str(rid) for rid in ids], "deltas": [deltas[rid] for rid in ids]},
+                )
+                updated += result.rowcount
+            db.commit()
+            with _lock:
+                _inflight = {}
+        except Exception as e:
+            db.rollback()
+            logger.error("Counter flush failed, keeping deltas for the next run: %s", e)
+            with _lock:
+                for key, deltas in batch.items():
+                    for rid, d in deltas.items():
+                        _deltas[key][rid] += d
+                _inflight = {}
+            updated = 0
+        finally:
+            db.close()
+        return updated
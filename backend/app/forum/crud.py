@@ -9,12 +9,14 @@ from typing import List, Optional, Tuple
 from uuid import UUID
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, and_
+from sqlalchemy import func, desc, and_, text
 
+from app.forum import counters
 from app.forum.models import (
-    NewsArticle, NewsReaction, NewsComment, NewsCommentLike,
+    NewsArticle, NewsReaction, NewsComment,
     NewsShare, Notification, ForumUser,
 )
+from app.forum.search import tsquery
 from app.forum.schemas import CommentCreate, ReactionCreate, UserProfileUpdate
 
 
@@ -35,21 +37,25 @@ def get_news_feed(
     category: Optional[str] = None,
     search: Optional[str] = None,
 ) -> Tuple[List[NewsArticle], int]:
-    """Return paginated, filtered news articles, newest first."""
+    """Return paginated, filtered news articles, newest first (best match first when searching)."""
     q = db.query(NewsArticle)
 
     if risk_level:
         q = q.filter(NewsArticle.risk_level == risk_level)
     if governorate:
-        q = q.filter(NewsArticle.governorates.any(governorate))
+        # @> rather than = ANY(): only containment can use the GIN index
+        q = q.filter(NewsArticle.governorates.contains([governorate]))
     if category:
         q = q.filter(NewsArticle.category == category)
+    order = [desc(NewsArticle.scraped_at)]
     if search:
-        q = q.filter(NewsArticle.title.ilike(f"%{search}%"))
+        query = tsquery(search)
+        q = q.filter(NewsArticle.search_vector.op("@@")(query))
+        order.insert(0, desc(func.ts_rank_cd(NewsArticle.search_vector, query)))
 
     total = q.count()
     items = (
-        q.order_by(desc(NewsArticle.scraped_at))
+        q.order_by(*order)
         .offset((page - 1) * per_page)
         .limit(per_page)
         .all()
@@ -84,34 +90,38 @@ def get_reaction(db: Session, article_id: UUID, user_id: UUID) -> Optional[NewsR
     ).first()
 
 
-def upsert_reaction(db: Session, article_id: UUID, user_id: UUID, emoji: str) -> NewsReaction:
-    """Add or change reaction. Returns the reaction (emoji=None removed)."""
-    existing = get_reaction(db, article_id, user_id)
-
-    if existing:
-        if existing.emoji == emoji:
-            # Toggle off — remove reaction
-            db.delete(existing)
-            _adjust_count(db, article_id, -1)
-            db.commit()
-            return None
-        existing.emoji = emoji
-        db.commit()
-        db.refresh(existing)
-        return existing
-
-    reaction = NewsReaction(article_id=article_id, user_id=user_id, emoji=emoji)
-    db.add(reaction)
-    _adjust_count(db, article_id, +1)
-    db.commit()
-    db.refresh(reaction)
-    return reaction
-
-
-def _adjust_count(db: Session, article_id: UUID, delta: int):
-    db.query(NewsArticle).filter(NewsArticle.id == article_id).update(
-        {NewsArticle.likes_count: NewsArticle.likes_count + delta}
+_TOGGLE_REACTION_SQL = text("""
+    WITH removed AS (
+        DELETE FROM news_reactions
+        WHERE article_id = :article_id AND user_id = :user_id AND emoji = :emoji
+        RETURNING 1
+    ), upserted AS (
+        INSERT INTO news_reactions (article_id, user_id, emoji, created_at)
+        SELECT CAST(:article_id AS uuid), CAST(:user_id AS uuid), :emoji, now()
+        WHERE NOT EXISTS (SELECT 1 FROM removed)
+        ON CONFLICT (article_id, user_id) DO UPDATE SET emoji = EXCLUDED.emoji
+        RETURNING xmax = 0 AS inserted
     )
+    SELECT EXISTS (SELECT 1 FROM removed)                   AS removed,
+           COALESCE((SELECT inserted FROM upserted), false) AS inserted
+""")
+
+
+def upsert_reaction(db: Session, article_id: UUID, user_id: UUID, emoji: str) -> Optional[str]:
+    """
+    Add, change or (same emoji again) remove a reaction in one statement.
+    Returns the emoji now set, None when the reaction was removed.
+    """
+    row = db.execute(
+        _TOGGLE_REACTION_SQL, {"article_id": article_id, "user_id": user_id, "emoji": emoji}
+    ).one()
+    db.commit()
+    if row.removed:
+        counters.bump("news_articles", "likes_count", article_id, -1)
+        return None
+    if row.inserted:
+        counters.bump("news_articles", "likes_count", article_id, +1)
+    return emoji
 
 
 def get_reaction_summary(db: Session, article_id: UUID) -> dict:
@@ -131,10 +141,8 @@ def get_reaction_summary(db: Session, article_id: UUID) -> dict:
 def record_share(db: Session, article_id: UUID, user_id: UUID) -> NewsShare:
     share = NewsShare(article_id=article_id, user_id=user_id)
     db.add(share)
-    db.query(NewsArticle).filter(NewsArticle.id == article_id).update(
-        {NewsArticle.shares_count: NewsArticle.shares_count + 1}
-    )
     db.commit()
+    counters.bump("news_articles", "shares_count", article_id, +1)
     db.refresh(share)
     return share
 
@@ -185,24 +193,33 @@ def get_comments(db: Session, article_id: UUID) -> List[NewsComment]:
     )
 
 
-def like_comment(db: Session, comment_id: UUID, user_id: UUID) -> bool:
-    existing = db.query(NewsCommentLike).filter(
-        NewsCommentLike.comment_id == comment_id,
-        NewsCommentLike.user_id == user_id,
-    ).first()
-    if existing:
-        db.delete(existing)
-        db.query(NewsComment).filter(NewsComment.id == comment_id).update(
-            {NewsComment.likes_count: NewsComment.likes_count - 1}
-        )
-        db.commit()
-        return False  # unliked
-    like = NewsCommentLike(comment_id=comment_id, user_id=user_id)
-    db.add(like)
-    db.query(NewsComment).filter(NewsComment.id == comment_id).update(
-        {NewsComment.likes_count: NewsComment.likes_count + 1}
+_TOGGLE_COMMENT_LIKE_SQL = text("""
+    WITH removed AS (
+        DELETE FROM news_comment_likes
+        WHERE comment_id = :comment_id AND user_id = :user_id
+        RETURNING 1
+    ), added AS (
+        INSERT INTO news_comment_likes (comment_id, user_id, created_at)
+        SELECT CAST(:comment_id AS uuid), CAST(:user_id AS uuid), now()
+        WHERE NOT EXISTS (SELECT 1 FROM removed)
+        ON CONFLICT DO NOTHING
+        RETURNING 1
     )
+    SELECT EXISTS (SELECT 1 FROM removed) AS removed,
+           EXISTS (SELECT 1 FROM added)   AS added
+""")
+
+
+def like_comment(db: Session, comment_id: UUID, user_id: UUID) -> bool:
+    """Toggle a like in one statement; returns True if the comment is now liked."""
+    row = db.execute(_TOGGLE_COMMENT_LIKE_SQL, {"comment_id": comment_id, "user_id": user_id}).one()
     db.commit()
+    if row.removed:
+        counters.bump("news_comments", "likes_count", comment_id, -1)
+        return False  # unliked
+    if row.added:
+        counters.bump("news_comments", "likes_count", comment_id, +1)
+    # Neither: a concurrent request from the same user inserted it first
     return True  # liked
 
 
@@ -306,4 +323,228 @@ def update_user_profile(db: Session, user_id: UUID, payload: UserProfileUpdate)
         setattr(user, field, value)
     db.commit()
     db.refresh(user)
-    return user
\ No newline at end of file
+    return user
+
+
+# ─────────────────────────────────────────────
+# Profile counters
+# ─────────────────────────────────────────────
+
+def adjust_user_counters(
+    db: Session,
+    user_id: UUID,
+    *,
+    followers: int = 0,
+    following: int = 0,
+    posts: int = 0,
+):
+    """In-place increment of the denormalized profile counters (caller commits)."""
+    values = {}
+    if followers:
+        values[ForumUser.followers_count] = ForumUser.followers_count + followers
+    if following:
+        values[ForumUser.following_count] = ForumUser.following_count + following
+    if posts:
+        values[ForumUser.posts_count] = ForumUser.posts_count + posts
+    if values:
+        db.query(ForumUser).filter(ForumUser.id == user_id).update(values)
+
+
+_RECONCILE_COUNTERS_SQL = text("""
+    WITH followers AS (
+        SELECT following_id AS id, count(*) AS n FROM user_follows GROUP BY following_id
+    ), following AS (
+        SELECT follower_id AS id, count(*) AS n FROM user_follows GROUP BY follower_id
+    ), posts AS (
+        SELECT author_id AS id, count(*) AS n FROM forum_posts
+        WHERE is_published AND NOT is_deleted GROUP BY author_id
+    ), actual AS (
+        SELECT u.id,
+               COALESCE(fr.n, 0) AS followers,
+               COALESCE(fg.n, 0) AS following,
+               COALESCE(p.n,  0) AS posts
+        FROM forum_users u
+        LEFT JOIN followers fr ON fr.id = u.id
+        LEFT JOIN following fg ON fg.id = u.id
+        LEFT JOIN posts     p  ON p.id  = u.id
+    )
+    UPDATE forum_users u SET
+        followers_count = a.followers,
+        following_count = a.following,
+        posts_count     = a.posts
+    FROM actual a
+    WHERE u.id = a.id
+      AND (u.followers_count, u.following_count, u.posts_count)
+          IS DISTINCT FROM (a.followers, a.following, a.posts)
+""")
+
+
+def reconcile_user_counters(db: Session) -> int:
+    """
+    Recompute every user's counters from the source tables in one statement
+    and fix the rows that drifted. Returns the number of rows repaired.
+    """
+    result = db.execute(_RECONCILE_COUNTERS_SQL)
+    db.commit()
+    return result.rowcount
+
+
+# ─────────────────────────────────────────────
+# Forum toggles
+# One statement each: the existence check, the write and the follower
+# counters happen together, so double taps and concurrent requests cannot
+# insert twice or drift the counters. Caller commits (after adding any
+# notification) and bumps the write-behind like counters by what RETURNING
+# reported, so the buffered delta always matches the row change.
+# ─────────────────────────────────────────────
+
+_LIKE_POST_SQL = text("""
+    WITH post AS (
+        SELECT id, author_id FROM forum_posts
+        WHERE id = :post_id AND is_published AND NOT is_deleted
+    ), added AS (
+        INSERT INTO post_likes (post_id, user_id, created_at)
+        SELECT id, CAST(:user_id AS uuid), now() FROM post
+        ON CONFLICT DO NOTHING
+        RETURNING 1
+    )
+    SELECT post.author_id, EXISTS (SELECT 1 FROM added) AS added FROM post
+""")
+
+_UNLIKE_POST_SQL = text("""
+    DELETE FROM post_likes WHERE post_id = :post_id AND user_id = :user_id RETURNING 1
+""")
+
+_LIKE_COMMENT_SQL = text("""
+    WITH comment AS (
+        SELECT id, author_id FROM forum_comments WHERE id = :comment_id AND NOT is_deleted
+    ), added AS (
+        INSERT INTO comment_likes (comment_id, user_id, created_at)
+        SELECT id, CAST(:user_id AS uuid), now() FROM comment
+        ON CONFLICT DO NOTHING
+        RETURNING 1
+    )
+    SELECT comment.author_id, EXISTS (SELECT 1 FROM added) AS added FROM comment
+""")
+
+_UNLIKE_COMMENT_SQL = text("""
+    DELETE FROM comment_likes WHERE comment_id = :comment_id AND user_id = :user_id RETURNING 1
+""")
+
+
+# The user rows whose counters a follow toggle changes, locked lower id first:
+# two users following or blocking each other at the same moment queue up
+# instead of deadlocking. Everything after it reads `locked` so it runs first;
+# count(*) makes it lock both rows, not stop at the first.
+_LOCK_PAIR = """
+    locked AS (
+        SELECT u.id FROM forum_users u, target
+        WHERE u.id IN (target.id, CAST(:user_id AS uuid))
+        ORDER BY u.id
+        FOR UPDATE OF u
+    )
+"""
+
+# Both counter rows change in one UPDATE (a row may only be updated once per statement)
+_FOLLOW_SQL = text("""
+    WITH target AS (
+        SELECT id FROM forum_users WHERE username = :username
+    ), """ + _LOCK_PAIR + """, added AS (
+        INSERT INTO user_follows (follower_id, following_id, created_at)
+        SELECT CAST(:user_id AS uuid), id, now() FROM target
+        WHERE id <> :user_id AND (SELECT count(*) FROM locked) > 0
+        ON CONFLICT DO NOTHING
+        RETURNING following_id
+    ), counted AS (
+        UPDATE forum_users u
+        SET followers_count = u.followers_count + (u.id = a.following_id)::int,
+            following_count = u.following_count + (u.id = :user_id)::int
+        FROM added a
+        WHERE u.id IN (a.following_id, :user_id)
+    )
+    SELECT target.id, EXISTS (SELECT 1 FROM added) AS changed FROM target
+""")
+
+_UNFOLLOW_SQL = text("""
+    WITH target AS (
+        SELECT id FROM forum_users WHERE username = :username
+    ), """ + _LOCK_PAIR + """, removed AS (
+        DELETE FROM user_follows f USING target
+        WHERE f.follower_id = :user_id AND f.following_id = target.id
+          AND (SELECT count(*) FROM locked) > 0
+        RETURNING f.following_id
+    ), counted AS (
+        UPDATE forum_users u
+        SET followers_count = u.followers_count - (u.id = r.following_id)::int,
+            following_count = u.following_count - (u.id = :user_id)::int
+        FROM removed r
+        WHERE u.id IN (r.following_id, :user_id)
+    )
+    SELECT target.id, EXISTS (SELECT 1 FROM removed) AS changed FROM target
+""")
+
+# A new block also drops the follows in both directions
+_BLOCK_SQL = text("""
+    WITH target AS (
+        SELECT id FROM forum_users WHERE username = :username AND id <> :user_id
+    ), """ + _LOCK_PAIR + """, added AS (
+        INSERT INTO user_blocks (blocker_id, blocked_id, created_at)
+        SELECT CAST(:user_id AS uuid), id, now() FROM target
+        WHERE (SELECT count(*) FROM locked) > 0
+        ON CONFLICT DO NOTHING
+        RETURNING blocked_id
+    ), dropped AS (
+        DELETE FROM user_follows f USING added a
+        WHERE (f.follower_id = :user_id     AND f.following_id = a.blocked_id)
+           OR (f.follower_id = a.blocked_id AND f.following_id = :user_id)
+        RETURNING f.follower_id, f.following_id
+    ), counted AS (
+        UPDATE forum_users u
+        SET followers_count = u.followers_count - (SELECT count(*) FROM dropped d WHERE d.following_id = u.id),
+            following_count = u.following_count - (SELECT count(*) FROM dropped d WHERE d.follower_id  = u.id)
+        WHERE u.id IN (SELECT follower_id FROM dropped UNION SELECT following_id FROM dropped)
+    )
+    SELECT target.id, EXISTS (SELECT 1 FROM added) AS changed FROM target
+""")
+
+
+def like_post(db: Session, post_id: UUID, user_id: UUID) -> Optional[Tuple[UUID, bool]]:
+    """(author_id, added) for a published post, None if there is no such post."""
+    row = db.execute(_LIKE_POST_SQL, {"post_id": post_id, "user_id": user_id}).first()
+    return (row.author_id, row.added) if row else None
+
+
+def unlike_post(db: Session, post_id: UUID, user_id: UUID) -> bool:
+    """True if a like was removed."""
+    return db.execute(_UNLIKE_POST_SQL, {"post_id": post_id, "user_id": user_id}).first() is not None
+
+
+def like_forum_comment(db: Session, comment_id: UUID, user_id: UUID) -> Optional[Tuple[UUID, bool]]:
+    """(author_id, added) for a live comment, None if there is no such comment."""
+    row = db.execute(_LIKE_COMMENT_SQL, {"comment_id": comment_id, "user_id": user_id}).first()
+    return (row.author_id, row.added) if row else None
+
+
+def unlike_forum_comment(db: Session, comment_id: UUID, user_id: UUID) -> bool:
+    """True if a like was removed."""
+    return db.execute(_UNLIKE_COMMENT_SQL, {"comment_id": comment_id, "user_id": user_id}).first() is not None
+
+
+def _user_toggle(db: Session, sql, user_id: UUID, username: str) -> Optional[Tuple[UUID, bool]]:
+    row = db.execute(sql, {"user_id": user_id, "username": username}).first()
+    return (row.id, row.changed) if row else None
+
+
+def follow_user(db: Session, follower_id: UUID, username: str) -> Optional[Tuple[UUID, bool]]:
+    """(target_id, added), None if the user does not exist. Never follows oneself."""
+    return _user_toggle(db, _FOLLOW_SQL, follower_id, username)
+
+
+def unfollow_user(db: Session, follower_id: UUID, username: str) -> Optional[Tuple[UUID, bool]]:
+    """(target_id, removed), None if the user does not exist."""
+    return _user_toggle(db, _UNFOLLOW_SQL, follower_id, username)
+
+
+def block_user(db: Session, blocker_id: UUID, username: str) -> Optional[Tuple[UUID, bool]]:
+    """(target_id, added), None if the user does not exist or is the blocker."""
+    return _user_toggle(db, _BLOCK_SQL, blocker_id, username)
@@ -0,0 +1,101 @@
+"""
+backend/forum/imaging.py
+Resized image variants, generated in a worker process (see media.py).
+
+Kept free of app imports so a freshly spawned pool process only loads Pillow.
+Variants live under <upload dir>/derived/<h[:2]>/<h[2:4]>/<sha256>/ and are
+named after the source content, so the same picture is only processed once;
+manifest.json is written last and marks the set as complete.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:   # Pillow missing: uploads are served as-is
+    Image = None
+
+# name -> longest side in pixels (never upscaled)
+VARIANTS = {"thumb": 320, "feed": 960, "full": 2048}
+FORMATS  = {"webp": {"format": "WEBP", "quality": 80, "method": 4},
+            "jpeg": {"format": "JPEG", "quality": 82, "progressive": True, "optimize": True}}
+MANIFEST = "manifest.json"
+
+
+def derived_dir(sha256: str) -> str:
+    return f"derived/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(64 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _flatten(img):
+    """JPEG has no alpha channel: composite onto white."""
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def _write_atomic(path: str, write):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def generate(source_path: str, upload_dir: str) -> dict | None:
+    """
+    Build every variant of one image; returns the manifest
+    {variant: {"width", "height", "webp", "jpeg"}} with paths relative to
+    upload_dir, or None if the file is not a still image Pillow can read.
+    """
+    if Image is None:
+        return None
+    rel_dir = derived_dir(_sha256(source_path))
+    out_dir = os.path.join(upload_dir, rel_dir)
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            return json.load(f)
+
+    try:
+        with Image.open(source_path) as img:
+            if getattr(img, "is_animated", False):
+                return None   # keep animated GIF / WebP as uploaded
+            # Apply the EXIF orientation; re-encoding without exif= drops the rest of the metadata
+            img = ImageOps.exif_transpose(img)
+            img.load()
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {}
+    for name, longest in VARIANTS.items():
+        variant = img.copy()
+        variant.thumbnail((longest, longest), Image.LANCZOS)
+        entry = {"width": variant.width, "height": variant.height}
+        for fmt, options in FORMATS.items():
+            encoded = _flatten(variant) if fmt == "jpeg" else variant
+            if fmt == "webp" and encoded.mode not in ("RGB", "RGBA"):
+                alpha = "A" in encoded.getbands() or "transparency" in encoded.info
+                encoded = encoded.convert("RGBA" if alpha else "RGB")
+            filename = f"{name}.{'jpg' if fmt == 'jpeg' else fmt}"
+            _write_atomic(os.path.join(out_dir, filename), lambda p: encoded.save(p, **options))
+            entry[fmt] = f"{rel_dir}/{filename}"
+        manifest[name] = entry
+
+    def dump(path):
+        with open(path, "w") as f:
+            json.dump(manifest, f)
+
+    _write_atomic(manifest_path, dump)
+    return manifest
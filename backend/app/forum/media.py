@@ -0,0 +1,251 @@
+"""
+backend/forum/media.py
+Content-addressed storage for forum uploads, and the process pool that
+renders resized image variants.
+
+An upload is copied in CHUNK_SIZE pieces from the request's spooled file to a
+temp file outside the served directory, hashing as it goes, so a worker holds
+one chunk in memory whatever the file size. The finished file is renamed
+(atomically) to uploads/forum/<h[:2]>/<h[2:4]>/<sha256><ext>; a file whose
+hash is already stored is dropped and the existing copy reused.
+
+Images are then handed to a small process pool (imaging.generate) so
+resizing never runs on a request worker, once per upload: the variant URLs
+are recorded on PostMedia.variants once the post's media rows exist, from the
+manifest on disk if the job is done, or from the upload's pending job.
+"""
+from __future__ import annotations
+import errno
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import BinaryIO, Iterable, Optional
+from uuid import UUID
+
+from fastapi import HTTPException
+
+from app.database import SessionLocal
+from app.forum import imaging
+from app.forum.models import PostMedia
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "uploads", "forum")
+UPLOAD_URL = "/api/forum/uploads"
+# Not under UPLOAD_DIR, which is served as is. Ideally on the same filesystem,
+# so publishing is a rename (a Docker volume mounted on UPLOAD_DIR is not: see _publish)
+_TMP_DIR   = os.getenv("FORUM_UPLOAD_TMP_DIR") or os.path.join(os.path.dirname(UPLOAD_DIR), ".forum-tmp")
+
+CHUNK_SIZE    = 64 * 1024
+MAX_FILE_SIZE = 50 * 1024 * 1024  # 50 MB
+
+EXTENSIONS = {
+    "image/jpeg": ".jpg", "image/png": ".png", "image/gif": ".gif", "image/webp": ".webp",
+    "video/mp4": ".mp4", "video/webm": ".webm", "video/quicktime": ".mov",
+}
+
+
+@dataclass
+class StoredFile:
+    sha256:   str
+    size:     int
+    path:     str    # absolute path on disk
+    url:      str
+    existing: bool   # same content was already stored
+
+
+def relative_path(sha256: str, ext: str) -> str:
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+
+
+def _too_large():
+    return HTTPException(413, f"File too large. Maximum size is {MAX_FILE_SIZE // (1024 * 1024)} MB.")
+
+
+def _publish(tmp_path: str, path: str):
+    """Move a finished upload to its place in the store, atomically."""
+    # Two concurrent uploads of the same bytes both land here; either rename wins
+    try:
+        os.replace(tmp_path, path)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # Across filesystems: copy to a dot-name beside the target (never served), then rename
+        staging = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{os.getpid()}.{threading.get_ident()}")
+        try:
+            shutil.copyfile(tmp_path, staging)
+            os.chmod(staging, 0o644)
+            os.replace(staging, path)
+        finally:
+            if os.path.exists(staging):
+                os.unlink(staging)
+        os.unlink(tmp_path)
+
+
+def store(source: BinaryIO, content_type: str, declared_size: int | None = None) -> StoredFile:
+    """Stream `source` into the store (blocking — run it in a threadpool)."""
+    if declared_size is not None and declared_size > MAX_FILE_SIZE:
+        raise _too_large()
+
+    os.makedirs(_TMP_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=_TMP_DIR)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := source.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_FILE_SIZE:
+                    raise _too_large()
+                digest.update(chunk)
+                out.write(chunk)
+        if size == 0:
+            raise HTTPException(400, "Empty file.")
+
+        sha256 = digest.hexdigest()
+        rel    = relative_path(sha256, EXTENSIONS.get(content_type, ".bin"))
+        path   = os.path.join(UPLOAD_DIR, rel)
+        existing = os.path.exists(path)
+        if existing:
+            os.unlink(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.chmod(tmp_path, 0o644)
+            _publish(tmp_path, path)
+        return StoredFile(sha256=sha256, size=size, path=path, url=f"{UPLOAD_URL}/{rel}", existing=existing)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+# ─────────────────────────────────────────────
+# Image variants (process pool)
+# ─────────────────────────────────────────────
+IMAGE_WORKERS = int(os.getenv("FORUM_IMAGE_WORKERS", "2"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# url -> variant job submitted at upload, for attach_variants to pick up
+_jobs: OrderedDict[str, Future] = OrderedDict()
+_MAX_JOBS = 1024
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the parent runs threads (LISTEN, scheduler, DB pool)
+            _pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def local_path(url: str) -> Optional[str]:
+    """Disk path of a file served from UPLOAD_URL, None for anything else."""
+    if not url.startswith(UPLOAD_URL + "/"):
+        return None
+    path = os.path.realpath(os.path.join(UPLOAD_DIR, url[len(UPLOAD_URL) + 1:]))
+    if not path.startswith(os.path.realpath(UPLOAD_DIR) + os.sep) or not os.path.isfile(path):
+        return None
+    return path
+
+
+def variant_urls(manifest: dict) -> dict:
+    return {
+        name: {key: f"{UPLOAD_URL}/{value}" if key in imaging.FORMATS else value for key, value in entry.items()}
+        for name, entry in manifest.items()
+    }
+
+
+def generate_variants(url: str) -> Optional[Future]:
+    """Queue variant generation for an uploaded image, unless it is already queued; the future yields the manifest (or None)."""
+    path = local_path(url)
+    if path is None or imaging.Image is None:
+        return None
+    with _pool_lock:
+        future = _jobs.get(url)
+    if future is not None:
+        return future
+    try:
+        future = _get_pool().submit(imaging.generate, path, UPLOAD_DIR)
+    except RuntimeError as e:   # pool shut down or broken
+        logger.warning("Image pool unavailable, %s served without variants: %s", url, e)
+        return None
+    with _pool_lock:
+        _jobs[url] = future
+        while len(_jobs) > _MAX_JOBS:   # uploads never attached to a post
+            _jobs.popitem(last=False)
+    return future
+
+
+def _stored_manifest(url: str) -> Optional[dict]:
+    """The manifest of variants already generated for this upload (the store is content-addressed)."""
+    sha256 = os.path.splitext(os.path.basename(url))[0]
+    try:
+        with open(os.path.join(UPLOAD_DIR, imaging.derived_dir(sha256), imaging.MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _record_variants(media_id: UUID, future: Future):
+    try:
+        manifest = future.result()
+    except Exception as e:
+        logger.error("Image variants failed for media %s: %s", media_id, e)
+        return
+    if manifest:
+        _save_variants(media_id, manifest)
+
+
+def _save_variants(media_id: UUID, manifest: dict):
+    db = SessionLocal()
+    try:
+        db.query(PostMedia).filter(PostMedia.id == media_id).update(
+            {PostMedia.variants: variant_urls(manifest)}, synchronize_session=False,
+        )
+        db.commit()
+    except Exception as e:
+        logger.error("Could not record image variants for media %s: %s", media_id, e)
+        db.rollback()
+    finally:
+        db.close()
+
+
+def attach_variants(items: Iterable[PostMedia]):
+    """
+    After the media rows are committed: record the variants generated since
+    the upload, or wait for its job. Only an upload this process has no job
+    for (another worker's, or from before a restart) is submitted here.
+    """
+    for item in items:
+        if item.file_type != "image" or item.variants or local_path(item.file_url) is None:
+            continue
+        with _pool_lock:
+            future = _jobs.pop(item.file_url, None)
+        manifest = _stored_manifest(item.file_url)
+        if manifest is not None:
+            _save_variants(item.id, manifest)
+            continue
+        if future is None:
+            future = generate_variants(item.file_url)
+            with _pool_lock:
+                _jobs.pop(item.file_url, None)
+        if future is not None:
+            future.add_done_callback(lambda f, media_id=item.id: _record_variants(media_id, f))
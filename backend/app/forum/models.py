@@ -6,19 +6,30 @@ Add this file at: backend/forum/models.py
 import uuid
 from datetime import datetime, timezone
 from sqlalchemy import (
-    Column, String, Text, Boolean, Integer, DateTime,
-    ForeignKey, CheckConstraint, UniqueConstraint, Enum as SAEnum
+    Column, String, Text, Boolean, Integer, BigInteger, Float, DateTime,
+    ForeignKey, CheckConstraint, UniqueConstraint, Enum as SAEnum, Computed, FetchedValue, func
 )
-from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB, TSVECTOR
 from sqlalchemy import Index
-from sqlalchemy.orm import relationship, backref
+from sqlalchemy.orm import relationship, backref, deferred
 from app.database import Base   # reuse your existing Base/engine
+from app.forum.ranking import hot_score_expression
+from app.forum.search import weighted_tsvector
 
 
 def utcnow():
     return datetime.now(timezone.utc)
 
 
+class ChangeTracked:
+    """
+    Rows stamped by the sync_stamp trigger on every insert/update with the writing
+    transaction id and a global sequence number — the /sync change cursor (forum/sync.py).
+    """
+    change_xid = Column(BigInteger, server_default=FetchedValue(), server_onupdate=FetchedValue())
+    change_seq = Column(BigInteger, server_default=FetchedValue(), server_onupdate=FetchedValue())
+
+
 # ─────────────────────────────────────────────
 # Users
 # ─────────────────────────────────────────────
@@ -32,10 +43,15 @@ class ForumUser(Base):
     display_name    = Column(String(100))
     avatar_url      = Column(Text)
     bio             = Column(Text)
-    governorate     = Column(String(100))
+    governorate     = Column(String(100), index=True)
     role            = Column(String(20), default="user")
     is_active       = Column(Boolean, default=True)
     is_banned       = Column(Boolean, default=False)
+    # Denormalized counters — kept in step by the forum handlers,
+    # repaired in bulk by crud.reconcile_user_counters()
+    followers_count = Column(Integer, default=0, server_default="0", nullable=False)
+    following_count = Column(Integer, default=0, server_default="0", nullable=False)
+    posts_count     = Column(Integer, default=0, server_default="0", nullable=False)
     created_at      = Column(DateTime(timezone=True), default=utcnow)
     updated_at      = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
 
@@ -58,6 +74,10 @@ class UserBlock(Base):
     blocked_id = Column(UUID(as_uuid=True), ForeignKey("forum_users.id", ondelete="CASCADE"), primary_key=True)
     created_at = Column(DateTime(timezone=True), default=utcnow)
 
+    __table_args__ = (
+        Index("ix_user_blocks_blocked_id", "blocked_id"),   # reverse direction lookups
+    )
+
 
 class UserReport(Base):
     __tablename__ = "user_reports"
@@ -77,11 +97,11 @@ class UserReport(Base):
 # ─────────────────────────────────────────────
 # Posts
 # ─────────────────────────────────────────────
-class ForumPost(Base):
+class ForumPost(ChangeTracked, Base):
     __tablename__ = "forum_posts"
 
     id             = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    author_id      = Column(UUID(as_uuid=True), ForeignKey("forum_users.id", ondelete="CASCADE"), nullable=False)
+    author_id      = Column(UUID(as_uuid=True), ForeignKey("forum_users.id", ondelete="CASCADE"), nullable=False, index=True)
     title          = Column(String(300), nullable=False)
     body           = Column(Text, nullable=False)
     category       = Column(String(50), nullable=False)
@@ -98,6 +118,10 @@ class ForumPost(Base):
     is_deleted     = Column(Boolean, default=False)
     created_at     = Column(DateTime(timezone=True), default=utcnow)
     updated_at     = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
+    # Full-text search document, maintained by Postgres on every write
+    search_vector  = deferred(Column(TSVECTOR, Computed(weighted_tsvector("title", "body"), persisted=True)))
+    # Time-decayed engagement score for the "hot" feed (forum/ranking.py)
+    hot_score      = Column(Float, Computed(hot_score_expression(), persisted=True))
 
     author   = relationship("ForumUser", back_populates="posts")
     comments = relationship("ForumComment", back_populates="post", lazy="dynamic",
@@ -105,6 +129,18 @@ class ForumPost(Base):
     likes    = relationship("PostLike", back_populates="post", lazy="dynamic")
     reports  = relationship("PostReport", back_populates="post", lazy="dynamic")
 
+    __table_args__ = (
+        Index("ix_forum_posts_search", "search_vector", postgresql_using="gin"),
+        Index("ix_forum_posts_change", "change_xid", "change_seq"),
+        Index("ix_forum_posts_hot", hot_score.desc(), postgresql_where=(is_published == True) & (is_deleted == False)),
+        Index("ix_forum_posts_author_created", "author_id", "created_at"),   # timeline pull path
+        # "new" feed and its governorate filter (alembic 013)
+        Index("ix_forum_posts_feed_new", created_at.desc(), "id",
+              postgresql_where=(is_published == True) & (is_deleted == False)),
+        Index("ix_forum_posts_feed_governorate", "governorate", created_at.desc(), "id",
+              postgresql_where=(is_published == True) & (is_deleted == False)),
+    )
+
 
 class PostMedia(Base):
     __tablename__ = "post_media"
@@ -115,6 +151,9 @@ class PostMedia(Base):
     file_type   = Column(String(20), nullable=False)  # "image" or "video"
     mime_type   = Column(String(100))
     file_name   = Column(String(300))
+    # Resized copies {"thumb"|"feed"|"full": {width, height, webp, jpeg}}, filled in by
+    # the image worker pool (forum/media.py); NULL until ready, or for videos / GIFs
+    variants    = Column(JSONB)
     created_at  = Column(DateTime(timezone=True), default=utcnow)
 
     post = relationship("ForumPost", backref="media_items", lazy="select")
@@ -127,6 +166,10 @@ class PostLike(Base):
     created_at = Column(DateTime(timezone=True), default=utcnow)
     post = relationship("ForumPost", back_populates="likes")
 
+    __table_args__ = (
+        Index("ix_post_likes_user_created", "user_id", "created_at", "post_id"),   # activity timeline
+    )
+
 
 class PostShare(Base):
     __tablename__ = "post_shares"
@@ -135,6 +178,10 @@ class PostShare(Base):
     user_id    = Column(UUID(as_uuid=True), ForeignKey("forum_users.id", ondelete="CASCADE"))
     created_at = Column(DateTime(timezone=True), default=utcnow)
 
+    __table_args__ = (
+        Index("ix_post_shares_user_created", "user_id", "created_at", "post_id"),   # activity timeline
+    )
+
 
 class PostReport(Base):
     __tablename__ = "post_reports"
@@ -150,10 +197,56 @@ class PostReport(Base):
     reporter = relationship("ForumUser", foreign_keys=[reporter_id], lazy="joined")
 
 
+class ModerationJob(Base):
+    """A post waiting for its AI moderation verdict (forum/moderation_queue.py). Deleted once applied."""
+    __tablename__ = "moderation_jobs"
+
+    id           = Column(BigInteger, primary_key=True, autoincrement=True)
+    post_id      = Column(UUID(as_uuid=True), ForeignKey("forum_posts.id", ondelete="CASCADE"), nullable=False)
+    status       = Column(String(20), nullable=False, default="pending", server_default="pending")  # pending | running
+    attempts     = Column(Integer, nullable=False, default=0, server_default="0")
+    available_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, server_default=func.now())
+    locked_at    = Column(DateTime(timezone=True))
+    last_error   = Column(Text)
+    created_at   = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_moderation_jobs_ready", "available_at", postgresql_where=(status == "pending")),
+        Index("ix_moderation_jobs_running", "locked_at", postgresql_where=(status == "running")),
+        # One queued job per post: edits made before it is claimed share it
+        Index("uq_moderation_jobs_pending_post", "post_id", unique=True, postgresql_where=(status == "pending")),
+    )
+
+
+class ModerationVerdict(Base):
+    """An AI moderation verdict by normalized-content hash and model/prompt (forum/moderation_cache.py)."""
+    __tablename__ = "moderation_verdicts"
+
+    content_hash = Column(String(64), primary_key=True)
+    model_key    = Column(String(120), primary_key=True)
+    approved     = Column(Boolean, nullable=False)
+    reason       = Column(Text)
+    confidence   = Column(String(10))
+    content_type = Column(String(10))                 # "post" / "comment": near-duplicates only match their own kind
+    category     = Column(String(50))                 # and category
+    simhash      = Column(BigInteger)                 # 64-bit SimHash of title + body, as signed
+    simhash_bands = Column(ARRAY(Integer))            # its eight 8-bit bands, tagged with their position
+    hits         = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at   = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+
+    __table_args__ = (
+        # Near-duplicate lookup: only rejections are ever matched approximately
+        Index("ix_moderation_verdicts_bands", "simhash_bands", postgresql_using="gin",
+              postgresql_where=(approved == False)),
+        Index("ix_moderation_verdicts_last_used", "last_used_at"),
+    )
+
+
 # ─────────────────────────────────────────────
 # Comments
 # ─────────────────────────────────────────────
-class ForumComment(Base):
+class ForumComment(ChangeTracked, Base):
     __tablename__ = "forum_comments"
 
     id          = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -174,6 +267,13 @@ class ForumComment(Base):
     likes   = relationship("CommentLike", lazy="dynamic")
     reports = relationship("CommentReport", lazy="dynamic")
 
+    __table_args__ = (
+        Index("ix_forum_comments_change", "change_xid", "change_seq"),
+        Index("ix_forum_comments_post_created", "post_id", "created_at", postgresql_where=(is_deleted == False)),
+        Index("ix_forum_comments_author_created", "author_id", "created_at", "id",
+              postgresql_where=(is_deleted == False)),   # activity timeline
+    )
+
 
 class CommentLike(Base):
     __tablename__ = "comment_likes"
@@ -199,7 +299,7 @@ class CommentReport(Base):
 # ─────────────────────────────────────────────
 # Messages (private user-to-user)
 # ─────────────────────────────────────────────
-class Message(Base):
+class Message(ChangeTracked, Base):
     __tablename__ = "messages"
 
     id          = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -212,11 +312,17 @@ class Message(Base):
     sender   = relationship("ForumUser", foreign_keys=[sender_id])
     receiver = relationship("ForumUser", foreign_keys=[receiver_id])
 
+    __table_args__ = (
+        Index("ix_messages_sender_change",   "sender_id",   "change_xid", "change_seq"),
+        Index("ix_messages_receiver_change", "receiver_id", "change_xid", "change_seq"),
+        Index("ix_messages_conversation",    "sender_id",   "receiver_id", "created_at"),
+    )
+
 
 # ─────────────────────────────────────────────
 # Notifications
 # ─────────────────────────────────────────────
-class Notification(Base):
+class Notification(ChangeTracked, Base):
     __tablename__ = "notifications"
 
     id         = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -228,12 +334,72 @@ class Notification(Base):
     news_article_id = Column(UUID(as_uuid=True), ForeignKey("news_articles.id", ondelete="CASCADE"), nullable=True)
     message    = Column(Text)
     is_read    = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), default=utcnow)
+    # Monthly range partition key, hence part of the primary key (see partitions.py)
+    created_at = Column(DateTime(timezone=True), primary_key=True, default=utcnow, server_default=func.now())
+    # Coalescing: rows sharing (user_id, group_key) are merged in place (see notifications.py)
+    group_key   = Column(String(120))
+    group_count = Column(Integer, default=1, server_default="1", nullable=False)
+    group_actor_ids = Column(ARRAY(UUID(as_uuid=True)))   # distinct actors behind group_count
 
     recipient = relationship("ForumUser", foreign_keys=[user_id], back_populates="notifications")
     actor     = relationship("ForumUser", foreign_keys=[actor_id])
     news_article = relationship("NewsArticle", foreign_keys=[news_article_id])
 
+    __table_args__ = (
+        Index("ix_notifications_user_change", "user_id", "change_xid", "change_seq"),
+        Index("ix_notifications_user_group", "user_id", "group_key"),
+        Index("ix_notifications_user_created", "user_id", created_at.desc()),
+        Index("ix_notifications_user_unread",  "user_id", created_at.desc(), postgresql_where=(is_read == False)),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+class SyncTombstone(Base):
+    """Hard-deleted rows of change-tracked tables, written by the sync_tombstone trigger."""
+    __tablename__ = "sync_tombstones"
+
+    change_seq = Column(BigInteger, primary_key=True, autoincrement=False)
+    change_xid = Column(BigInteger, nullable=False)
+    table_name = Column(String(50), nullable=False)
+    row_id     = Column(UUID(as_uuid=True), nullable=False)
+    owner_ids  = Column(ARRAY(UUID(as_uuid=True)))   # NULL = public row
+    deleted_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_sync_tombstones_change", "change_xid", "change_seq"),
+    )
+
+
+class TimelineEntry(Base):
+    """
+    A post in a reader's "following" timeline, written when the post is published
+    (fan-out on write, forum/timeline.py). created_at is the post's, for keyset paging.
+    """
+    __tablename__ = "timeline_entries"
+
+    user_id    = Column(UUID(as_uuid=True), ForeignKey("forum_users.id", ondelete="CASCADE"), primary_key=True)
+    post_id    = Column(UUID(as_uuid=True), ForeignKey("forum_posts.id", ondelete="CASCADE"), primary_key=True)
+    author_id  = Column(UUID(as_uuid=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_timeline_entries_page", "user_id", created_at.desc(), post_id.desc()),
+        Index("ix_timeline_entries_post", "post_id"),
+    )
+
+
+class SpentStreamTicket(Base):
+    """A redeemed /events ticket (forum/auth.py), shared by every worker until the ticket expires."""
+    __tablename__ = "spent_stream_tickets"
+
+    jti        = Column(String(32), primary_key=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_spent_stream_tickets_expires_at", "expires_at"),
+    )
+
+
 class PriorityFeedback(Base):
     __tablename__ = "priority_feedback"
 
@@ -252,7 +418,7 @@ class PriorityFeedback(Base):
 # ─────────────────────────────────────────────
 # News Articles (scraped from external sources)
 # ─────────────────────────────────────────────
-class NewsArticle(Base):
+class NewsArticle(ChangeTracked, Base):
     __tablename__ = "news_articles"
  
     id             = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -268,6 +434,8 @@ class NewsArticle(Base):
     likes_count    = Column(Integer, default=0)
     comments_count = Column(Integer, default=0)
     shares_count   = Column(Integer, default=0)
+    # Full-text search document, maintained by Postgres on every write
+    search_vector  = deferred(Column(TSVECTOR, Computed(weighted_tsvector("title", "body"), persisted=True)))
  
     comments  = relationship("NewsComment",   back_populates="article", lazy="dynamic")
     reactions = relationship("NewsReaction",  back_populates="article", lazy="dynamic")
@@ -276,6 +444,10 @@ class NewsArticle(Base):
     __table_args__ = (
         Index("ix_news_articles_scraped_at", "scraped_at"),
         Index("ix_news_articles_risk_level", "risk_level"),
+        Index("ix_news_articles_search", "search_vector", postgresql_using="gin"),
+        Index("ix_news_articles_change", "change_xid", "change_seq"),
+        Index("ix_news_articles_published_at", "published_at"),
+        Index("ix_news_articles_governorates", "governorates", postgresql_using="gin"),   # governorates @> ARRAY[...]
     )
  
  
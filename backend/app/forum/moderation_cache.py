@@ -0,0 +1,297 @@
+"""
+backend/forum/moderation_cache.py
+Remembered AI moderation verdicts, so the model judges each text once.
+
+The key is a SHA-256 of the normalized content (NFKC, case-folded, invisible
+format characters removed, whitespace collapsed) plus everything else the
+model is shown, stored next to the model key: OLLAMA_MODEL and a hash of the
+system prompt. Changing either starts a fresh set of verdicts without any
+flush. Verdicts live in moderation_verdicts, so they survive restarts and
+are shared by every worker, with a per-process LRU in front.
+
+Near-duplicates: title + body also get a 64-bit SimHash over character
+4-grams (robust on short, multilingual posts). A text within
+MODERATION_SIMHASH_DISTANCE bits of an earlier *rejected* text of the same
+kind (post or comment) and category is rejected for the same reason without a
+model call: mass-posted spam with a word or two changed is judged once.
+Approvals are only reused on an exact match.
+The hash is stored with its eight 8-bit bands in a GIN-indexed array; two
+hashes at most 7 bits apart share a band, so the lookup is an index probe
+plus a popcount over the few rows it finds.
+
+Every use of a verdict moves its last_used_at, which keeps it clear of
+prune(). Hits answered from the LRU are counted in memory and written in one
+UPDATE every MODERATION_CACHE_TOUCH_SECONDS, so a hot verdict that never
+leaves the LRU is not pruned under it.
+"""
+from __future__ import annotations
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
+
+from sqlalchemy import String, cast, func, select, text, update
+from sqlalchemy.dialects.postgresql import BIT, insert
+from sqlalchemy.orm import Session
+
+from app.database import AsyncSessionLocal
+from app.forum import ai_moderation
+from app.forum.cache import moderation_verdicts
+from app.forum.models import ModerationVerdict
+from app.forum.schemas import AICheckResult
+
+logger = logging.getLogger(__name__)
+
+SIMHASH_DISTANCE   = min(int(os.getenv("MODERATION_SIMHASH_DISTANCE", "6")), 7)   # 8 bands: at most 7
+SIMHASH_MIN_TOKENS = int(os.getenv("MODERATION_SIMHASH_MIN_TOKENS", "8"))
+RETENTION_DAYS     = int(os.getenv("MODERATION_CACHE_RETENTION_DAYS", "90"))
+TOUCH_SECONDS      = float(os.getenv("MODERATION_CACHE_TOUCH_SECONDS", "300"))
+
+MODEL_KEY = f"{ai_moderation.OLLAMA_MODEL}:{hashlib.sha256(ai_moderation.SYSTEM_PROMPT.encode()).hexdigest()[:16]}"
+
+_WORD = re.compile(r"\w+")
+
+
+class CacheStats:
+    """Where this process's verdicts came from."""
+
+    SOURCES = ("memory", "exact", "near_duplicate", "model")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sources: Counter = Counter()
+
+    def record(self, source: str):
+        with self._lock:
+            self.sources[source] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            sources = {s: self.sources[s] for s in self.SOURCES}
+        total = sum(sources.values())
+        return {
+            "model_key": MODEL_KEY,
+            "lookups":   total,
+            **sources,
+            "hit_rate":  round((total - sources["model"]) / total, 3) if total else 0.0,
+        }
+
+
+stats = CacheStats()
+
+# content hash -> LRU hits not yet written to last_used_at / hits
+_touched: Counter = Counter()
+_touched_lock = threading.Lock()
+_last_touch_flush = time.monotonic()
+
+_TOUCH_SQL = text(
+    "UPDATE moderation_verdicts v SET hits = v.hits + t.hits, last_used_at = now() "
+    "FROM unnest(CAST(:keys AS text[]), CAST(:hits AS int[])) AS t(content_hash, hits) "
+    "WHERE v.content_hash = t.content_hash AND v.model_key = :model_key"
+)
+
+
+# ─────────────────────────────────────────────
+# Keys
+# ─────────────────────────────────────────────
+def normalize(text: Optional[str]) -> str:
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    text = "".join(ch for ch in text if unicodedata.category(ch) != "Cf")   # zero-width and co.
+    return " ".join(text.split())
+
+
+def content_hash(content_type: str, title: Optional[str], body: str,
+                 category: Optional[str], governorate: Optional[str]) -> str:
+    parts = (content_type, normalize(title), normalize(body), category or "", governorate or "")
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def simhash(text: str) -> Optional[int]:
+    """64-bit SimHash of a normalized text's character 4-grams, or None if it is too short to compare."""
+    words = _WORD.findall(text)
+    if len(words) < SIMHASH_MIN_TOKENS:
+        return None
+    text = " ".join(words)
+    weights = [0] * 64
+    for i in range(len(text) - 3):
+        feature = int.from_bytes(hashlib.blake2b(text[i:i + 4].encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if feature >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def bands(value: int) -> list[int]:
+    """The eight 8-bit bands, each tagged with its position so equal bands elsewhere don't match."""
+    return [position << 8 | (value >> (8 * position)) & 0xFF for position in range(8)]
+
+
+def _signed(value: int) -> int:
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+# ─────────────────────────────────────────────
+# Lookup
+# ─────────────────────────────────────────────
+def _result(row) -> AICheckResult:
+    return AICheckResult(approved=row.approved, reason=row.reason, confidence=row.confidence or "medium")
+
+
+def _touch(key: str) -> bool:
+    """Count an LRU hit; True when the batch is due to be written."""
+    with _touched_lock:
+        _touched[key] += 1
+        return time.monotonic() - _last_touch_flush >= TOUCH_SECONDS
+
+
+def _take_touched() -> Optional[dict]:
+    global _touched, _last_touch_flush
+    with _touched_lock:
+        batch, _touched = _touched, Counter()
+        _last_touch_flush = time.monotonic()
+    if not batch:
+        return None
+    return {"keys": list(batch), "hits": list(batch.values()), "model_key": MODEL_KEY}
+
+
+async def _flush_touched():
+    params = _take_touched()
+    if params is None:
+        return
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(_TOUCH_SQL, params)
+            await db.commit()
+    except Exception as e:
+        logger.warning("Could not record %d cached moderation verdict hits: %s", len(params["keys"]), e)
+
+
+async def _stored(key: str, fingerprint: Optional[int], content_type: str,
+                  category: Optional[str]) -> tuple[Optional[AICheckResult], str]:
+    async with AsyncSessionLocal() as db:
+        async def used(row: ModerationVerdict):
+            # Keeps verdicts that still match something clear of prune()
+            await db.execute(
+                update(ModerationVerdict)
+                .where(ModerationVerdict.content_hash == row.content_hash, ModerationVerdict.model_key == MODEL_KEY)
+                .values(hits=ModerationVerdict.hits + 1, last_used_at=datetime.now(timezone.utc))
+            )
+            await db.commit()
+
+        row = await db.scalar(select(ModerationVerdict).where(
+            ModerationVerdict.content_hash == key, ModerationVerdict.model_key == MODEL_KEY,
+        ))
+        if row is not None:
+            result = _result(row)
+            await used(row)
+            return result, "exact"
+        if fingerprint is None or SIMHASH_DISTANCE <= 0:
+            return None, "model"
+        distance = func.length(func.replace(
+            cast(ModerationVerdict.simhash.op("#")(_signed(fingerprint)), BIT(64)).cast(String), "0", "",
+        ))
+        match = await db.scalar(
+            select(ModerationVerdict)
+            .where(
+                ModerationVerdict.model_key == MODEL_KEY,
+                ModerationVerdict.approved == False,
+                ModerationVerdict.content_type == content_type,
+                ModerationVerdict.category.is_not_distinct_from(category),
+                ModerationVerdict.simhash_bands.overlap(bands(fingerprint)),
+                distance <= SIMHASH_DISTANCE,
+            )
+            .order_by(distance)
+            .limit(1)
+        )
+        if match is not None:
+            result = _result(match)
+            await used(match)
+            return result, "near_duplicate"
+    return None, "model"
+
+
+async def _store(key: str, fingerprint: Optional[int], content_type: str,
+                 category: Optional[str], result: AICheckResult):
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(ModerationVerdict).values(
+            content_hash  = key,
+            model_key     = MODEL_KEY,
+            approved      = result.approved,
+            reason        = result.reason,
+            confidence    = result.confidence,
+            content_type  = content_type,
+            category      = category,
+            simhash       = _signed(fingerprint) if fingerprint is not None else None,
+            simhash_bands = bands(fingerprint) if fingerprint is not None else None,
+            created_at    = now,
+            last_used_at  = now,
+        ).on_conflict_do_nothing())
+        await db.commit()
+
+
+async def classify(
+    content_type: Literal["post", "comment"],
+    title: str | None,
+    body: str,
+    category: str | None = None,
+    governorate: str | None = None,
+) -> AICheckResult:
+    """ai_moderation.classify(), answered from earlier verdicts when possible. Raises like it."""
+    key = content_hash(content_type, title, body, category, governorate)
+    cached = moderation_verdicts.get((key, MODEL_KEY))
+    if cached is not None:
+        stats.record("memory")
+        if _touch(key):
+            await _flush_touched()
+        return cached
+
+    fingerprint = simhash(normalize(f"{title or ''} {body}"))
+    result, source = None, "model"
+    try:
+        result, source = await _stored(key, fingerprint, content_type, category)
+    except Exception as e:
+        # The cache is an optimisation: without it, ask the model
+        logger.warning("Moderation cache lookup failed: %s", e)
+    if result is None:
+        result = await ai_moderation.classify(content_type, title, body, category, governorate)
+        try:
+            await _store(key, fingerprint, content_type, category, result)
+        except Exception as e:
+            logger.warning("Could not store moderation verdict: %s", e)
+    stats.record(source)
+    moderation_verdicts.set((key, MODEL_KEY), result)
+    return result
+
+
+async def moderate_text(
+    content_type: Literal["post", "comment"],
+    title: str | None,
+    body: str,
+    category: str | None = None,
+    governorate: str | None = None,
+) -> AICheckResult:
+    """ai_moderation.moderate_text() through the cache: never raises, failures are not remembered."""
+    try:
+        return await classify(content_type, title, body, category, governorate)
+    except Exception as e:
+        return ai_moderation.fallback_result(e)
+
+
+# ─────────────────────────────────────────────
+# Maintenance
+# ─────────────────────────────────────────────
+def prune(db: Session) -> int:
+    """Drop verdicts unused for RETENTION_DAYS (older model keys age out this way too)."""
+    touched = _take_touched()   # this process's LRU hits first
+    if touched is not None:
+        db.execute(_TOUCH_SQL, touched)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS)
+    deleted = db.query(ModerationVerdict).filter(ModerationVerdict.last_used_at < cutoff).delete(synchronize_session=False)
+    db.commit()
+    return deleted
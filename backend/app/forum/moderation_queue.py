@@ -0,0 +1,301 @@
+"""
+backend/forum/moderation_queue.py
+Durable queue of AI moderation jobs for posts.
+
+create_post / update_post save the post unpublished and enqueue() a job in the
+same transaction, so the request returns without waiting for the model
+(seconds to a minute on a CPU-only Ollama). Each worker process runs
+MODERATION_WORKERS coroutines that claim one job at a time with
+FOR UPDATE SKIP LOCKED: any number of processes share the queue and no two
+of them get the same job. A worker asks the model, then in one transaction
+publishes or rejects the post and notifies the author (post_approved /
+post_rejected), as the request handlers used to.
+
+A model call that fails (Ollama down, timeout, unreadable answer) is retried
+with exponential backoff; after MODERATION_MAX_ATTEMPTS the post is rejected
+with the error as its reason, like moderate_text() does. A job whose worker
+died is handed out again after MODERATION_LEASE_SECONDS. If the post was
+edited while its job ran, the verdict is dropped: the edit queued a new job.
+
+MODERATION_WORKERS=0 keeps an API process from moderating; run the workers
+on their own with `python -m app.forum.moderation_queue`.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import exists, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, aliased
+
+from app.database import SessionLocal
+from app.forum import crud, timeline
+from app.forum.ai_moderation import REQUEST_TIMEOUT, fallback_result
+from app.forum.moderation_cache import classify
+from app.forum.models import ForumPost, ModerationJob
+from app.forum.notifications import send_notification
+from app.forum.realtime import publish_invalidation
+from app.forum.schemas import AICheckResult
+
+logger = logging.getLogger(__name__)
+
+WORKERS            = int(os.getenv("MODERATION_WORKERS", "2"))
+MAX_ATTEMPTS       = int(os.getenv("MODERATION_MAX_ATTEMPTS", "5"))
+RETRY_BASE_SECONDS = float(os.getenv("MODERATION_RETRY_BASE_SECONDS", "15"))
+POLL_SECONDS       = float(os.getenv("MODERATION_POLL_SECONDS", "2"))
+LEASE_SECONDS      = int(os.getenv("MODERATION_LEASE_SECONDS", str(REQUEST_TIMEOUT * 3)))
+
+
+class QueueStats:
+    """Jobs finished by this process's workers and how long the model took."""
+
+    def __init__(self):
+        self.outcomes: Counter = Counter()
+        self._model_seconds = deque(maxlen=1000)
+
+    def record(self, outcome: str, model_seconds: Optional[float] = None):
+        self.outcomes[outcome] += 1
+        if model_seconds is not None:
+            self._model_seconds.append(model_seconds)
+
+    def snapshot(self) -> dict:
+        samples = sorted(self._model_seconds)
+        return {
+            "workers":  len(_tasks),
+            "outcomes": dict(self.outcomes),
+            "model_avg_ms": round(sum(samples) / len(samples) * 1000, 1) if samples else 0.0,
+            "model_p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * .99))] * 1000, 1) if samples else 0.0,
+        }
+
+
+stats = QueueStats()
+
+_tasks: list = []
+_wake: Optional[asyncio.Event] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_last_requeue = 0.0
+
+
+# ─────────────────────────────────────────────
+# Producer side (request handlers)
+# ─────────────────────────────────────────────
+def judged_content(post: ForumPost) -> tuple:
+    """What the model judges. A verdict only applies to the content it saw, so
+    update_post queues the post again whenever any of this changes."""
+    return post.title, post.body, post.category, post.governorate
+
+
+def enqueue(db: Session, post_id: UUID):
+    """Queue a moderation job for the post; commits with the caller's transaction."""
+    db.execute(
+        insert(ModerationJob)
+        .values(post_id=post_id)
+        .on_conflict_do_nothing(index_elements=["post_id"], index_where=ModerationJob.status == "pending")
+    )
+
+
+def wake():
+    """
+    Start this process's idle workers now instead of at their next poll (call
+    after commit). Safe from the threadpool the sync handlers run in.
+    """
+    if _wake is not None:
+        _loop.call_soon_threadsafe(_wake.set)
+
+
+def depth(db: Session) -> dict:
+    """Jobs by status and the age of the oldest one waiting, across all processes."""
+    counts = dict(db.query(ModerationJob.status, func.count()).group_by(ModerationJob.status).all())
+    oldest = db.query(func.min(ModerationJob.created_at)).filter(ModerationJob.status == "pending").scalar()
+    return {
+        "pending": counts.get("pending", 0),
+        "running": counts.get("running", 0),
+        "oldest_pending_seconds": round((datetime.now(timezone.utc) - oldest).total_seconds(), 1) if oldest else 0.0,
+    }
+
+
+# ─────────────────────────────────────────────
+# Worker side (run in the threadpool)
+# ─────────────────────────────────────────────
+def _requeue_stale(db: Session):
+    """
+    Jobs whose worker died mid-call go back to the queue. A post can have
+    several running jobs (one claimed after each edit) but only one pending:
+    a stale job is dropped instead if its post is queued again or has a newer
+    job, so at most one per post is re-queued.
+    """
+    stale = (ModerationJob.status == "running") & (ModerationJob.locked_at < func.now() - timedelta(seconds=LEASE_SECONDS))
+    other = aliased(ModerationJob)
+    superseded = exists().where(
+        other.post_id == ModerationJob.post_id,
+        (other.status == "pending") | (other.id > ModerationJob.id),
+    )
+    db.query(ModerationJob).filter(stale, superseded).delete(synchronize_session=False)
+    db.query(ModerationJob).filter(stale).update({"status": "pending", "locked_at": None}, synchronize_session=False)
+    db.commit()
+
+
+def _claim() -> Optional[dict]:
+    """Take the oldest ready job, with a snapshot of the post it is for."""
+    global _last_requeue
+    db = SessionLocal()
+    try:
+        if time.monotonic() - _last_requeue > LEASE_SECONDS / 2:
+            _last_requeue = time.monotonic()
+            _requeue_stale(db)
+        ready = (
+            select(ModerationJob.id)
+            .where(ModerationJob.status == "pending", ModerationJob.available_at <= func.now())
+            .order_by(ModerationJob.available_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        job = db.execute(
+            update(ModerationJob)
+            .where(ModerationJob.id == ready)
+            .values(status="running", locked_at=func.now(), attempts=ModerationJob.attempts + 1)
+            .returning(ModerationJob.id, ModerationJob.post_id, ModerationJob.attempts)
+        ).first()
+        if job is None:
+            db.rollback()
+            return None
+        post = db.get(ForumPost, job.post_id)
+        claimed = {
+            "id": job.id, "post_id": job.post_id, "attempts": job.attempts,
+            "content": judged_content(post) if post is not None and not post.is_deleted else None,
+        }
+        db.commit()
+        return claimed
+    finally:
+        db.close()
+
+
+def _retry(job: dict, error: Exception):
+    delay = RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1)
+    db = SessionLocal()
+    try:
+        queued = db.query(exists().where(
+            ModerationJob.post_id == job["post_id"], ModerationJob.status == "pending",
+        )).scalar()
+        if queued:   # edited meanwhile: the newer job takes over
+            db.query(ModerationJob).filter_by(id=job["id"]).delete(synchronize_session=False)
+        else:
+            db.query(ModerationJob).filter_by(id=job["id"]).update({
+                "status": "pending", "locked_at": None, "last_error": repr(error)[:1000],
+                "available_at": datetime.now(timezone.utc) + timedelta(seconds=delay),
+            }, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _apply(job: dict, result: Optional[AICheckResult]) -> str:
+    """Publish or reject the post and notify its author, then drop the job. Returns the outcome."""
+    db = SessionLocal()
+    try:
+        db.query(ModerationJob).filter_by(id=job["id"]).delete(synchronize_session=False)
+        post = db.query(ForumPost).filter_by(id=job["post_id"]).with_for_update().first()
+        if result is None or post is None or post.is_deleted or judged_content(post) != job["content"]:
+            db.commit()
+            return "stale"
+
+        was_published = post.is_published
+        post.ai_approved   = result.approved
+        post.ai_reason     = result.reason
+        post.ai_checked_at = datetime.now(timezone.utc)
+        post.is_published  = result.approved
+        if post.is_published != was_published:
+            crud.adjust_user_counters(db, post.author_id, posts=+1 if post.is_published else -1)
+            db.flush()
+            if post.is_published:
+                timeline.fan_out(db, post.id)
+            else:
+                timeline.remove_post(db, post.id)
+        if post.is_published or was_published:
+            publish_invalidation(db, "forum")
+        send_notification(db, user_id=post.author_id, type="post_approved" if result.approved else "post_rejected",
+                          post_id=post.id, extra={"reason": result.reason})
+        db.commit()
+        return "approved" if result.approved else "rejected"
+    finally:
+        db.close()
+
+
+# ─────────────────────────────────────────────
+# Workers
+# ─────────────────────────────────────────────
+async def _process(job: dict):
+    if job["content"] is None:   # post deleted before its turn
+        stats.record(await asyncio.to_thread(_apply, job, None))
+        return
+    title, body, category, governorate = job["content"]
+    started = time.perf_counter()
+    try:
+        result = await classify("post", title, body, category, governorate)
+    except Exception as e:
+        elapsed = time.perf_counter() - started
+        if job["attempts"] < MAX_ATTEMPTS:
+            logger.warning("Moderation of post %s failed (attempt %d/%d): %r",
+                           job["post_id"], job["attempts"], MAX_ATTEMPTS, e)
+            await asyncio.to_thread(_retry, job, e)
+            stats.record("retried", elapsed)
+            return
+        result = fallback_result(e)
+    stats.record(await asyncio.to_thread(_apply, job, result), time.perf_counter() - started)
+
+
+async def _worker(number: int):
+    while True:
+        try:
+            job = await asyncio.to_thread(_claim)
+            if job is not None:
+                await _process(job)
+                continue
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Moderation worker %d failed", number)
+        try:
+            await asyncio.wait_for(_wake.wait(), POLL_SECONDS)
+            _wake.clear()
+        except asyncio.TimeoutError:
+            pass
+
+
+def start(workers: int = WORKERS):
+    """Start the workers on the running event loop (FastAPI lifespan startup)."""
+    global _wake, _loop
+    if _tasks or workers <= 0:
+        return
+    _loop = asyncio.get_running_loop()
+    _wake = asyncio.Event()
+    for number in range(workers):
+        _tasks.append(asyncio.create_task(_worker(number), name=f"moderation-worker-{number}"))
+    logger.info("Moderation queue: %d workers", workers)
+
+
+async def stop():
+    """Cancel the workers. A job cut off mid-call is picked up again after its lease."""
+    global _wake, _loop
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
+    _wake = _loop = None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    async def _run():
+        start(max(WORKERS, 1))
+        await asyncio.gather(*_tasks)
+
+    asyncio.run(_run())
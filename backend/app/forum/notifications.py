@@ -1,15 +1,29 @@
 """
 backend/forum/notifications.py
 Creates notification rows in the DB.
-Extend send_notification() to push via WebSocket or email as needed.
+Every notification is also pushed to connected clients (see realtime.py).
+
+Social notifications on the same target are coalesced: within a time bucket
+they share a group_key and one row is updated in place ("Ali and 37 others
+liked your post."), counting each actor once. Low-risk news updates are folded into one digest row per
+user per bucket; alerts are always sent individually. notifications is
+partitioned by month, so a group can't be enforced with a unique index: writers
+of one group take a transaction-scoped advisory lock, update the open row and
+insert one only if there was none.
 """
 from __future__ import annotations
+import os
+import time
+from datetime import datetime, timezone
 from typing import Optional
 from uuid import UUID
 
+from sqlalchemy import case, exists, false, func, literal, select, update
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert
 from sqlalchemy.orm import Session
 
-from app.forum.models import Notification
+from app.forum.models import ForumUser, Notification
+from app.forum.realtime import publish_to_governorates, publish_to_user
 
 
 NOTIFICATION_MESSAGES = {
@@ -26,6 +40,56 @@ NOTIFICATION_MESSAGES = {
     "news_update":           "Weather news for {governorate}: {title}",
 }
 
+# Coalesced variants — {others} is "1 other" or "N others"
+GROUPED_MESSAGES = {
+    "post_like":    "{actor} and {others} liked your post.",
+    "post_comment": "{actor} and {others} commented on your post.",
+    "post_share":   "{actor} and {others} shared your post.",
+    "comment_like": "{actor} and {others} liked your comment.",
+    "new_follower": "{actor} and {others} started following you.",
+}
+NEWS_DIGEST_MESSAGE = "{count} weather news updates for your region. Latest: {title}"
+
+COALESCE_WINDOW_MINUTES = int(os.getenv("FORUM_NOTIFICATION_COALESCE_MINUTES", "60"))
+NEWS_DIGEST_HOURS       = int(os.getenv("FORUM_NEWS_DIGEST_HOURS", "6"))
+
+
+def _bucket(minutes: int) -> int:
+    return int(time.time() // (minutes * 60))
+
+
+def _open_since(minutes: int, now: datetime) -> datetime:
+    """
+    Oldest created_at an open group row can have: the start of the current bucket,
+    but never before the current month. Coalescing never moves a row into the next
+    monthly partition (see partitions.py); a new row is started there instead.
+    """
+    bucket_start = datetime.fromtimestamp(_bucket(minutes) * minutes * 60, timezone.utc)
+    return max(bucket_start, now.replace(day=1, hour=0, minute=0, second=0, microsecond=0))
+
+
+def _lock_group(db: Session, key: str):
+    """Serialize writers of one group until commit, so only one of them inserts its row."""
+    db.execute(select(func.pg_advisory_xact_lock(func.hashtextextended(key, 0))))
+
+
+def _sql_format_escape(value) -> str:
+    """Make a value safe to embed in a Postgres format() template."""
+    return str(value).replace("%", "%%")
+
+
+def render_message(type: str, actor_name: Optional[str] = None, extra: Optional[dict] = None) -> str:
+    template = NOTIFICATION_MESSAGES.get(type, "You have a new notification.")
+    fmt_kwargs: dict = {}
+    if actor_name:
+        fmt_kwargs["actor"] = actor_name
+    if extra:
+        fmt_kwargs.update(extra)
+    try:
+        return template.format(**fmt_kwargs)
+    except KeyError:
+        return template
+
 
 def send_notification(
     db:             Session,
@@ -38,32 +102,71 @@ def send_notification(
     comment_id:     Optional[UUID] = None,
     news_article_id: Optional[UUID] = None,
     extra:          Optional[dict] = None,
-) -> Notification:
+) -> UUID:
     """
-    Persist a notification.  actor_name is used only for message templating.
+    Persist a notification and return its id.  actor_name is used only for message templating.
+    Groupable types update the recipient's open row for the same target instead of adding one.
     """
-    template = NOTIFICATION_MESSAGES.get(type, "You have a new notification.")
-    fmt_kwargs: dict = {}
-    if actor_name:
-        fmt_kwargs["actor"] = actor_name
-    if extra:
-        fmt_kwargs.update(extra)
-    try:
-        message = template.format(**fmt_kwargs)
-    except KeyError:
-        message = template
-
-    notif = Notification(
-        user_id         = user_id,
-        actor_id        = actor_id,
-        type            = type,
-        post_id         = post_id,
-        comment_id      = comment_id,
-        message         = message,
-    )
-    db.add(notif)
-    db.flush()
-    return notif
+    returning = (Notification.id, Notification.message, Notification.group_count, Notification.created_at)
+    group_key = None
+    notif = None
+    grouped = GROUPED_MESSAGES.get(type)
+    if grouped and actor_name:
+        target = post_id or comment_id or ""
+        group_key = f"{type}:{target}:{_bucket(COALESCE_WINDOW_MINUTES)}"
+        template = grouped.format(actor=_sql_format_escape(actor_name), others="%s others")
+        now = datetime.now(timezone.utc)
+        _lock_group(db, f"{user_id}:{group_key}")
+        # group_count is the number of distinct actors in group_actor_ids; an actor
+        # already in the group (like, unlike, like again) moves to the front of the
+        # message without being counted twice
+        known = Notification.group_actor_ids.any(actor_id)
+        others = case((known, Notification.group_count - 1), else_=Notification.group_count)
+        notif = db.execute(
+            update(Notification)
+            .where(
+                Notification.user_id == user_id,
+                Notification.group_key == group_key,
+                Notification.created_at >= _open_since(COALESCE_WINDOW_MINUTES, now),
+            )
+            .values(
+                actor_id        = actor_id,
+                comment_id      = comment_id,
+                group_count     = case((known, Notification.group_count), else_=Notification.group_count + 1),
+                group_actor_ids = case((known, Notification.group_actor_ids),
+                                       else_=func.array_append(Notification.group_actor_ids, actor_id)),
+                message         = case(
+                    (others == 0, render_message(type, actor_name, extra)),
+                    (others == 1, grouped.format(actor=actor_name, others="1 other")),
+                    else_=func.format(template, others),
+                ),
+                is_read         = False,
+                created_at      = now,
+            )
+            .returning(*returning)
+        ).first()
+    if notif is None:
+        notif = db.execute(insert(Notification).values(
+            user_id         = user_id,
+            actor_id        = actor_id,
+            type            = type,
+            post_id         = post_id,
+            comment_id      = comment_id,
+            news_article_id = news_article_id,
+            message         = render_message(type, actor_name, extra),
+            group_key       = group_key,
+            group_actor_ids = [actor_id] if group_key and actor_id else None,
+        ).returning(*returning)).one()
+
+    publish_to_user(db, user_id, "notification", {
+        "id":          str(notif.id),
+        "type":        type,
+        "message":     notif.message,
+        "group_count": notif.group_count,
+        "post_id":     str(post_id) if post_id else None,
+        "created_at":  notif.created_at.isoformat(),
+    })
+    return notif.id
 
 
 def notify_users_about_news(
@@ -73,31 +176,74 @@ def notify_users_about_news(
     governorates: list[str],
     risk_level: str,
     news_article_id: Optional[UUID] = None,
-):
+) -> int:
     """
     Notify all ForumUsers whose governorate matches any of the article's governorates.
     Uses 'news_alert' for orange/red/purple, 'news_update' for green/yellow.
-    """
-    from app.forum.models import ForumUser
 
+    Every recipient gets the same message, so the fan-out is a single
+    INSERT ... SELECT over forum_users (ix_forum_users_governorate) instead of
+    one ORM insert per user. News updates land in each user's digest row for the
+    current NEWS_DIGEST_HOURS bucket; alerts always get their own row.
+    Returns the number of users notified. Each recipient gets exactly one row
+    written: their open digest row updated, or a new row inserted.
+    """
     if risk_level in ("red", "orange", "purple"):
         notif_type = "news_alert"
     else:
         notif_type = "news_update"
 
-    users = db.query(ForumUser).filter(
+    message = render_message(notif_type, extra={
+        "governorate": ", ".join(governorates[:3]),
+        "title": title[:80],
+    })
+    group_key = None
+    if notif_type == "news_update":
+        group_key = f"news_digest:{_bucket(NEWS_DIGEST_HOURS * 60)}"
+
+    recipients = select(
+        func.gen_random_uuid(),
+        ForumUser.id,
+        literal(notif_type),
+        literal(news_article_id, PG_UUID(as_uuid=True)),
+        literal(message),
+        literal(group_key),
+        false(),
+        func.now(),
+    ).where(
         ForumUser.governorate.in_(governorates),
         ForumUser.is_active == True,
-    ).all()
-
-    for user in users:
-        send_notification(
-            db,
-            user_id=user.id,
-            type=notif_type,
-            news_article_id=news_article_id,
-            extra={
-                "governorate": ", ".join(governorates[:3]),
-                "title": title[:80],
-            },
+    )
+    updated = 0
+    if group_key:
+        now = datetime.now(timezone.utc)
+        open_row = (
+            (Notification.user_id == ForumUser.id)
+            & (Notification.group_key == group_key)
+            & (Notification.created_at >= _open_since(NEWS_DIGEST_HOURS * 60, now))
         )
+        digest = NEWS_DIGEST_MESSAGE.format(count="%s", title=_sql_format_escape(title[:80]))
+        _lock_group(db, group_key)
+        updated = db.execute(
+            update(Notification)
+            .where(open_row, ForumUser.governorate.in_(governorates), ForumUser.is_active == True)
+            .values(
+                news_article_id = news_article_id,
+                group_count     = Notification.group_count + 1,
+                message         = func.format(digest, Notification.group_count + 1),
+                is_read         = False,
+                created_at      = now,
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        recipients = recipients.where(~exists().where(open_row))
+    result = db.execute(insert(Notification).from_select(
+        ["id", "user_id", "type", "news_article_id", "message", "group_key", "is_read", "created_at"],
+        recipients,
+    ))
+    publish_to_governorates(db, governorates, notif_type, {
+        "news_article_id": str(news_article_id) if news_article_id else None,
+        "message":         message,
+        "risk_level":      risk_level,
+    })
+    return updated + result.rowcount
@@ -0,0 +1,203 @@
+"""
+backend/forum/partitions.py
+Monthly range partitions for the append-mostly tables, created ahead of time
+and dropped (or archived) once they age out.
+
+notifications is partitioned on created_at (alembic 014_partition_notifications):
+one child table per calendar month in UTC, named notifications_pYYYYMM. The
+scheduler's daily job keeps PREMAKE_MONTHS future months ready — there is no
+DEFAULT partition, so a row with no partition to go to fails to insert — and
+removes whole months older than the retention window. Dropping a partition is
+a catalog operation; the DELETE it replaces rewrote and vacuumed every row.
+
+With FORUM_PARTITION_ARCHIVE_SCHEMA set, expired partitions are detached and
+moved into that schema instead (dump and drop them from there at leisure).
+
+A database created before partitioning still has a plain notifications table:
+startup only adds columns, and nothing here touches a table that is not
+partitioned, so retention does nothing there (startup and the daily job warn
+about it). Convert it once, in a quiet window, with
+`python -m scripts.partition_notifications` (convert_notifications below, the
+same steps as alembic 014).
+"""
+from __future__ import annotations
+import logging
+import os
+import re
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+PREMAKE_MONTHS = int(os.getenv("FORUM_PARTITION_PREMAKE_MONTHS", "3"))
+ARCHIVE_SCHEMA = os.getenv("FORUM_PARTITION_ARCHIVE_SCHEMA") or None
+
+# table -> (partition key, months kept including the current one; 0 = keep everything)
+PARTITIONED_TABLES = {
+    "notifications": ("created_at", int(os.getenv("FORUM_NOTIFICATION_RETENTION_MONTHS", "6"))),
+}
+
+# What notifications carries besides its columns, recreated after the rebuild
+NOTIFICATION_FOREIGN_KEYS = [
+    ("notifications_user_id_fkey",         "user_id",         "forum_users",    "CASCADE"),
+    ("notifications_actor_id_fkey",        "actor_id",        "forum_users",    "SET NULL"),
+    ("notifications_post_id_fkey",         "post_id",         "forum_posts",    "CASCADE"),
+    ("notifications_comment_id_fkey",      "comment_id",      "forum_comments", "CASCADE"),
+    ("notifications_news_article_id_fkey", "news_article_id", "news_articles",  "CASCADE"),
+]
+NOTIFICATION_INDEXES = [
+    ("ix_notifications_user_change",  "(user_id, change_xid, change_seq)"),
+    ("ix_notifications_user_group",   "(user_id, group_key)"),
+    ("ix_notifications_user_created", "(user_id, created_at DESC)"),
+    ("ix_notifications_user_unread",  "(user_id, created_at DESC) WHERE is_read = false"),
+]
+
+
+# ─────────────────────────────────────────────
+# Months and names
+# ─────────────────────────────────────────────
+def month_start(day: date, offset: int = 0) -> date:
+    """First day of the month `offset` months after the one containing `day`."""
+    months = day.year * 12 + day.month - 1 + offset
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def create_partition_sql(table: str, month: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00+00') TO ('{month_start(month, 1).isoformat()} 00:00+00')"
+    )
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+# ─────────────────────────────────────────────
+# Catalog
+# ─────────────────────────────────────────────
+def is_partitioned(db: Session, table: str) -> bool:
+    return db.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:t))"),
+        {"t": table},
+    ).scalar()
+
+
+def partitions(db: Session, table: str) -> dict[str, date]:
+    """Attached monthly partitions of `table`: name -> first day of its month."""
+    names = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:t)"
+    ), {"t": table}).scalars()
+    pattern = re.compile(rf"^{re.escape(table)}_p(\d{{4}})(\d{{2}})$")
+    found = {}
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            found[name] = date(int(match.group(1)), int(match.group(2)), 1)
+    return found
+
+
+# ─────────────────────────────────────────────
+# Maintenance
+# ─────────────────────────────────────────────
+def ensure_partitions(db: Session, table: str, today: date | None = None) -> list[str]:
+    """Create the partitions for this month and the next PREMAKE_MONTHS. Returns the new ones."""
+    if not is_partitioned(db, table):
+        return []
+    today = today or _today()
+    existing = partitions(db, table)
+    created = []
+    for offset in range(PREMAKE_MONTHS + 1):
+        month = month_start(today, offset)
+        name = partition_name(table, month)
+        if name not in existing:
+            db.execute(text(create_partition_sql(table, month)))
+            created.append(name)
+    db.commit()
+    return created
+
+
+def apply_retention(db: Session, table: str, today: date | None = None) -> list[str]:
+    """Drop (or archive) partitions whose whole month is past retention. Returns their names."""
+    _, keep_months = PARTITIONED_TABLES[table]
+    if keep_months <= 0 or not is_partitioned(db, table):
+        return []
+    cutoff = month_start(today or _today(), -(keep_months - 1))
+    expired = sorted(name for name, month in partitions(db, table).items() if month < cutoff)
+    for name in expired:
+        # Either way the parent is locked only for the catalog change, not for the rows
+        if ARCHIVE_SCHEMA:
+            db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+            db.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+        else:
+            db.execute(text(f"DROP TABLE {name}"))
+        db.commit()
+    return expired
+
+
+def maintain(db: Session, today: date | None = None) -> dict:
+    """Premake upcoming months and retire expired ones for every partitioned table."""
+    report = {}
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(db, table):
+            logger.warning("%s is not partitioned, so retention is off: run `python -m scripts.partition_%s`",
+                           table, table)
+        created = ensure_partitions(db, table, today)
+        expired = apply_retention(db, table, today)
+        if created or expired:
+            logger.info("%s partitions: created %s, %s %s", table, created or "none",
+                        "archived" if ARCHIVE_SCHEMA else "dropped", expired or "none")
+        report[table] = {"created": created, "expired": expired}
+    return report
+
+
+# ─────────────────────────────────────────────
+# Conversion
+# ─────────────────────────────────────────────
+def convert_notifications(conn, today: date | None = None):
+    """
+    Rebuild a plain notifications table as the partitioned one, in the
+    caller's transaction: copies every row and holds an exclusive lock on
+    notifications until commit. The primary key becomes (id, created_at) and
+    the unique (user_id, group_key) index a plain one, as in alembic 014.
+    """
+    from app.forum.sync import SYNC_DDL
+
+    conn.execute(text("LOCK TABLE notifications IN ACCESS EXCLUSIVE MODE"))
+    conn.execute(text("UPDATE notifications SET created_at = now() WHERE created_at IS NULL"))
+    oldest = conn.execute(text("SELECT min(created_at) FROM notifications")).scalar()
+
+    conn.execute(text("ALTER TABLE notifications RENAME TO notifications_old"))
+    conn.execute(text(
+        "CREATE TABLE notifications (LIKE notifications_old INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY RANGE (created_at)"
+    ))
+    conn.execute(text("ALTER TABLE notifications ALTER COLUMN created_at SET DEFAULT now()"))
+    conn.execute(text("ALTER TABLE notifications ALTER COLUMN created_at SET NOT NULL"))
+    today = today or _today()
+    month = month_start(oldest.astimezone(timezone.utc).date() if oldest else today)
+    while month <= month_start(today, PREMAKE_MONTHS):
+        conn.execute(text(create_partition_sql("notifications", month)))
+        month = month_start(month, 1)
+    conn.execute(text("INSERT INTO notifications SELECT * FROM notifications_old"))
+    conn.execute(text("DROP TABLE notifications_old"))
+
+    conn.execute(text("ALTER TABLE notifications ADD CONSTRAINT notifications_pkey PRIMARY KEY (id, created_at)"))
+    for name, column, target, on_delete in NOTIFICATION_FOREIGN_KEYS:
+        conn.execute(text(
+            f"ALTER TABLE notifications ADD CONSTRAINT {name} FOREIGN KEY ({column}) "
+            f"REFERENCES {target} (id) ON DELETE {on_delete}"
+        ))
+    for name, definition in NOTIFICATION_INDEXES:
+        conn.execute(text(f"CREATE INDEX {name} ON notifications {definition}"))
+    for ddl in SYNC_DDL:   # the triggers went with the old table
+        if "TRIGGER notifications_" in ddl:
+            conn.execute(text(ddl))
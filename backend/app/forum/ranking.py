@@ -0,0 +1,72 @@
+"""
+backend/forum/ranking.py
+"Hot" ordering for the forum feed and the trending governorates / categories.
+
+hot_score is a stored generated column: log2 of the weighted engagement plus
+the post's age in half-lives. It never depends on now(), so a score only
+changes when the post's counters do (Postgres recomputes it on every counter
+flush) and old scores stay comparable with new ones — the hot feed is a plain
+index scan. Each half-life a post must double its engagement to hold its rank.
+"""
+from __future__ import annotations
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, literal
+from sqlalchemy.orm import Session
+
+# Changing these means rebuilding the column (see alembic 010_hot_ranking)
+HOT_HALF_LIFE_HOURS = 12
+HOT_WEIGHTS = {"likes_count": 1, "comments_count": 2, "shares_count": 3}
+_HOT_EPOCH = "2024-01-01 00:00:00+00"
+
+TRENDING_WINDOW_HOURS = int(os.getenv("FORUM_TRENDING_WINDOW_HOURS", "24"))
+TRENDING_LIMIT        = 10
+
+
+def hot_score_expression() -> str:
+    """SQL expression for the stored generated hot_score column (immutable functions only)."""
+    engagement = " + ".join(f"{w} * GREATEST(COALESCE({col}, 0), 0)" for col, w in HOT_WEIGHTS.items())
+    return (
+        f"ln(1 + {engagement}) / ln(2) "
+        f"+ extract(epoch FROM created_at - TIMESTAMPTZ '{_HOT_EPOCH}')::float8 / {HOT_HALF_LIFE_HOURS * 3600}"
+    )
+
+
+def trending(db: Session, window_hours: int = TRENDING_WINDOW_HOURS, limit: int = TRENDING_LIMIT) -> dict:
+    """
+    Governorates and categories ranked by the engagement of posts published in
+    the window (each post counts 1 plus its weighted likes / comments / shares).
+    """
+    from app.forum.models import ForumPost
+
+    since = datetime.now(timezone.utc) - timedelta(hours=window_hours)
+    weight = literal(1)
+    for col, w in HOT_WEIGHTS.items():
+        weight = weight + w * func.coalesce(getattr(ForumPost, col), 0)
+
+    def top(column):
+        score = func.sum(weight).label("score")
+        return [
+            {"key": key, "score": int(total), "posts": posts}
+            for key, total, posts in (
+                db.query(column, score, func.count(ForumPost.id))
+                .filter(
+                    ForumPost.is_published == True,
+                    ForumPost.is_deleted   == False,
+                    ForumPost.created_at   >= since,
+                    column.isnot(None),
+                )
+                .group_by(column)
+                .order_by(score.desc())
+                .limit(limit)
+                .all()
+            )
+        ]
+
+    return {
+        "window_hours": window_hours,
+        "governorates": top(ForumPost.governorate),
+        "categories":   top(ForumPost.category),
+        "computed_at":  datetime.now(timezone.utc),
+    }
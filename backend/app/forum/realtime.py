@@ -0,0 +1,165 @@
+"""
+backend/forum/realtime.py
+Realtime push for notifications, direct messages and news alerts, plus
+cache-invalidation broadcasts between workers.
+
+Publishers call publish_to_user() / publish_to_governorates() with their DB
+session. The event travels through Postgres NOTIFY, so it is only delivered if
+that transaction commits, and it reaches every worker process. Each worker
+keeps one LISTEN connection (a daemon thread) and hands events to the SSE
+streams it holds — one small asyncio.Queue per connected client, so idle
+clients cost a coroutine and nothing else.
+"""
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import os
+import select
+import threading
+from collections import defaultdict
+from typing import Callable, Iterable, Optional
+from uuid import UUID
+
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+CHANNEL           = "forum_events"
+QUEUE_SIZE        = int(os.getenv("FORUM_REALTIME_QUEUE_SIZE", "100"))
+HEARTBEAT_SECONDS = float(os.getenv("FORUM_REALTIME_HEARTBEAT_SECONDS", "25"))
+# NOTIFY payloads are capped at 8000 bytes; bigger events go out without data
+_MAX_PAYLOAD = 7500
+
+
+class Subscription:
+    __slots__ = ("user_id", "governorate", "queue")
+
+    def __init__(self, user_id: str, governorate: Optional[str]):
+        self.user_id     = user_id
+        self.governorate = governorate
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def push(self, message: dict):
+        # A client that stopped reading loses its oldest events, not the worker's memory
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+
+class Broker:
+    """Per-process registry of open streams, fed by a LISTEN thread."""
+
+    def __init__(self):
+        self._by_user: dict[str, set] = defaultdict(set)
+        self._by_gov:  dict[str, set] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._invalidation_hooks: list = []
+
+    # Called on the event loop ────────────────────
+    def subscribe(self, user_id: UUID, governorate: Optional[str]) -> Subscription:
+        sub = Subscription(str(user_id), governorate)
+        self._by_user[sub.user_id].add(sub)
+        if governorate:
+            self._by_gov[governorate].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        for index, key in ((self._by_user, sub.user_id), (self._by_gov, sub.governorate)):
+            subs = index.get(key)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del index[key]
+
+    def on_invalidate(self, hook):
+        """hook(*scopes) runs on the event loop for every publish_invalidation()."""
+        self._invalidation_hooks.append(hook)
+
+    def dispatch(self, event: dict):
+        if "invalidate" in event:
+            for hook in self._invalidation_hooks:
+                hook(*event["invalidate"])
+            return
+        targets = set(self._by_user.get(event.get("user_id"), ()))
+        for gov in event.get("governorates", ()):
+            targets |= self._by_gov.get(gov, set())
+        message = {"event": event.get("event", "message"), "data": event.get("data")}
+        for sub in targets:
+            sub.push(message)
+
+    def connection_count(self) -> int:
+        return sum(len(subs) for subs in self._by_user.values())
+
+    # Lifecycle ───────────────────────────────────
+    def start(self, loop: asyncio.AbstractEventLoop, connect: Callable):
+        """`connect()` opens the LISTEN connection (database.dedicated_connection: same settings as the engine)."""
+        if self._thread is not None:
+            return
+        self._loop = loop
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, args=(connect,), name="forum-realtime", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def _listen(self, connect: Callable):
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = connect()
+                conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                conn.cursor().execute(f"LISTEN {CHANNEL}")
+                logger.info("Realtime listener connected")
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            event = json.loads(notify.payload)
+                        except ValueError:
+                            continue
+                        self._loop.call_soon_threadsafe(self.dispatch, event)
+            except Exception as e:
+                logger.warning("Realtime listener error, reconnecting: %s", e)
+                self._stop.wait(5)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+broker = Broker()
+
+
+# ─────────────────────────────────────────────
+# Publishing (any thread, inside the caller's transaction)
+# ─────────────────────────────────────────────
+def _notify(db: Session, event: dict):
+    payload = json.dumps(event, default=str)
+    if len(payload.encode()) > _MAX_PAYLOAD:
+        # Client re-fetches when an event arrives without its data
+        payload = json.dumps({**event, "data": None}, default=str)
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+
+
+def publish_to_user(db: Session, user_id: UUID, event: str, data: dict):
+    _notify(db, {"user_id": str(user_id), "event": event, "data": data})
+
+
+def publish_to_governorates(db: Session, governorates: Iterable[str], event: str, data: dict):
+    _notify(db, {"governorates": list(governorates), "event": event, "data": data})
+
+
+def publish_invalidation(db: Session, *scopes: str):
+    """Tell every worker to drop its cached entries (public responses, principals, block sets) for `scopes` on commit."""
+    _notify(db, {"invalidate": list(scopes)})
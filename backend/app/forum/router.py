@@ -12,7 +12,7 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db          # your existing dependency
 from app.auth import get_current_user    # your existing JWT dependency  →  returns ForumUser | None
-from app.forum import crud
+from app.forum import counters, crud
 from app.forum.schemas import (
     NewsArticleOut, NewsArticleListOut,
     CommentCreate, CommentOut,
@@ -60,6 +60,7 @@ def list_news(
             reaction = crud.get_reaction(db, article.id, current_user.id)
             a.user_reaction = reaction.emoji if reaction else None
         out.append(a)
+    counters.apply_pending("news_articles", out, "likes_count", "shares_count")
 
     return NewsArticleListOut(total=total, page=page, per_page=per_page, items=out)
 
@@ -78,7 +79,7 @@ def get_news(
     if current_user:
         reaction = crud.get_reaction(db, article_id, current_user.id)
         out.user_reaction = reaction.emoji if reaction else None
-    return out
+    return counters.apply_pending("news_articles", [out], "likes_count", "shares_count")[0]
 
 
 # ─────────────────────────────────────────────
@@ -156,7 +157,7 @@ def get_comments(
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     comments = crud.get_comments(db, article_id)
-    return [CommentOut.model_validate(c) for c in comments]
+    return counters.apply_pending("news_comments", [CommentOut.model_validate(c) for c in comments], "likes_count")
 
 
 @router.post("/news/{article_id}/comments", response_model=CommentOut, status_code=201)
@@ -7,29 +7,43 @@ Mount this router in your main app with:
 """
 from __future__ import annotations
 
+import asyncio
+import base64
+import json
 import math
 from datetime import datetime, timezone
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, exists, func, literal, or_, select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from app.forum import models
-from app.database import get_db
+from app.forum import counters, crud, media, moderation_queue, models, sync, timeline
+from app.database import SessionLocal, get_async_db, get_db
 from app.forum import schemas
-from app.forum.ai_moderation import moderate_text
+from app.forum.moderation_cache import moderate_text
 from app.forum.auth import (
-    create_tokens, get_current_user, get_current_user_optional,
-    hash_password, verify_password,
+    STREAM_TICKET_SECONDS, create_stream_ticket, create_tokens, forget_principal, get_current_user,
+    get_current_user_async, get_current_user_optional, get_current_user_optional_async, hash_password_async,
+    redeem_stream_ticket, verify_password_async,
+)
+from app.forum.cache import (
+    TYPEAHEAD_CACHED_PREFIX_LEN, block_scope, hidden_author_ids, invalidate_block_sets, trending_topics_cache,
+    typeahead_results,
 )
 from app.forum.notifications import send_notification
+from app.forum.ranking import TRENDING_WINDOW_HOURS, trending
+from app.forum.realtime import HEARTBEAT_SECONDS, broker, publish_invalidation, publish_to_user
+from app.forum.search import headline, render_headline, tsquery
 from app.services.email_service import send_report_confirmation
 
 ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp"}
 ALLOWED_VIDEO_TYPES = {"video/mp4", "video/webm", "video/quicktime"}
 ALLOWED_TYPES = ALLOWED_IMAGE_TYPES | ALLOWED_VIDEO_TYPES
-MAX_FILE_SIZE = 50 * 1024 * 1024  # 50 MB
 
 router = APIRouter()
 
@@ -38,35 +52,43 @@ router = APIRouter()
 # AUTH
 # ══════════════════════════════════════════════════════════════════════════════
 
+# Hashing runs on its own bounded pool (app/utils/password_hashing.py), so these are
+# async: a login storm queues there, or is shed with a 503, instead of filling the
+# threadpool every sync endpoint shares.
 @router.post("/auth/register", response_model=schemas.TokenResponse, status_code=201)
-def register(payload: schemas.UserRegister, db: Session = Depends(get_db)):
-    if db.query(models.ForumUser).filter(models.ForumUser.email == payload.email).first():
+async def register(payload: schemas.UserRegister, db: AsyncSession = Depends(get_async_db)):
+    if await db.scalar(select(models.ForumUser.id).where(models.ForumUser.email == payload.email)):
         raise HTTPException(400, "Email already registered")
-    if db.query(models.ForumUser).filter(models.ForumUser.username == payload.username).first():
+    if await db.scalar(select(models.ForumUser.id).where(models.ForumUser.username == payload.username)):
         raise HTTPException(400, "Username already taken")
 
     user = models.ForumUser(
         username        = payload.username,
         email           = payload.email,
-        hashed_password = hash_password(payload.password),
+        hashed_password = await hash_password_async(payload.password),
         display_name    = payload.display_name or payload.username,
         governorate     = payload.governorate,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    typeahead_results.clear()
 
     access, refresh = create_tokens(user.id)
     return schemas.TokenResponse(access_token=access, refresh_token=refresh)
 
 
 @router.post("/auth/login", response_model=schemas.TokenResponse)
-def login(payload: schemas.UserLogin, db: Session = Depends(get_db)):
-    user = db.query(models.ForumUser).filter(models.ForumUser.email == payload.email).first()
-    if not user or not verify_password(payload.password, user.hashed_password):
+async def login(payload: schemas.UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(models.ForumUser).where(models.ForumUser.email == payload.email))
+    valid, new_hash = await verify_password_async(payload.password, user.hashed_password if user else None)
+    if not user or not valid:
         raise HTTPException(401, "Invalid credentials")
     if user.is_banned:
         raise HTTPException(403, "Account is banned")
+    if new_hash:
+        # Cost settings changed since this hash was made
+        user.hashed_password = new_hash
+        await db.commit()
 
     access, refresh = create_tokens(user.id)
     return schemas.TokenResponse(access_token=access, refresh_token=refresh)
@@ -87,47 +109,95 @@ def search_users(
     limit:    int = Query(10, ge=1, le=50),
     db:       Session = Depends(get_db),
 ):
+    # Both ILIKEs are served by the pg_trgm GIN indexes; closest names come first
     users = (
         db.query(models.ForumUser)
         .filter(models.ForumUser.username.ilike(f"%{q}%") | models.ForumUser.display_name.ilike(f"%{q}%"))
+        .order_by(_name_similarity(q).desc(), models.ForumUser.username)
         .limit(limit)
         .all()
     )
     return [schemas.UserPublic.model_validate(u) for u in users]
 
 
-@router.get("/users/{username}", response_model=schemas.UserProfile)
-def get_profile(
-    username: str,
-    db:       Session = Depends(get_db),
-    current:  Optional[models.ForumUser] = Depends(get_current_user_optional),
+def _name_similarity(q: str):
+    return func.greatest(
+        func.similarity(models.ForumUser.username, q),
+        func.similarity(func.coalesce(models.ForumUser.display_name, ""), q),
+    )
+
+
+@router.get("/users/typeahead", response_model=list[schemas.UserPublic])
+def typeahead_users(
+    q:     str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(8, ge=1, le=20),
+    db:    Session = Depends(get_db),
 ):
-    user = db.query(models.ForumUser).filter(models.ForumUser.username == username).first()
-    if not user:
-        raise HTTPException(404, "User not found")
+    """Autocomplete for mentions and the user search box: prefix matches first, then fuzzy ones."""
+    q = q.strip().lower()
+    if not q:
+        return []
+    key = (q, limit)
+    if len(q) <= TYPEAHEAD_CACHED_PREFIX_LEN:
+        cached = typeahead_results.get(key)
+        if cached is not None:
+            return cached
+
+    base = db.query(models.ForumUser).filter(
+        models.ForumUser.is_active == True,
+        models.ForumUser.is_banned == False,
+    )
+    # Prefix fast path — range scans on the lower(...) text_pattern_ops indexes
+    users = (
+        base.filter(or_(
+            func.lower(models.ForumUser.username).startswith(q, autoescape=True),
+            func.lower(models.ForumUser.display_name).startswith(q, autoescape=True),
+        ))
+        .order_by(func.length(models.ForumUser.username), models.ForumUser.username)
+        .limit(limit)
+        .all()
+    )
+    # Top up with trigram matches (typos, infix); needs at least one full trigram
+    if len(users) < limit and len(q) >= 3:
+        seen = [u.id for u in users]
+        fuzzy = base.filter(or_(
+            models.ForumUser.username.op("%")(q),
+            models.ForumUser.display_name.op("%")(q),
+        ))
+        if seen:
+            fuzzy = fuzzy.filter(models.ForumUser.id.notin_(seen))
+        users += fuzzy.order_by(_name_similarity(q).desc()).limit(limit - len(users)).all()
 
-    followers_count = db.query(models.UserFollow).filter(models.UserFollow.following_id == user.id).count()
-    following_count = db.query(models.UserFollow).filter(models.UserFollow.follower_id  == user.id).count()
-    posts_count     = db.query(models.ForumPost) .filter(
-        models.ForumPost.author_id == user.id,
-        models.ForumPost.is_published == True,
-        models.ForumPost.is_deleted == False,
-    ).count()
+    result = [schemas.UserPublic.model_validate(u) for u in users]
+    if len(q) <= TYPEAHEAD_CACHED_PREFIX_LEN:
+        typeahead_results.set(key, result)
+    return result
 
-    is_following = is_blocked = False
-    if current and current.id != user.id:
-        is_following = bool(db.query(models.UserFollow).filter_by(
-            follower_id=current.id, following_id=user.id).first())
-        is_blocked = bool(db.query(models.UserBlock).filter_by(
-            blocker_id=current.id, blocked_id=user.id).first())
 
-    profile = schemas.UserProfile.model_validate(user)
-    profile.followers_count = followers_count
-    profile.following_count = following_count
-    profile.posts_count     = posts_count
-    profile.is_following    = is_following
-    profile.is_blocked      = is_blocked
-    return profile
+@router.get("/users/{username}", response_model=schemas.UserProfile)
+async def get_profile(
+    username: str,
+    db:       AsyncSession = Depends(get_async_db),
+    current:  Optional[models.ForumUser] = Depends(get_current_user_optional_async),
+):
+    # Hot reads run their (sync) ORM code on the asyncpg connection via run_sync:
+    # no threadpool slot is held while Postgres answers
+    def run(db: Session):
+        user = db.query(models.ForumUser).filter(models.ForumUser.username == username).first()
+        if not user:
+            raise HTTPException(404, "User not found")
+
+        # Counters are denormalized on the user row; only the viewer relation needs a query
+        profile = schemas.UserProfile.model_validate(user)
+        if current and current.id != user.id:
+            profile.is_following, profile.is_blocked = db.query(
+                exists().where(models.UserFollow.follower_id == current.id,
+                               models.UserFollow.following_id == user.id),
+                exists().where(models.UserBlock.blocker_id == current.id,
+                               models.UserBlock.blocked_id == user.id),
+            ).one()
+        return profile
+    return await db.run_sync(run)
 
 
 @router.patch("/users/me", response_model=schemas.UserPublic)
@@ -136,10 +206,14 @@ def update_profile(
     db:      Session = Depends(get_db),
     current: models.ForumUser = Depends(get_current_user),
 ):
-    for field, value in payload.model_dump(exclude_none=True).items():
+    changes = payload.model_dump(exclude_none=True)
+    for field, value in changes.items():
         setattr(current, field, value)
+    forget_principal(db, current.id)
     db.commit()
     db.refresh(current)
+    if "display_name" in changes:
+        typeahead_results.clear()
     return current
 
 
@@ -151,21 +225,20 @@ def follow_user(
     db:       Session = Depends(get_db),
     current:  models.ForumUser = Depends(get_current_user),
 ):
-    target = db.query(models.ForumUser).filter(models.ForumUser.username == username).first()
-    if not target:
+    result = crud.follow_user(db, current.id, username)
+    if not result:
         raise HTTPException(404, "User not found")
-    if target.id == current.id:
+    target_id, added = result
+    if target_id == current.id:
         raise HTTPException(400, "Cannot follow yourself")
-
-    existing = db.query(models.UserFollow).filter_by(follower_id=current.id, following_id=target.id).first()
-    if existing:
+    if not added:
         raise HTTPException(400, "Already following")
 
-    db.add(models.UserFollow(follower_id=current.id, following_id=target.id))
-    send_notification(db, user_id=target.id, type="new_follower",
+    timeline.backfill(db, current.id, target_id)
+    send_notification(db, user_id=target_id, type="new_follower",
                       actor_id=current.id, actor_name=current.display_name or current.username)
     db.commit()
-    return {"message": f"Now following {target.username}"}
+    return {"message": f"Now following {username}"}
 
 
 @router.delete("/users/{username}/follow", response_model=schemas.MessageResponse)
@@ -174,16 +247,15 @@ def unfollow_user(
     db:       Session = Depends(get_db),
     current:  models.ForumUser = Depends(get_current_user),
 ):
-    target = db.query(models.ForumUser).filter(models.ForumUser.username == username).first()
-    if not target:
+    result = crud.unfollow_user(db, current.id, username)
+    if not result:
         raise HTTPException(404, "User not found")
-
-    row = db.query(models.UserFollow).filter_by(follower_id=current.id, following_id=target.id).first()
-    if not row:
+    target_id, removed = result
+    if not removed:
         raise HTTPException(400, "Not following this user")
-    db.delete(row)
+    timeline.remove_author(db, current.id, target_id)
     db.commit()
-    return {"message": f"Unfollowed {target.username}"}
+    return {"message": f"Unfollowed {username}"}
 
 
 # ── Block / Report user ───────────────────────────────────────────────────────
@@ -194,17 +266,19 @@ def block_user(
     db:       Session = Depends(get_db),
     current:  models.ForumUser = Depends(get_current_user),
 ):
-    target = db.query(models.ForumUser).filter(models.ForumUser.username == username).first()
-    if not target or target.id == current.id:
+    result = crud.block_user(db, current.id, username)
+    if not result:
         raise HTTPException(404, "User not found")
-
-    if not db.query(models.UserBlock).filter_by(blocker_id=current.id, blocked_id=target.id).first():
-        db.add(models.UserBlock(blocker_id=current.id, blocked_id=target.id))
-        # Also remove follow relationship in both directions
-        db.query(models.UserFollow).filter_by(follower_id=current.id,  following_id=target.id).delete()
-        db.query(models.UserFollow).filter_by(follower_id=target.id, following_id=current.id).delete()
-        db.commit()
-    return {"message": f"Blocked {target.username}"}
+    target_id, added = result
+    scopes = (block_scope(current.id), block_scope(target_id))
+    if added:
+        timeline.remove_author(db, current.id, target_id)
+        timeline.remove_author(db, target_id, current.id)
+        publish_invalidation(db, *scopes)
+    db.commit()
+    if added:
+        invalidate_block_sets(*scopes)
+    return {"message": f"Blocked {username}"}
 
 
 @router.delete("/users/{username}/block", response_model=schemas.MessageResponse)
@@ -216,8 +290,11 @@ def unblock_user(
     target = db.query(models.ForumUser).filter(models.ForumUser.username == username).first()
     if not target:
         raise HTTPException(404, "User not found")
-    db.query(models.UserBlock).filter_by(blocker_id=current.id, blocked_id=target.id).delete()
+    scopes = (block_scope(current.id), block_scope(target.id))
+    if db.query(models.UserBlock).filter_by(blocker_id=current.id, blocked_id=target.id).delete():
+        publish_invalidation(db, *scopes)
     db.commit()
+    invalidate_block_sets(*scopes)
     return {"message": f"Unblocked {target.username}"}
 
 
@@ -327,9 +404,11 @@ def send_message(
         raise HTTPException(404, "User not found")
     msg = models.Message(sender_id=current.id, receiver_id=receiver_id, body=payload.body)
     db.add(msg)
+    db.flush()
+    out = schemas.MessageOut.model_validate(msg)
+    publish_to_user(db, receiver_id, "message", out.model_dump(mode="json"))
     db.commit()
-    db.refresh(msg)
-    return schemas.MessageOut.model_validate(msg)
+    return out
 
 
 @router.put("/messages/{message_id}/read", response_model=schemas.MessageOut)
@@ -350,10 +429,58 @@ def mark_message_read(
 # USER ACTIVITY (posts + comments)
 # ══════════════════════════════════════════════════════════════════════════════
 
+def _encode_cursor(created_at: datetime, ref_id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{ref_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        ts, ref_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(ts), UUID(ref_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(400, "Invalid cursor")
+
+
+def _activity_timeline(user_id: UUID, limit: int, cursor: Optional[tuple[datetime, UUID]]):
+    """
+    One UNION ALL over every activity source, newest first.
+    Each branch is keyset-filtered and limited on its own so Postgres can
+    walk the per-table indexes instead of materialising the whole history.
+    """
+    P, C, L, S, F = models.ForumPost, models.ForumComment, models.PostLike, models.PostShare, models.UserFollow
+
+    def branch(kind: str, ref_col, ts_col, *where):
+        q = select(literal(kind).label("kind"), ref_col.label("ref_id"), ts_col.label("created_at")).where(*where)
+        if cursor:
+            q = q.where(tuple_(ts_col, ref_col) < tuple_(*cursor))
+        return q.order_by(ts_col.desc(), ref_col.desc()).limit(limit)
+
+    live_post = (P.is_deleted == False)
+    timeline = union_all(
+        branch("post", P.id, P.created_at,
+               P.author_id == user_id, P.is_published == True, live_post),
+        branch("comment", C.id, C.created_at,
+               C.author_id == user_id, C.is_deleted == False),
+        branch("like", L.post_id, L.created_at,
+               L.user_id == user_id, L.post_id.in_(select(P.id).where(live_post))),
+        branch("share", S.post_id, S.created_at,
+               S.user_id == user_id, S.post_id.in_(select(P.id).where(live_post))),
+        branch("follow", F.following_id, F.created_at,
+               F.follower_id == user_id),
+    ).subquery()
+    return (
+        select(timeline.c.kind, timeline.c.ref_id, timeline.c.created_at)
+        .order_by(timeline.c.created_at.desc(), timeline.c.ref_id.desc())
+        .limit(limit)
+    )
+
+
 @router.get("/users/{username}/activity", response_model=list[schemas.ActivityItem])
 def user_activity(
     username: str,
     limit:    int = Query(20, ge=1, le=50),
+    cursor:   Optional[str] = Query(None, description="Pass the `cursor` of the last item to get the next page"),
     db:       Session = Depends(get_db),
     current:  Optional[models.ForumUser] = Depends(get_current_user_optional),
 ):
@@ -361,88 +488,69 @@ def user_activity(
     if not user:
         raise HTTPException(404, "User not found")
 
-    items = []
-
-    posts = (
-        db.query(models.ForumPost)
-        .filter(models.ForumPost.author_id == user.id, models.ForumPost.is_published == True, models.ForumPost.is_deleted == False)
-        .order_by(models.ForumPost.created_at.desc())
-        .limit(limit)
-        .all()
-    )
-    for p in posts:
-        items.append(schemas.ActivityItem(
-            type="post", post=_post_out(p, current, db), created_at=p.created_at
-        ))
-
-    comments = (
-        db.query(models.ForumComment)
-        .filter(models.ForumComment.author_id == user.id, models.ForumComment.is_deleted == False)
-        .order_by(models.ForumComment.created_at.desc())
-        .limit(limit)
-        .all()
-    )
-    for c in comments:
-        post = db.query(models.ForumPost).get(c.post_id)
-        co = schemas.CommentOut.model_validate(c)
-        if post:
-            co.post_title = post.title
-        items.append(schemas.ActivityItem(
-            type="comment", comment=co, created_at=c.created_at
-        ))
+    after = _decode_cursor(cursor) if cursor else None
+    rows = db.execute(_activity_timeline(user.id, limit, after)).all()
+
+    # Batched hydration: one round-trip per referenced entity type
+    post_ids    = {r.ref_id for r in rows if r.kind in ("post", "like", "share")}
+    comment_ids = [r.ref_id for r in rows if r.kind == "comment"]
+    user_ids    = [r.ref_id for r in rows if r.kind == "follow"]
+
+    comments = {}
+    if comment_ids:
+        for c in (
+            db.query(models.ForumComment)
+            .options(joinedload(models.ForumComment.author),
+                     selectinload(models.ForumComment.replies).joinedload(models.ForumComment.author))
+            .filter(models.ForumComment.id.in_(comment_ids))
+        ):
+            comments[c.id] = c
+            post_ids.add(c.post_id)
+
+    posts = {}
+    if post_ids:
+        post_rows = (
+            db.query(models.ForumPost)
+            .options(joinedload(models.ForumPost.author), selectinload(models.ForumPost.media_items))
+            .filter(models.ForumPost.id.in_(post_ids))
+            .all()
+        )
+        posts = {p.id: p for p in post_rows}
+    post_outs = {p.id: out for p, out in zip(posts.values(), _posts_out(list(posts.values()), current, db))}
 
-    likes = (
-        db.query(models.PostLike)
-        .filter(models.PostLike.user_id == user.id)
-        .order_by(models.PostLike.created_at.desc())
-        .limit(limit)
-        .all()
-    )
-    for lk in likes:
-        post = db.query(models.ForumPost).get(lk.post_id)
-        if post and not post.is_deleted:
-            items.append(schemas.ActivityItem(
-                type="like",
-                post=_post_out(post, current, db),
-                post_title=post.title,
-                created_at=lk.created_at,
-            ))
+    targets = {}
+    if user_ids:
+        targets = {u.id: u for u in db.query(models.ForumUser).filter(models.ForumUser.id.in_(user_ids))}
 
-    shares = (
-        db.query(models.PostShare)
-        .filter(models.PostShare.user_id == user.id)
-        .order_by(models.PostShare.created_at.desc())
-        .limit(limit)
-        .all()
-    )
-    for sh in shares:
-        post = db.query(models.ForumPost).get(sh.post_id)
-        if post and not post.is_deleted:
-            items.append(schemas.ActivityItem(
-                type="share",
-                post=_post_out(post, current, db),
-                post_title=post.title,
-                created_at=sh.created_at,
-            ))
-
-    follows = (
-        db.query(models.UserFollow)
-        .filter(models.UserFollow.follower_id == user.id)
-        .order_by(models.UserFollow.created_at.desc())
-        .limit(limit)
-        .all()
-    )
-    for fw in follows:
-        target = db.query(models.ForumUser).get(fw.following_id)
-        if target:
+    items = []
+    for r in rows:
+        item_cursor = _encode_cursor(r.created_at, r.ref_id)
+        if r.kind == "comment":
+            c = comments.get(r.ref_id)
+            if not c:
+                continue
+            co = schemas.CommentOut.model_validate(c)
+            if c.post_id in posts:
+                co.post_title = posts[c.post_id].title
+            items.append(schemas.ActivityItem(type="comment", comment=co, created_at=r.created_at, cursor=item_cursor))
+        elif r.kind == "follow":
+            target = targets.get(r.ref_id)
+            if target:
+                items.append(schemas.ActivityItem(
+                    type="follow",
+                    target_user=schemas.UserPublic.model_validate(target),
+                    created_at=r.created_at,
+                    cursor=item_cursor,
+                ))
+        elif r.ref_id in post_outs:
             items.append(schemas.ActivityItem(
-                type="follow",
-                target_user=schemas.UserPublic.model_validate(target),
-                created_at=fw.created_at,
+                type=r.kind,
+                post=post_outs[r.ref_id],
+                post_title=None if r.kind == "post" else posts[r.ref_id].title,
+                created_at=r.created_at,
+                cursor=item_cursor,
             ))
-
-    items.sort(key=lambda x: x.created_at, reverse=True)
-    return items[:limit]
+    return items
 
 
 # ── Followers / Following lists ─────────────────────────────────────────
@@ -502,36 +610,15 @@ async def upload_media(
     if file.content_type not in ALLOWED_TYPES:
         raise HTTPException(400, f"File type {file.content_type} not allowed. Allowed: images (jpeg, png, gif, webp) and videos (mp4, webm)")
 
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(400, "File too large. Maximum size is 50 MB.")
-    if len(content) == 0:
-        raise HTTPException(400, "Empty file.")
-
-    import hashlib
-    import time
-    ext_map = {
-        "image/jpeg": ".jpg", "image/png": ".png", "image/gif": ".gif", "image/webp": ".webp",
-        "video/mp4": ".mp4", "video/webm": ".webm", "video/quicktime": ".mov",
-    }
-    ext = ext_map.get(file.content_type, ".bin")
-    file_hash = hashlib.md5(content).hexdigest()[:8]
-    timestamp = int(time.time())
-    filename = f"{timestamp}_{file_hash}_{file.filename or 'upload'}{ext}"
-
-    import os
-    upload_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "uploads", "forum")
-    os.makedirs(upload_dir, exist_ok=True)
-    file_path = os.path.join(upload_dir, filename)
-
-    with open(file_path, "wb") as f:
-        f.write(content)
+    # Streamed to disk in small chunks on a worker thread; size checked before and during the copy
+    stored = await run_in_threadpool(media.store, file.file, file.content_type, file.size)
 
     file_type = "image" if file.content_type in ALLOWED_IMAGE_TYPES else "video"
-    file_url = f"/api/forum/uploads/{filename}"
-
+    if file_type == "image" and not stored.existing:
+        # Start resizing now; by the time the post is submitted the variants are usually on disk
+        media.generate_variants(stored.url)
     return schemas.FileUploadResponse(
-        file_url=file_url,
+        file_url=stored.url,
         file_type=file_type,
         mime_type=file.content_type,
         file_name=file.filename or "upload",
@@ -542,80 +629,212 @@ async def upload_media(
 # POSTS
 # ══════════════════════════════════════════════════════════════════════════════
 
-def _post_out(post: models.ForumPost, current: Optional[models.ForumUser], db: Session) -> schemas.PostOut:
-    is_liked = False
-    if current:
-        is_liked = bool(db.query(models.PostLike).filter_by(post_id=post.id, user_id=current.id).first())
-    out = schemas.PostOut.model_validate(post)
-    out.is_liked = is_liked
-
-    # Populate media from PostMedia relationship
-    media_items = []
-    media_urls = []
-    for m in post.media_items:
-        media_items.append(schemas.PostMediaOut.model_validate(m))
-        media_urls.append(m.file_url)
-    out.media_items = media_items
-    out.media_urls = media_urls
-
-    # Populate liked_by and shared_by user lists
-    likers = (
-        db.query(models.ForumUser)
-        .join(models.PostLike, models.PostLike.user_id == models.ForumUser.id)
-        .filter(models.PostLike.post_id == post.id)
-        .limit(20)
+def _users_by_post(db: Session, link, post_ids: list, per_post: int = 20) -> dict:
+    """Up to `per_post` users per post from a post→user link table, in one query."""
+    rn = func.row_number().over(partition_by=link.post_id, order_by=link.created_at.desc()).label("rn")
+    ranked = (
+        db.query(link.post_id.label("post_id"), link.user_id.label("user_id"), rn)
+        .filter(link.post_id.in_(post_ids))
+        .subquery()
+    )
+    rows = (
+        db.query(ranked.c.post_id, models.ForumUser)
+        .join(models.ForumUser, models.ForumUser.id == ranked.c.user_id)
+        .filter(ranked.c.rn <= per_post)
+        .order_by(ranked.c.post_id, ranked.c.rn)
         .all()
     )
-    out.liked_by = [schemas.UserPublic.model_validate(u) for u in likers]
+    out: dict = {}
+    for post_id, user in rows:
+        out.setdefault(post_id, []).append(schemas.UserPublic.model_validate(user))
+    return out
 
-    sharers = (
-        db.query(models.ForumUser)
-        .join(models.PostShare, models.PostShare.user_id == models.ForumUser.id)
-        .filter(models.PostShare.post_id == post.id)
-        .limit(20)
-        .all()
+
+def _posts_out(posts: list, current: Optional[models.ForumUser], db: Session) -> list[schemas.PostOut]:
+    """Serialise a page of posts with a fixed number of queries, whatever the page size."""
+    if not posts:
+        return []
+    post_ids = [p.id for p in posts]
+
+    liked_ids = set()
+    if current:
+        liked_ids = {
+            row[0] for row in db.query(models.PostLike.post_id)
+            .filter(models.PostLike.user_id == current.id, models.PostLike.post_id.in_(post_ids))
+        }
+    likers  = _users_by_post(db, models.PostLike,  post_ids)
+    sharers = _users_by_post(db, models.PostShare, post_ids)
+
+    result = []
+    for post in posts:
+        out = schemas.PostOut.model_validate(post)
+        out.is_liked = post.id in liked_ids
+
+        # Populate media from PostMedia relationship
+        out.media_items = [schemas.PostMediaOut.model_validate(m) for m in post.media_items]
+        out.media_urls  = [m.file_url for m in post.media_items]
+
+        out.liked_by  = likers.get(post.id, [])
+        out.shared_by = sharers.get(post.id, [])
+        result.append(out)
+    # Likes/shares/comments not yet flushed by the counter service
+    return counters.apply_pending("forum_posts", result, "likes_count", "shares_count", "comments_count")
+
+
+def _post_out(post: models.ForumPost, current: Optional[models.ForumUser], db: Session) -> schemas.PostOut:
+    return _posts_out([post], current, db)[0]
+
+
+def _feed_query(db: Session):
+    """Base query for post pages: author and media come back with the posts."""
+    return db.query(models.ForumPost).options(
+        joinedload(models.ForumPost.author),
+        selectinload(models.ForumPost.media_items),
     )
-    out.shared_by = [schemas.UserPublic.model_validate(u) for u in sharers]
 
-    return out
+
+def _not_blocked(user_id: UUID):
+    """
+    Post filter: the author neither blocked nor was blocked by `user_id`. An
+    anti-join against user_blocks (both directions are indexed), so the plan
+    does not depend on how many users someone has blocked.
+    """
+    block = models.UserBlock
+    return ~exists().where(or_(
+        and_(block.blocker_id == user_id, block.blocked_id == models.ForumPost.author_id),
+        and_(block.blocked_id == user_id, block.blocker_id == models.ForumPost.author_id),
+    ))
 
 
 @router.get("/posts", response_model=schemas.PaginatedPosts)
-def list_posts(
+async def list_posts(
     page:        int = Query(1, ge=1),
     size:        int = Query(20, ge=1, le=100),
     category:    Optional[str] = None,
     governorate: Optional[str] = None,
     risk_level:  Optional[str] = None,
-    db:          Session = Depends(get_db),
-    current:     Optional[models.ForumUser] = Depends(get_current_user_optional),
+    sort:        str = Query("new", pattern="^(new|hot)$"),
+    db:          AsyncSession = Depends(get_async_db),
+    current:     Optional[models.ForumUser] = Depends(get_current_user_optional_async),
 ):
-    q = db.query(models.ForumPost).filter(
+    def run(db: Session):
+        q = _feed_query(db).filter(
+            models.ForumPost.is_published == True,
+            models.ForumPost.is_deleted   == False,
+        )
+        if category:
+            q = q.filter(models.ForumPost.category == category)
+        if governorate:
+            q = q.filter(models.ForumPost.governorate == governorate)
+        if risk_level:
+            q = q.filter(models.ForumPost.risk_level == risk_level)
+
+        # Hide posts from users who blocked the current user (or were blocked by them)
+        if current:
+            q = q.filter(_not_blocked(current.id))
+
+        # "hot" walks ix_forum_posts_hot; scores are kept current by Postgres (forum/ranking.py)
+        order  = models.ForumPost.hot_score.desc() if sort == "hot" else models.ForumPost.created_at.desc()
+        total  = q.count()
+        posts  = q.order_by(order, models.ForumPost.id).offset((page - 1) * size).limit(size).all()
+        return schemas.PaginatedPosts(
+            items=_posts_out(posts, current, db),
+            total=total, page=page, size=size, pages=math.ceil(total / size),
+        )
+    return await db.run_sync(run)
+
+
+@router.get("/posts/search", response_model=schemas.PaginatedPostSearch)
+def search_posts(
+    q:       str = Query(..., min_length=2, max_length=200),
+    page:    int = Query(1, ge=1),
+    size:    int = Query(20, ge=1, le=50),
+    db:      Session = Depends(get_db),
+    current: Optional[models.ForumUser] = Depends(get_current_user_optional),
+):
+    """Full-text search over published posts, best match first, with highlighted snippets."""
+    query = tsquery(q)
+    rank  = func.ts_rank_cd(models.ForumPost.search_vector, query)
+    base  = _feed_query(db).filter(
         models.ForumPost.is_published == True,
         models.ForumPost.is_deleted   == False,
+        models.ForumPost.search_vector.op("@@")(query),
     )
-    if category:
-        q = q.filter(models.ForumPost.category == category)
-    if governorate:
-        q = q.filter(models.ForumPost.governorate == governorate)
-    if risk_level:
-        q = q.filter(models.ForumPost.risk_level == risk_level)
-
-    # Hide posts from users who blocked the current user (or were blocked by them)
     if current:
-        blocked_ids = [r.blocked_id  for r in db.query(models.UserBlock).filter_by(blocker_id=current.id).all()]
-        blocker_ids = [r.blocker_id  for r in db.query(models.UserBlock).filter_by(blocked_id=current.id).all()]
-        hidden_ids  = list(set(blocked_ids + blocker_ids))
-        if hidden_ids:
-            q = q.filter(models.ForumPost.author_id.notin_(hidden_ids))
-
-    total  = q.count()
-    posts  = q.order_by(models.ForumPost.created_at.desc()).offset((page - 1) * size).limit(size).all()
-    return schemas.PaginatedPosts(
-        items=[_post_out(p, current, db) for p in posts],
-        total=total, page=page, size=size, pages=math.ceil(total / size),
+        base = base.filter(_not_blocked(current.id))
+
+    total = base.count()
+    rows  = (
+        base.add_columns(rank)
+        .order_by(rank.desc(), models.ForumPost.created_at.desc())
+        .offset((page - 1) * size).limit(size).all()
     )
 
+    # ts_headline re-parses the text, so only run it for the rows on this page
+    highlights = {}
+    if rows:
+        highlights = {
+            row.id: (row.title_hl, row.body_hl)
+            for row in db.query(
+                models.ForumPost.id,
+                headline(models.ForumPost.title, query).label("title_hl"),
+                headline(models.ForumPost.body,  query).label("body_hl"),
+            ).filter(models.ForumPost.id.in_([post.id for post, _ in rows]))
+        }
+
+    items = []
+    for (post, score), out in zip(rows, _posts_out([post for post, _ in rows], current, db)):
+        title_hl, body_hl = highlights.get(post.id, (None, None))
+        items.append(schemas.PostSearchHit(
+            **out.model_dump(),
+            rank=score,
+            title_highlight=render_headline(title_hl),
+            body_highlight=render_headline(body_hl),
+        ))
+    return schemas.PaginatedPostSearch(
+        items=items, total=total, page=page, size=size, pages=math.ceil(total / size),
+    )
+
+
+@router.get("/feed/following", response_model=schemas.TimelinePage)
+async def following_feed(
+    cursor:  Optional[str] = None,
+    size:    int = Query(20, ge=1, le=50),
+    db:      AsyncSession = Depends(get_async_db),
+    current: models.ForumUser = Depends(get_current_user_async),
+):
+    """Posts from followed users (and your own), newest first, keyset-paged."""
+    def run(db: Session):
+        rows = timeline.page(db, current.id, timeline.decode_cursor(cursor) if cursor else None, size)
+        if not rows:
+            return schemas.TimelinePage(items=[])
+
+        q = _feed_query(db).filter(
+            models.ForumPost.id.in_([r.post_id for r in rows]),
+            models.ForumPost.is_published == True,
+            models.ForumPost.is_deleted   == False,
+            _not_blocked(current.id),
+        )
+        by_id = {p.id: p for p in q.all()}
+        posts = [by_id[r.post_id] for r in rows if r.post_id in by_id]
+
+        last = rows[-1]
+        return schemas.TimelinePage(
+            items=_posts_out(posts, current, db),
+            next_cursor=timeline.encode_cursor(last.created_at, last.post_id) if len(rows) == size else None,
+        )
+    return await db.run_sync(run)
+
+
+@router.get("/posts/trending", response_model=schemas.TrendingOut)
+def trending_topics(db: Session = Depends(get_db)):
+    """Governorates and categories with the most engagement on recent posts (cached for a minute)."""
+    topics = trending_topics_cache.get(TRENDING_WINDOW_HOURS)
+    if topics is None:
+        topics = trending(db)
+        trending_topics_cache.set(TRENDING_WINDOW_HOURS, topics)
+    return topics
+
 
 @router.post("/posts/check", response_model=schemas.AICheckResult)
 async def check_post_ai(
@@ -632,21 +851,17 @@ async def check_post_ai(
     )
 
 
-@router.post("/posts", response_model=schemas.PostOut, status_code=201)
-async def create_post(
+@router.post("/posts", response_model=schemas.PostOut, status_code=202)
+def create_post(
     payload: schemas.PostCreate,
     db:      Session = Depends(get_db),
     current: models.ForumUser = Depends(get_current_user),
 ):
-    # Run AI moderation
-    ai_result = await moderate_text(
-        content_type="post",
-        title=payload.title,
-        body=payload.body,
-        category=payload.category,
-        governorate=payload.governorate,
-    )
-
+    """
+    Saves the post unpublished and queues it for AI moderation (moderation_queue.py).
+    The author gets post_approved / post_rejected when it is judged; until then
+    ai_checked_at is null.
+    """
     post = models.ForumPost(
         author_id     = current.id,
         title         = payload.title,
@@ -655,43 +870,33 @@ async def create_post(
         governorate   = payload.governorate,
         risk_level    = payload.risk_level,
         image_url     = payload.image_url,
-        ai_approved   = ai_result.approved,
-        ai_reason     = ai_result.reason,
-        ai_checked_at = datetime.now(timezone.utc),
-        is_published  = ai_result.approved,
+        ai_approved   = False,
+        is_published  = False,
     )
     db.add(post)
     db.flush()
 
     # Save media attachments
+    attachments = []
     if payload.media_urls:
         for url in payload.media_urls:
             file_type = "video" if any(url.endswith(ext) for ext in (".mp4", ".webm", ".mov")) else "image"
             mime = "video/mp4" if file_type == "video" else "image/jpeg"
-            media = models.PostMedia(
+            attachment = models.PostMedia(
                 post_id   = post.id,
                 file_url  = url,
                 file_type = file_type,
                 mime_type = mime,
                 file_name = url.split("/")[-1] if "/" in url else url,
             )
-            db.add(media)
+            db.add(attachment)
+            attachments.append(attachment)
 
-    # Notify author about AI decision
-    notif_type = "post_approved" if ai_result.approved else "post_rejected"
-    send_notification(db, user_id=current.id, type=notif_type, post_id=post.id,
-                      extra={"reason": ai_result.reason})
+    moderation_queue.enqueue(db, post.id)
     db.commit()
     db.refresh(post)
-
-    if not ai_result.approved:
-        raise HTTPException(
-            status_code=422,
-            detail={
-                "message": "Post not published: content not relevant to WeatherGuardTN forum.",
-                "ai_reason": ai_result.reason,
-            }
-        )
+    media.attach_variants(attachments)
+    moderation_queue.wake()
     return _post_out(post, current, db)
 
 
@@ -711,7 +916,7 @@ def get_post(
 
 
 @router.patch("/posts/{post_id}", response_model=schemas.PostOut)
-async def update_post(
+def update_post(
     post_id: UUID,
     payload: schemas.PostUpdate,
     db:      Session = Depends(get_db),
@@ -723,22 +928,34 @@ async def update_post(
     if post.author_id != current.id and current.role not in ("moderator","admin"):
         raise HTTPException(403, "Forbidden")
 
+    judged = moderation_queue.judged_content(post)
     for field, value in payload.model_dump(exclude_none=True).items():
         setattr(post, field, value)
 
-    # Re-run AI moderation on body/title changes
-    if payload.body or payload.title:
-        ai_result = await moderate_text(
-            content_type="post", title=post.title, body=post.body,
-            category=post.category, governorate=post.governorate,
-        )
-        post.ai_approved  = ai_result.approved
-        post.ai_reason    = ai_result.reason
-        post.ai_checked_at = datetime.now(timezone.utc)
-        post.is_published = ai_result.approved
-
+    was_published = post.is_published
+
+    # Changes to anything the model judged go back through AI moderation; the post is hidden until then
+    remoderate = moderation_queue.judged_content(post) != judged
+    if remoderate:
+        post.ai_approved   = False
+        post.ai_reason     = None
+        post.ai_checked_at = None
+        post.is_published  = False
+        moderation_queue.enqueue(db, post.id)
+
+    if post.is_published != was_published:
+        crud.adjust_user_counters(db, post.author_id, posts=+1 if post.is_published else -1)
+        db.flush()
+        if post.is_published:
+            timeline.fan_out(db, post.id)
+        else:
+            timeline.remove_post(db, post.id)
+    if post.is_published or was_published:
+        publish_invalidation(db, "forum")
     db.commit()
     db.refresh(post)
+    if remoderate:
+        moderation_queue.wake()
     return _post_out(post, current, db)
 
 
@@ -754,6 +971,11 @@ def delete_post(
     if post.author_id != current.id and current.role not in ("moderator","admin"):
         raise HTTPException(403, "Forbidden")
     post.is_deleted = True
+    if post.is_published:
+        crud.adjust_user_counters(db, post.author_id, posts=-1)
+    timeline.remove_post(db, post.id)
+    if post.is_published:
+        publish_invalidation(db, "forum")
     db.commit()
     return {"message": "Post deleted"}
 
@@ -766,17 +988,18 @@ def like_post(
     db:      Session = Depends(get_db),
     current: models.ForumUser = Depends(get_current_user),
 ):
-    post = db.query(models.ForumPost).filter_by(id=post_id, is_published=True, is_deleted=False).first()
-    if not post:
+    result = crud.like_post(db, post_id, current.id)
+    if not result:
         raise HTTPException(404, "Post not found")
-    if db.query(models.PostLike).filter_by(post_id=post_id, user_id=current.id).first():
+    author_id, added = result
+    if not added:
         raise HTTPException(400, "Already liked")
-    db.add(models.PostLike(post_id=post_id, user_id=current.id))
-    if post.author_id != current.id:
-        send_notification(db, user_id=post.author_id, type="post_like",
+    if author_id != current.id:
+        send_notification(db, user_id=author_id, type="post_like",
                           actor_id=current.id, actor_name=current.display_name or current.username,
                           post_id=post_id)
     db.commit()
+    counters.bump("forum_posts", "likes_count", post_id, +1)
     return {"message": "Post liked"}
 
 
@@ -786,11 +1009,10 @@ def unlike_post(
     db:      Session = Depends(get_db),
     current: models.ForumUser = Depends(get_current_user),
 ):
-    row = db.query(models.PostLike).filter_by(post_id=post_id, user_id=current.id).first()
-    if not row:
+    if not crud.unlike_post(db, post_id, current.id):
         raise HTTPException(400, "Not liked")
-    db.delete(row)
     db.commit()
+    counters.bump("forum_posts", "likes_count", post_id, -1)
     return {"message": "Post unliked"}
 
 
@@ -804,12 +1026,12 @@ def share_post(
     if not post:
         raise HTTPException(404, "Post not found")
     db.add(models.PostShare(post_id=post_id, user_id=current.id))
-    post.shares_count += 1
     if post.author_id != current.id:
         send_notification(db, user_id=post.author_id, type="post_share",
                           actor_id=current.id, actor_name=current.display_name or current.username,
                           post_id=post_id)
     db.commit()
+    counters.bump("forum_posts", "shares_count", post_id, +1)
     return {"message": "Post shared"}
 
 
@@ -891,6 +1113,8 @@ def _build_comment_tree(comments: list, current_id: Optional[UUID], db: Session)
     for c in comments:
         key = str(c.parent_id) if c.parent_id else "root"
         by_parent.setdefault(key, []).append(c)
+    # Likes not yet flushed by the counter service
+    pending_likes = counters.pending("forum_comments", "likes_count", [c.id for c in comments])
 
     def to_out(c: models.ForumComment) -> schemas.CommentOut:
         is_liked = False
@@ -899,6 +1123,7 @@ def _build_comment_tree(comments: list, current_id: Optional[UUID], db: Session)
                 comment_id=c.id, user_id=current_id).first())
         out = schemas.CommentOut.model_validate(c)
         out.is_liked = is_liked
+        out.likes_count += pending_likes.get(c.id, 0)
         out.replies  = [to_out(r) for r in by_parent.get(str(c.id), [])]
         return out
 
@@ -952,6 +1177,7 @@ async def create_comment(
                           actor_id=current.id, actor_name=current.display_name or current.username,
                           post_id=post_id, comment_id=comment.id)
     db.commit()
+    counters.bump("forum_posts", "comments_count", post_id, +1)
     db.refresh(comment)
 
     out = schemas.CommentOut.model_validate(comment)
@@ -973,6 +1199,7 @@ def delete_comment(
         raise HTTPException(403, "Forbidden")
     comment.is_deleted = True
     db.commit()
+    counters.bump("forum_posts", "comments_count", comment.post_id, -1)
     return {"message": "Comment deleted"}
 
 
@@ -982,17 +1209,18 @@ def like_comment(
     db:         Session = Depends(get_db),
     current:    models.ForumUser = Depends(get_current_user),
 ):
-    comment = db.query(models.ForumComment).filter_by(id=comment_id, is_deleted=False).first()
-    if not comment:
+    result = crud.like_forum_comment(db, comment_id, current.id)
+    if not result:
         raise HTTPException(404, "Comment not found")
-    if db.query(models.CommentLike).filter_by(comment_id=comment_id, user_id=current.id).first():
+    author_id, added = result
+    if not added:
         raise HTTPException(400, "Already liked")
-    db.add(models.CommentLike(comment_id=comment_id, user_id=current.id))
-    if comment.author_id != current.id:
-        send_notification(db, user_id=comment.author_id, type="comment_like",
+    if author_id != current.id:
+        send_notification(db, user_id=author_id, type="comment_like",
                           actor_id=current.id, actor_name=current.display_name or current.username,
                           comment_id=comment_id)
     db.commit()
+    counters.bump("forum_comments", "likes_count", comment_id, +1)
     return {"message": "Comment liked"}
 
 
@@ -1002,11 +1230,10 @@ def unlike_comment(
     db:         Session = Depends(get_db),
     current:    models.ForumUser = Depends(get_current_user),
 ):
-    row = db.query(models.CommentLike).filter_by(comment_id=comment_id, user_id=current.id).first()
-    if not row:
+    if not crud.unlike_forum_comment(db, comment_id, current.id):
         raise HTTPException(400, "Not liked")
-    db.delete(row)
     db.commit()
+    counters.bump("forum_comments", "likes_count", comment_id, -1)
     return {"message": "Comment unliked"}
 
 
@@ -1031,27 +1258,78 @@ def report_comment(
 # ══════════════════════════════════════════════════════════════════════════════
 
 @router.get("/notifications", response_model=List[schemas.NotificationOut])
-def get_notifications(
+async def get_notifications(
     unread_only: bool = False,
     limit:       int  = Query(30, ge=1, le=100),
-    db:          Session = Depends(get_db),
-    current:     models.ForumUser = Depends(get_current_user),
+    db:          AsyncSession = Depends(get_async_db),
+    current:     models.ForumUser = Depends(get_current_user_async),
 ):
-    q = db.query(models.Notification).filter(models.Notification.user_id == current.id)
+    q = select(models.Notification).where(models.Notification.user_id == current.id)
     if unread_only:
-        q = q.filter(models.Notification.is_read == False)
-    return q.order_by(models.Notification.created_at.desc()).limit(limit).all()
+        q = q.where(models.Notification.is_read == False)
+    return (await db.scalars(q.order_by(models.Notification.created_at.desc()).limit(limit))).all()
 
 
 @router.get("/notifications/unread-count")
-def unread_count(
-    db:      Session = Depends(get_db),
-    current: models.ForumUser = Depends(get_current_user),
+async def unread_count(
+    db:      AsyncSession = Depends(get_async_db),
+    current: models.ForumUser = Depends(get_current_user_async),
 ):
-    count = db.query(models.Notification).filter_by(user_id=current.id, is_read=False).count()
+    count = await db.scalar(
+        select(func.count()).select_from(models.Notification)
+        .where(models.Notification.user_id == current.id, models.Notification.is_read == False)
+    )
     return {"count": count}
 
 
+def _stream_user(ticket: str) -> models.ForumUser:
+    # Short-lived session: a stream can stay open for hours and must not pin a pooled connection
+    db = SessionLocal()
+    try:
+        return redeem_stream_ticket(ticket, db)
+    finally:
+        db.close()
+
+
+@router.post("/events/ticket", response_model=schemas.StreamTicket)
+def event_stream_ticket(current: models.ForumUser = Depends(get_current_user)):
+    """A single-use ticket that opens /events within a few seconds (fetch a new one to reconnect)."""
+    return schemas.StreamTicket(ticket=create_stream_ticket(current.id), expires_in=STREAM_TICKET_SECONDS)
+
+
+@router.get("/events")
+async def event_stream(
+    request: Request,
+    ticket:  str = Query(..., description="From POST /events/ticket (EventSource cannot send headers)"),
+):
+    """
+    Server-sent events: `notification`, `message`, `news_alert`, `news_update`.
+    Replaces polling /notifications/unread-count and the message endpoints.
+    """
+    user = await run_in_threadpool(_stream_user, ticket)
+    sub  = broker.subscribe(user.id, user.governorate)
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    msg = await asyncio.wait_for(sub.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {msg['event']}\ndata: {json.dumps(msg['data'])}\n\n"
+        finally:
+            broker.unsubscribe(sub)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={
+        "Cache-Control":     "no-cache",
+        "X-Accel-Buffering": "no",   # stop nginx from buffering the stream
+    })
+
+
 @router.post("/notifications/read-all", response_model=schemas.MessageResponse)
 def mark_all_read(
     db:      Session = Depends(get_db),
@@ -1081,25 +1359,116 @@ def mark_read(
 # ══════════════════════════════════════════════════════════════════════════════
 
 @router.get("/users/{username}/posts", response_model=schemas.PaginatedPosts)
-def user_posts(
+async def user_posts(
     username: str,
     page:     int = Query(1, ge=1),
     size:     int = Query(20, ge=1, le=100),
-    db:       Session = Depends(get_db),
-    current:  Optional[models.ForumUser] = Depends(get_current_user_optional),
+    db:       AsyncSession = Depends(get_async_db),
+    current:  Optional[models.ForumUser] = Depends(get_current_user_optional_async),
 ):
-    user = db.query(models.ForumUser).filter(models.ForumUser.username == username).first()
-    if not user:
-        raise HTTPException(404, "User not found")
+    # Hot reads run their (sync) ORM code on the asyncpg connection via run_sync:
+    # no threadpool slot is held while Postgres answers
+    def run(db: Session):
+        user = db.query(models.ForumUser).filter(models.ForumUser.username == username).first()
+        if not user:
+            raise HTTPException(404, "User not found")
+
+        q = _feed_query(db).filter(
+            models.ForumPost.author_id   == user.id,
+            models.ForumPost.is_published == True,
+            models.ForumPost.is_deleted   == False,
+        )
+        total = q.count()
+        posts = q.order_by(models.ForumPost.created_at.desc()).offset((page-1)*size).limit(size).all()
+        return schemas.PaginatedPosts(
+            items=_posts_out(posts, current, db),
+            total=total, page=page, size=size, pages=math.ceil(total/size),
+        )
+    return await db.run_sync(run)
 
-    q = db.query(models.ForumPost).filter(
-        models.ForumPost.author_id   == user.id,
-        models.ForumPost.is_published == True,
-        models.ForumPost.is_deleted   == False,
-    )
-    total = q.count()
-    posts = q.order_by(models.ForumPost.created_at.desc()).offset((page-1)*size).limit(size).all()
-    return schemas.PaginatedPosts(
-        items=[_post_out(p, current, db) for p in posts],
-        total=total, page=page, size=size, pages=math.ceil(total/size),
+
+# ══════════════════════════════════════════════════════════════════════════════
+# DELTA SYNC (mobile clients)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _sync_comment_out(c: models.ForumComment) -> schemas.CommentOut:
+    # Flat: clients rebuild threads from parent_id, and replies would lazy-load per row
+    return schemas.CommentOut(
+        id=c.id, post_id=c.post_id, parent_id=c.parent_id, body=c.body,
+        ai_approved=c.ai_approved, ai_reason=c.ai_reason, likes_count=c.likes_count,
+        created_at=c.created_at, author=schemas.UserPublic.model_validate(c.author),
     )
+
+
+@router.get("/sync", response_model=schemas.SyncResponse)
+def sync_changes(
+    since:   Optional[str] = Query(None, description="Cursor from the previous /sync response"),
+    limit:   int = Query(200, ge=1, le=500),
+    db:      Session = Depends(get_db),
+    current: models.ForumUser = Depends(get_current_user),
+):
+    """
+    Posts, comments, news, own notifications and messages created, updated or deleted
+    since `since`. Without a usable cursor, returns reset=True and a fresh cursor:
+    load the lists once, then keep calling /sync with the cursor it hands back.
+    """
+    horizon = sync.visible_horizon(db)
+    if since is None:
+        return schemas.SyncResponse(cursor=sync.encode_cursor(horizon, 0), reset=True)
+    xid, seq, issued = sync.decode_cursor(since)
+    if sync.cursor_expired(issued):
+        return schemas.SyncResponse(cursor=sync.encode_cursor(horizon, 0), reset=True)
+
+    rows     = sync.changes_since(db, current.id, xid, seq, horizon, limit)
+    has_more = len(rows) == limit
+    position = max([(xid, seq)] + [(r.change_xid, r.change_seq) for r in rows[-1:]])
+    if not has_more:
+        # Nothing else below the horizon, so the client can jump to it
+        position = max(position, (horizon, 0))
+    out = schemas.SyncResponse(cursor=sync.encode_cursor(*position), has_more=has_more)
+
+    ids: dict[str, list] = {}
+    for r in rows:
+        if r.kind.startswith("deleted:"):
+            out.deleted.append(schemas.SyncDeleted(type=sync.KIND_BY_TABLE[r.kind[8:]], id=r.ref_id))
+        else:
+            ids.setdefault(r.kind, []).append(r.ref_id)
+
+    hidden = hidden_author_ids(db, current.id) if ids.get("post") or ids.get("comment") else frozenset()
+    if ids.get("post"):
+        visible = []
+        for post in _feed_query(db).filter(models.ForumPost.id.in_(ids["post"])):
+            if post.is_published and not post.is_deleted and post.author_id not in hidden:
+                visible.append(post)
+            else:
+                out.deleted.append(schemas.SyncDeleted(type="post", id=post.id))
+        out.posts = _posts_out(visible, current, db)
+    if ids.get("comment"):
+        # Same visibility as the comment lists: a live comment on a live post, neither by a blocked user
+        for c, post_author, post_live in (
+            db.query(models.ForumComment, models.ForumPost.author_id,
+                     models.ForumPost.is_published & ~models.ForumPost.is_deleted)
+            .join(models.ForumPost, models.ForumPost.id == models.ForumComment.post_id)
+            .options(joinedload(models.ForumComment.author))
+            .filter(models.ForumComment.id.in_(ids["comment"]))
+        ):
+            if c.is_deleted or not post_live or c.author_id in hidden or post_author in hidden:
+                out.deleted.append(schemas.SyncDeleted(type="comment", id=c.id))
+            else:
+                out.comments.append(_sync_comment_out(c))
+    if ids.get("news"):
+        out.news = [
+            schemas.NewsArticleOut.model_validate(a)
+            for a in db.query(models.NewsArticle).filter(models.NewsArticle.id.in_(ids["news"]))
+        ]
+    if ids.get("notification"):
+        out.notifications = [
+            schemas.NotificationOut.model_validate(n)
+            for n in db.query(models.Notification).filter(models.Notification.id.in_(ids["notification"]))
+        ]
+    if ids.get("message"):
+        out.messages = [
+            schemas.MessageOut.model_validate(m)
+            for m in db.query(models.Message).filter(models.Message.id.in_(ids["message"]))
+        ]
+    return out
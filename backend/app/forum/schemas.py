@@ -4,7 +4,7 @@ Pydantic v2 request / response schemas for the forum feature.
 """
 from __future__ import annotations
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 from uuid import UUID
 from pydantic import BaseModel, EmailStr, field_validator, model_validator, Field, HttpUrl
 
@@ -45,6 +45,11 @@ class TokenResponse(BaseModel):
     token_type:    str = "bearer"
 
 
+class StreamTicket(BaseModel):
+    ticket:     str   # for GET /events?ticket=…, once
+    expires_in: int   # seconds
+
+
 class UserPublic(BaseModel):
     id:           UUID
     username:     str
@@ -76,12 +81,26 @@ class UserUpdate(BaseModel):
 # ─────────────────────────────────────────────
 # Posts
 # ─────────────────────────────────────────────
+class MediaVariantOut(BaseModel):
+    width:  int
+    height: int
+    webp:   str
+    jpeg:   str
+
+
 class PostMediaOut(BaseModel):
     id:        UUID
     file_url:  str
     file_type: str  # "image" or "video"
     mime_type: Optional[str]
     file_name: Optional[str]
+    # "thumb" (320px) / "feed" (960px) / "full" (2048px); empty until generated
+    variants:  Dict[str, MediaVariantOut] = {}
+
+    @field_validator("variants", mode="before")
+    @classmethod
+    def none_as_empty(cls, v):
+        return v or {}
 
     model_config = {"from_attributes": True}
 
@@ -146,6 +165,7 @@ class PostOut(BaseModel):
     media_items:    List[PostMediaOut] = []
     ai_approved:    bool
     ai_reason:      Optional[str]
+    ai_checked_at:  Optional[datetime] = None   # null while the post waits for moderation
     likes_count:    int
     comments_count: int
     shares_count:   int
@@ -186,6 +206,7 @@ class CommentOut(BaseModel):
     replies:     List["CommentOut"] = []
     is_liked:    bool = False
     post_title:  Optional[str] = None
+    post_id:     Optional[UUID] = None
 
     model_config = {"from_attributes": True}
 
@@ -234,6 +255,7 @@ class ActivityItem(BaseModel):
     target_user: Optional[UserPublic] = None
     post_title: Optional[str] = None
     created_at: datetime
+    cursor: Optional[str] = None  # keyset cursor for fetching the next page
 
 
 # ─────────────────────────────────────────────
@@ -260,6 +282,38 @@ class PaginatedPosts(BaseModel):
     pages:   int
 
 
+class TimelinePage(BaseModel):
+    items:       List[PostOut]
+    next_cursor: Optional[str] = None   # pass back as ?cursor= for the next page
+
+
+class PostSearchHit(PostOut):
+    rank:            float = 0.0
+    title_highlight: str = ""   # HTML-escaped, matches wrapped in <mark>
+    body_highlight:  str = ""
+
+
+class PaginatedPostSearch(BaseModel):
+    items:   List[PostSearchHit]
+    total:   int
+    page:    int
+    size:    int
+    pages:   int
+
+
+class TrendingTopic(BaseModel):
+    key:    str
+    score:  int     # posts + weighted likes / comments / shares in the window
+    posts:  int
+
+
+class TrendingOut(BaseModel):
+    window_hours: int
+    governorates: List[TrendingTopic]
+    categories:   List[TrendingTopic]
+    computed_at:  datetime
+
+
 class PaginatedComments(BaseModel):
     items: List[CommentOut]
     total: int
@@ -399,6 +453,7 @@ class NotificationOut(BaseModel):
     post_id:         Optional[UUID] = None
     comment_id:      Optional[UUID] = None
     news_article_id: Optional[UUID] = None
+    group_count:     int = 1   # >1 when several events were merged into this row
     is_read:         bool
     created_at:      datetime
  
@@ -430,4 +485,23 @@ class ScraperRunResult(BaseModel):
     articles_skip: int
     errors:        List[str] = []
     ran_at:        datetime
- 
\ No newline at end of file
+
+
+# ─────────────────────────────────────────────
+# Delta sync
+# ─────────────────────────────────────────────
+class SyncDeleted(BaseModel):
+    type: str    # post | comment | news | notification | message
+    id:   UUID
+
+
+class SyncResponse(BaseModel):
+    cursor:        str
+    has_more:      bool = False
+    reset:         bool = False   # cursor missing or too old: reload the lists, then sync from `cursor`
+    posts:         List[PostOut] = []
+    comments:      List[CommentOut] = []
+    news:          List[NewsArticleOut] = []
+    notifications: List[NotificationOut] = []
+    messages:      List[MessageOut] = []
+    deleted:       List[SyncDeleted] = []
@@ -0,0 +1,72 @@
+"""
+backend/forum/search.py
+Postgres full-text search helpers shared by forum posts and news articles.
+
+Documents are indexed twice: with the French configuration (stemming and
+stop words for French text) and with the 'simple' configuration, which only
+lower-cases tokens and so keeps Arabic and Latin-script Tunisian words
+searchable as typed. Titles weigh more than bodies (A vs B).
+
+User lookups use pg_trgm instead: GIN trigram indexes serve ILIKE '%q%' and
+similarity ranking, and lower(...) text_pattern_ops indexes serve prefix
+matches for typeahead.
+"""
+from __future__ import annotations
+import html
+
+from sqlalchemy import func
+
+SEARCH_CONFIGS = ("french", "simple")
+
+# Sentinels survive ts_headline untouched and are swapped for <mark> after escaping
+_START, _STOP = "\x02", "\x03"
+HEADLINE_OPTIONS = (
+    f"StartSel={_START}, StopSel={_STOP}, "
+    "MaxWords=35, MinWords=15, MaxFragments=2, FragmentDelimiter=\" … \""
+)
+
+
+def weighted_tsvector(title_col: str, body_col: str) -> str:
+    """SQL expression for a stored generated tsvector column."""
+    parts = []
+    for col, weight in ((title_col, "A"), (body_col, "B")):
+        for config in SEARCH_CONFIGS:
+            parts.append(f"setweight(to_tsvector('{config}'::regconfig, coalesce({col}, '')), '{weight}')")
+    return " || ".join(parts)
+
+
+# (name, DDL) — created at startup and by alembic 006_user_trigram_search.
+# The trigram ones need the pg_trgm extension; the prefix ones don't.
+USER_SEARCH_INDEXES = (
+    ("ix_forum_users_username_trgm",
+     "CREATE INDEX IF NOT EXISTS ix_forum_users_username_trgm "
+     "ON forum_users USING gin (username gin_trgm_ops)"),
+    ("ix_forum_users_display_name_trgm",
+     "CREATE INDEX IF NOT EXISTS ix_forum_users_display_name_trgm "
+     "ON forum_users USING gin (display_name gin_trgm_ops)"),
+    ("ix_forum_users_username_prefix",
+     "CREATE INDEX IF NOT EXISTS ix_forum_users_username_prefix "
+     "ON forum_users (lower(username) text_pattern_ops)"),
+    ("ix_forum_users_display_name_prefix",
+     "CREATE INDEX IF NOT EXISTS ix_forum_users_display_name_prefix "
+     "ON forum_users (lower(display_name) text_pattern_ops)"),
+)
+
+
+def tsquery(q: str):
+    """websearch-style query (quotes, OR, -negation) matched in every configuration."""
+    query = func.websearch_to_tsquery(SEARCH_CONFIGS[0], q)
+    for config in SEARCH_CONFIGS[1:]:
+        query = query.op("||")(func.websearch_to_tsquery(config, q))
+    return query
+
+
+def headline(col, query):
+    return func.ts_headline(SEARCH_CONFIGS[0], func.coalesce(col, ""), query, HEADLINE_OPTIONS)
+
+
+def render_headline(raw: str | None) -> str:
+    """HTML-escape a ts_headline result and turn the match markers into <mark> tags."""
+    if not raw:
+        return ""
+    return html.escape(raw).replace(_START, "<mark>").replace(_STOP, "</mark>")
@@ -0,0 +1,174 @@
+"""
+backend/forum/sync.py
+Change feed behind GET /api/forum/sync (incremental refresh for mobile clients).
+
+Every insert/update on a tracked table is stamped by a trigger with the writing
+transaction id and a value from one global sequence; hard deletes leave a row
+in sync_tombstones. A cursor is the (xid, seq) pair of the last change a client
+has seen. Only transactions older than the oldest one still running are read
+(pg_snapshot_xmin), so a change committed late with a smaller sequence number
+can never be skipped.
+"""
+from __future__ import annotations
+import base64
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import literal, or_, text, tuple_, union_all
+from sqlalchemy.orm import Session
+
+from app.forum.models import ForumComment, ForumPost, Message, NewsArticle, Notification, SyncTombstone
+
+# Tombstones older than this are pruned; cursors older than this get reset=True
+TOMBSTONE_RETENTION_DAYS = int(os.getenv("FORUM_SYNC_TOMBSTONE_DAYS", "30"))
+
+# table -> columns holding the ids of the users allowed to see it (none = public)
+TRACKED_TABLES = {
+    "forum_posts":    (),
+    "forum_comments": (),
+    "news_articles":  (),
+    "notifications":  ("user_id",),
+    "messages":       ("sender_id", "receiver_id"),
+}
+KIND_BY_TABLE = {
+    "forum_posts":    "post",
+    "forum_comments": "comment",
+    "news_articles":  "news",
+    "notifications":  "notification",
+    "messages":       "message",
+}
+
+# table -> columns whose changes alone don't make a row "changed": the write-behind
+# engagement counters (counters.py; a flush would re-send every liked post to every
+# client) and the generated columns derived from them or the text (NULL in a BEFORE
+# trigger's NEW, so they would always look changed)
+QUIET_COLUMNS = {
+    "forum_posts":    ("likes_count", "shares_count", "comments_count", "hot_score", "search_vector"),
+    "forum_comments": ("likes_count",),
+    "news_articles":  ("likes_count", "shares_count", "search_vector"),
+}
+
+SYNC_DDL = [
+    "CREATE SEQUENCE IF NOT EXISTS sync_change_seq",
+    # TG_ARGV lists the table's quiet columns
+    """
+    CREATE OR REPLACE FUNCTION sync_stamp() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND TG_NARGS > 0
+           AND to_jsonb(NEW) - TG_ARGV = to_jsonb(OLD) - TG_ARGV THEN
+            RETURN NEW;
+        END IF;
+        NEW.change_xid := pg_current_xact_id()::text::bigint;
+        NEW.change_seq := nextval('sync_change_seq');
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql
+    """,
+    # TG_ARGV lists the owner columns; to_jsonb() reads them without naming them statically
+    """
+    CREATE OR REPLACE FUNCTION sync_tombstone() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO sync_tombstones (change_seq, change_xid, table_name, row_id, owner_ids, deleted_at)
+        VALUES (
+            nextval('sync_change_seq'), pg_current_xact_id()::text::bigint, TG_TABLE_NAME, OLD.id,
+            (SELECT array_agg((to_jsonb(OLD) ->> col)::uuid) FROM unnest(TG_ARGV) AS col),
+            now()
+        );
+        RETURN OLD;
+    END $$ LANGUAGE plpgsql
+    """,
+]
+for _table, _owners in TRACKED_TABLES.items():
+    _args = ", ".join(f"'{c}'" for c in _owners)
+    _quiet = ", ".join(f"'{c}'" for c in QUIET_COLUMNS.get(_table, ()))
+    SYNC_DDL += [
+        f"ALTER TABLE {_table} ADD COLUMN IF NOT EXISTS change_xid BIGINT",
+        f"ALTER TABLE {_table} ADD COLUMN IF NOT EXISTS change_seq BIGINT",
+        f"DROP TRIGGER IF EXISTS {_table}_sync_stamp ON {_table}",
+        f"CREATE TRIGGER {_table}_sync_stamp BEFORE INSERT OR UPDATE ON {_table} "
+        f"FOR EACH ROW EXECUTE FUNCTION sync_stamp({_quiet})",
+        f"DROP TRIGGER IF EXISTS {_table}_sync_tombstone ON {_table}",
+        f"CREATE TRIGGER {_table}_sync_tombstone AFTER DELETE ON {_table} "
+        f"FOR EACH ROW EXECUTE FUNCTION sync_tombstone({_args})",
+    ]
+
+
+# ─────────────────────────────────────────────
+# Cursor
+# ─────────────────────────────────────────────
+def encode_cursor(xid: int, seq: int) -> str:
+    raw = f"{xid}|{seq}|{int(time.time())}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[int, int, datetime]:
+    try:
+        xid, seq, issued = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return int(xid), int(seq), datetime.fromtimestamp(int(issued), timezone.utc)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(400, "Invalid cursor")
+
+
+def cursor_expired(issued: datetime) -> bool:
+    """Tombstones this old may be gone, so the client must do a full reload."""
+    return issued < datetime.now(timezone.utc) - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+
+
+def visible_horizon(db: Session) -> int:
+    """
+    Every transaction id below this one has finished. A writing transaction
+    that stays open holds it back, and /sync returns nothing newer until it
+    ends (nothing is lost, changes are just late): keep background jobs'
+    transactions short, e.g. the scraper commits each article's fan-out.
+    """
+    return db.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")).scalar()
+
+
+# ─────────────────────────────────────────────
+# Change feed
+# ─────────────────────────────────────────────
+def changes_since(db: Session, user_id: UUID, xid: int, seq: int, horizon: int, limit: int) -> list:
+    """
+    (kind, id, change_xid, change_seq) of up to `limit` rows changed after the cursor,
+    oldest first. Each branch is a range scan on its (…, change_xid, change_seq) index.
+    """
+    def branch(kind, model, *filters, ref_id=None):
+        key = tuple_(model.change_xid, model.change_seq)
+        return (
+            db.query(
+                kind.label("kind"),
+                (ref_id if ref_id is not None else model.id).label("ref_id"),
+                model.change_xid.label("change_xid"),
+                model.change_seq.label("change_seq"),
+            )
+            .filter(key > tuple_(literal(xid), literal(seq)), model.change_xid < horizon, *filters)
+            .order_by(model.change_xid, model.change_seq)
+            .limit(limit)
+            .subquery()
+            .select()
+        )
+
+    feed = union_all(
+        branch(literal("post"),         ForumPost),
+        branch(literal("comment"),      ForumComment),
+        branch(literal("news"),         NewsArticle),
+        branch(literal("notification"), Notification, Notification.user_id == user_id),
+        branch(literal("message"),      Message, Message.sender_id == user_id),
+        branch(literal("message"),      Message, Message.receiver_id == user_id),
+        # Tombstones come back as e.g. kind="deleted:forum_posts"
+        branch(literal("deleted:") + SyncTombstone.table_name, SyncTombstone,
+               or_(SyncTombstone.owner_ids.is_(None), SyncTombstone.owner_ids.any(user_id)),
+               ref_id=SyncTombstone.row_id),
+    ).subquery()
+    return db.execute(
+        feed.select().order_by(feed.c.change_xid, feed.c.change_seq).limit(limit)
+    ).all()
+
+
+def prune_tombstones(db: Session) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+    deleted = db.query(SyncTombstone).filter(SyncTombstone.deleted_at < cutoff).delete(synchronize_session=False)
+    db.commit()
+    return deleted
@@ -0,0 +1,171 @@
+"""
+backend/forum/timeline.py
+"Following" home timeline, fan-out on write.
+
+Publishing a post copies one small row per follower into timeline_entries
+(one INSERT ... SELECT), so reading the timeline is a keyset scan of the
+reader's own entries instead of a join of user_follows against forum_posts.
+Authors with more than FANOUT_MAX_FOLLOWERS followers are not fanned out:
+their posts are pulled at read time from ix_forum_posts_author_created and
+merged in. Timelines are trimmed to TIMELINE_MAX_ENTRIES by a periodic job.
+"""
+from __future__ import annotations
+import base64
+import os
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import text, true, tuple_, union
+from sqlalchemy.orm import Session
+
+from app.forum.models import ForumPost, ForumUser, TimelineEntry, UserFollow
+
+FANOUT_MAX_FOLLOWERS = int(os.getenv("FORUM_TIMELINE_FANOUT_MAX_FOLLOWERS", "5000"))
+TIMELINE_MAX_ENTRIES = int(os.getenv("FORUM_TIMELINE_MAX_ENTRIES", "800"))
+# Recent posts copied into a timeline when the reader follows someone
+FOLLOW_BACKFILL      = 20
+
+
+# ─────────────────────────────────────────────
+# Writes (caller commits)
+# ─────────────────────────────────────────────
+_FAN_OUT_SQL = text("""
+    INSERT INTO timeline_entries (user_id, post_id, author_id, created_at)
+    SELECT f.follower_id, p.id, p.author_id, p.created_at
+    FROM forum_posts p
+    JOIN forum_users a  ON a.id = p.author_id AND a.followers_count <= :max_followers
+    JOIN user_follows f ON f.following_id = p.author_id
+    WHERE p.id = :post_id
+    UNION ALL
+    SELECT p.author_id, p.id, p.author_id, p.created_at FROM forum_posts p WHERE p.id = :post_id
+    ON CONFLICT DO NOTHING
+""")
+
+_BACKFILL_SQL = text("""
+    INSERT INTO timeline_entries (user_id, post_id, author_id, created_at)
+    SELECT CAST(:user_id AS uuid), p.id, p.author_id, p.created_at
+    FROM forum_posts p
+    JOIN forum_users a ON a.id = p.author_id AND a.followers_count <= :max_followers
+    WHERE p.author_id = :author_id AND p.is_published AND NOT p.is_deleted
+    ORDER BY p.created_at DESC
+    LIMIT :limit
+    ON CONFLICT DO NOTHING
+""")
+
+_TRIM_SQL = text("""
+    DELETE FROM timeline_entries t
+    USING (
+        SELECT user_id, post_id,
+               row_number() OVER (PARTITION BY user_id ORDER BY created_at DESC, post_id DESC) AS rn
+        FROM timeline_entries
+        WHERE user_id IN (
+            SELECT user_id FROM timeline_entries GROUP BY user_id HAVING count(*) > :cap
+        )
+    ) r
+    WHERE t.user_id = r.user_id AND t.post_id = r.post_id AND r.rn > :cap
+""")
+
+# Seeds every timeline from the existing follows (first deploy / alembic 011)
+SEED_SQL = f"""
+    INSERT INTO timeline_entries (user_id, post_id, author_id, created_at)
+    SELECT user_id, post_id, author_id, created_at FROM (
+        SELECT r.user_id, p.id AS post_id, p.author_id, p.created_at,
+               row_number() OVER (PARTITION BY r.user_id ORDER BY p.created_at DESC) AS rn
+        FROM (
+            SELECT f.follower_id AS user_id, f.following_id AS author_id
+            FROM user_follows f JOIN forum_users a ON a.id = f.following_id
+            WHERE a.followers_count <= {FANOUT_MAX_FOLLOWERS}
+            UNION ALL
+            SELECT id, id FROM forum_users
+        ) r
+        JOIN forum_posts p ON p.author_id = r.author_id AND p.is_published AND NOT p.is_deleted
+    ) ranked
+    WHERE rn <= {TIMELINE_MAX_ENTRIES}
+    ON CONFLICT DO NOTHING
+"""
+
+
+def fan_out(db: Session, post_id: UUID) -> int:
+    """Copy a just-published post into its author's and followers' timelines."""
+    return db.execute(_FAN_OUT_SQL, {"post_id": post_id, "max_followers": FANOUT_MAX_FOLLOWERS}).rowcount
+
+
+def backfill(db: Session, user_id: UUID, author_id: UUID) -> int:
+    """Bring a newly followed author's recent posts into the follower's timeline."""
+    return db.execute(_BACKFILL_SQL, {
+        "user_id": user_id, "author_id": author_id,
+        "max_followers": FANOUT_MAX_FOLLOWERS, "limit": FOLLOW_BACKFILL,
+    }).rowcount
+
+
+def remove_author(db: Session, user_id: UUID, author_id: UUID):
+    """Unfollow / block: drop an author's posts from one timeline."""
+    db.query(TimelineEntry).filter(
+        TimelineEntry.user_id == user_id, TimelineEntry.author_id == author_id,
+    ).delete(synchronize_session=False)
+
+
+def remove_post(db: Session, post_id: UUID):
+    """Deleted or unpublished post."""
+    db.query(TimelineEntry).filter(TimelineEntry.post_id == post_id).delete(synchronize_session=False)
+
+
+def trim(db: Session) -> int:
+    """Keep only the newest TIMELINE_MAX_ENTRIES per user."""
+    deleted = db.execute(_TRIM_SQL, {"cap": TIMELINE_MAX_ENTRIES}).rowcount
+    db.commit()
+    return deleted
+
+
+# ─────────────────────────────────────────────
+# Reads
+# ─────────────────────────────────────────────
+def encode_cursor(created_at: datetime, post_id: UUID) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{post_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        created_at, post_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(post_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(400, "Invalid cursor")
+
+
+def page(db: Session, user_id: UUID, before: Optional[tuple[datetime, UUID]], limit: int) -> list:
+    """
+    (post_id, created_at) of the next `limit` timeline posts, newest first:
+    the reader's own entries merged with posts pulled from big followed accounts.
+    """
+    def keyset(created_col, id_col):
+        return tuple_(created_col, id_col) < tuple_(*before) if before else true()
+
+    own = (
+        db.query(TimelineEntry.post_id.label("post_id"), TimelineEntry.created_at.label("created_at"))
+        .filter(TimelineEntry.user_id == user_id, keyset(TimelineEntry.created_at, TimelineEntry.post_id))
+        .order_by(TimelineEntry.created_at.desc(), TimelineEntry.post_id.desc())
+        .limit(limit)
+    )
+    big_authors = (
+        db.query(UserFollow.following_id)
+        .join(ForumUser, ForumUser.id == UserFollow.following_id)
+        .filter(UserFollow.follower_id == user_id, ForumUser.followers_count > FANOUT_MAX_FOLLOWERS)
+    )
+    pulled = (
+        db.query(ForumPost.id.label("post_id"), ForumPost.created_at.label("created_at"))
+        .filter(
+            ForumPost.author_id.in_(big_authors.scalar_subquery()),
+            ForumPost.is_published == True,
+            ForumPost.is_deleted   == False,
+            keyset(ForumPost.created_at, ForumPost.id),
+        )
+        .order_by(ForumPost.created_at.desc(), ForumPost.id.desc())
+        .limit(limit)
+    )
+    # UNION (not ALL): an author who crossed the threshold can appear in both branches
+    merged = union(own.subquery().select(), pulled.subquery().select()).subquery()
+    return db.execute(
+        merged.select().order_by(merged.c.created_at.desc(), merged.c.post_id.desc()).limit(limit)
+    ).all()
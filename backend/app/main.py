@@ -1,4 +1,5 @@
-﻿import traceback
+﻿import asyncio
+import traceback
 import os
 from contextlib import asynccontextmanager
 
@@ -9,26 +10,101 @@ except ImportError:
     print('⚠️ mlflow not installed — MLflow features disabled')
 from fastapi import APIRouter, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
-from app.database import engine, Base
+from app.database import async_engine, dedicated_connection, engine, Base
 import app.models.user
 from app.models import User
 from app.api.routes import router
 from app.auth.google_auth import router as google_auth_router
+from app.forum import media as forum_media
+from app.forum import moderation_queue
+from app.forum.cache import (
+    invalidate_block_sets, invalidate_principals, invalidate_public_responses, make_public_response, public_response_key, public_response_scope, public_responses,
+)
+from app.forum.realtime import broker as realtime_broker
 from app.forum.routes import router as forum_router
 from app.routers import news
-from app.scraper.scheduler import run_all_scrapers, start_scheduler, stop_scheduler
+from app.scraper.scheduler import (
+    reconcile_profile_counters, run_all_scrapers, start_scheduler, stop_scheduler,
+)
 
 from app.admin.config import setup_admin
+from app.utils import password_hashing
+from app.utils.static_files import CachedStaticFiles
 
 
 MLFLOW_TRACKING_URI = os.getenv('MLFLOW_TRACKING_URI', 'http://mlflow:5000')
 EXPERIMENT_NAME = 'WeatherGuardTN'
 
+
+def _first_run(conn, marker: str) -> bool:
+    """
+    True the first time a one-off startup data fix named `marker` runs on this
+    database. The marker row commits with the caller's transaction, so a fix
+    that fails is tried again, and concurrent workers wait and then skip it.
+    """
+    from sqlalchemy import text
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_markers ("
+        "name VARCHAR(100) PRIMARY KEY, applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+    ))
+    return conn.execute(text(
+        "INSERT INTO schema_markers (name) VALUES (:name) ON CONFLICT DO NOTHING RETURNING name"
+    ), {"name": marker}).first() is not None
+
+
+def _create_missing_indexes():
+    """
+    Build indexes declared on tables that already exist (create_all() skips
+    them) CONCURRENTLY, like alembic 013, so a boot never blocks writes. A
+    partitioned parent can't be indexed concurrently: each partition is, then
+    the parent's index is made ON ONLY and they are attached to it (partitions
+    created later get it from the parent).
+    """
+    from sqlalchemy import text
+    from sqlalchemy.schema import CreateIndex
+    from app.forum import partitions
+
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level='AUTOCOMMIT')
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                state = conn.execute(text(
+                    "SELECT i.indisvalid FROM pg_index i WHERE i.indexrelid = to_regclass(:name)"
+                ), {"name": index.name}).scalar()
+                if state is True:
+                    continue
+                if state is False:
+                    # A failed CONCURRENTLY build, or one still running in another worker
+                    print(f'⚠️ Index {index.name} is invalid: drop it if no build is running, then restart')
+                    continue
+                ddl = str(CreateIndex(index).compile(dialect=engine.dialect))
+                on_table = f' ON {table.name} '
+                if not partitions.is_partitioned(conn, table.name):
+                    conn.execute(text(ddl.replace('INDEX ', 'INDEX CONCURRENTLY IF NOT EXISTS ', 1)))
+                    print(f'✅ Created index {index.name}')
+                    continue
+                children = conn.execute(text(
+                    "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = to_regclass(:t)"
+                ), {"t": table.name}).scalars().all()
+                child_indexes = {child: f'{child}_{index.name}'[:63] for child in children}
+                for child, child_index in child_indexes.items():
+                    conn.execute(text(
+                        ddl.replace(f'INDEX {index.name}', f'INDEX CONCURRENTLY IF NOT EXISTS {child_index}', 1)
+                           .replace(on_table, f' ON {child} ', 1)
+                    ))
+                conn.execute(text(
+                    ddl.replace('INDEX ', 'INDEX IF NOT EXISTS ', 1).replace(on_table, f' ON ONLY {table.name} ', 1)
+                ))
+                for child_index in child_indexes.values():
+                    conn.execute(text(f'ALTER INDEX {index.name} ATTACH PARTITION {child_index}'))
+                print(f'✅ Created index {index.name} on {len(children)} partitions')
+
+
 @asynccontextmanager
 async def lifespan(fastapi_app: FastAPI):
     print('🚀 Démarrage de WeatherGuardTN API...')
@@ -50,6 +126,17 @@ async def lifespan(fastapi_app: FastAPI):
                     conn.execute(text("ALTER TABLE notifications ADD COLUMN news_article_id UUID REFERENCES news_articles(id) ON DELETE CASCADE"))
                     conn.commit()
                     print('✅ Added news_article_id column to notifications table')
+                # Coalescing columns (alembic 009_notification_coalescing)
+                if 'group_key' not in columns:
+                    conn.execute(text("ALTER TABLE notifications ADD COLUMN group_key VARCHAR(120)"))
+                    conn.execute(text("ALTER TABLE notifications ADD COLUMN group_count INTEGER NOT NULL DEFAULT 1"))
+                    conn.commit()
+                    print('✅ Added coalescing columns to notifications table')
+                # Distinct actors per coalesced row (alembic 017_notification_group_actors)
+                if 'group_actor_ids' not in columns:
+                    conn.execute(text("ALTER TABLE notifications ADD COLUMN group_actor_ids UUID[]"))
+                    conn.commit()
+                    print('✅ Added group_actor_ids column to notifications table')
                 # Fix check constraint to include 'news_update'
                 try:
                     conn.execute(text("ALTER TABLE notifications DROP CONSTRAINT notifications_type_check"))
@@ -60,16 +147,168 @@ async def lifespan(fastapi_app: FastAPI):
                     conn.execute(text(
                         "ALTER TABLE notifications ADD CONSTRAINT notifications_type_check "
                         "CHECK (type IN ('post_like','post_comment','post_share','post_approved','post_rejected',"
-                        "'comment_like','new_follower','user_report_resolved','post_report_resolved','news_update'))"
+                        "'comment_like','new_follower','user_report_resolved','post_report_resolved',"
+                        "'news_alert','news_update'))"
                     ))
                     conn.commit()
-                    print('✅ Updated notifications_type_check to include news_update')
+                    print('✅ Updated notifications_type_check to include news_alert/news_update')
                 except Exception as e:
                     conn.rollback()
                     print(f'⚠️ Could not update notifications_type_check: {e}')
     except Exception as e:
         print(f'⚠️ Could not migrate notifications table: {e}')
 
+    # Monthly notification partitions (alembic 014_partition_notifications). A fresh
+    # create_all() makes the partitioned parent with no partitions to insert into.
+    # An older database keeps its plain table until converted by hand: too heavy for startup.
+    try:
+        from app.database import SessionLocal
+        from app.forum import partitions
+        db = SessionLocal()
+        try:
+            for table in partitions.PARTITIONED_TABLES:
+                if not partitions.is_partitioned(db, table):
+                    print(f'⚠️ {table} is not partitioned, so retention is off: '
+                          f'run `python -m scripts.partition_{table}` in a quiet window')
+                    continue
+                created = partitions.ensure_partitions(db, table)
+                if created:
+                    print(f'✅ Created partitions {", ".join(created)}')
+        finally:
+            db.close()
+    except Exception as e:
+        print(f'⚠️ Could not create notification partitions: {e}')
+
+    # Denormalized profile counters (alembic 003_profile_counters)
+    try:
+        from sqlalchemy import inspect, text
+        user_columns = [col['name'] for col in inspect(engine).get_columns('forum_users')]
+        missing = [c for c in ('followers_count', 'following_count', 'posts_count') if c not in user_columns]
+        if missing:
+            with engine.connect() as conn:
+                for col in missing:
+                    conn.execute(text(f"ALTER TABLE forum_users ADD COLUMN {col} INTEGER NOT NULL DEFAULT 0"))
+                conn.commit()
+            reconcile_profile_counters()
+            print(f'✅ Added {", ".join(missing)} to forum_users and backfilled counters')
+    except Exception as e:
+        print(f'⚠️ Could not migrate forum_users counters: {e}')
+
+    # Full-text search documents (alembic 005_full_text_search)
+    try:
+        from sqlalchemy import inspect, text
+        from app.forum.search import weighted_tsvector
+        with engine.connect() as conn:
+            for table in ('forum_posts', 'news_articles'):
+                if 'search_vector' not in [col['name'] for col in inspect(engine).get_columns(table)]:
+                    conn.execute(text(
+                        f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+                        f"GENERATED ALWAYS AS ({weighted_tsvector('title', 'body')}) STORED"
+                    ))
+                    conn.commit()
+                    print(f'✅ Added search_vector column to {table}')
+    except Exception as e:
+        print(f'⚠️ Could not add full-text search columns: {e}')
+
+    # Hot ranking score (alembic 010_hot_ranking)
+    try:
+        from sqlalchemy import inspect, text
+        from app.forum.ranking import hot_score_expression
+        if 'hot_score' not in [col['name'] for col in inspect(engine).get_columns('forum_posts')]:
+            with engine.begin() as conn:
+                # comments_count was never maintained before the counter service took it over
+                conn.execute(text(
+                    "UPDATE forum_posts AS p SET comments_count = c.n "
+                    "FROM (SELECT post_id, count(*) AS n FROM forum_comments "
+                    "      WHERE NOT is_deleted GROUP BY post_id) AS c "
+                    "WHERE p.id = c.post_id"
+                ))
+                conn.execute(text(
+                    f"ALTER TABLE forum_posts ADD COLUMN hot_score double precision "
+                    f"GENERATED ALWAYS AS ({hot_score_expression()}) STORED"
+                ))
+            print('✅ Added hot_score column to forum_posts')
+    except Exception as e:
+        print(f'⚠️ Could not add hot ranking column: {e}')
+
+    # Trigram / prefix indexes for user search (alembic 006_user_trigram_search)
+    from sqlalchemy import text
+    from app.forum.search import USER_SEARCH_INDEXES
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            conn.commit()
+    except Exception as e:
+        print(f'⚠️ Could not enable pg_trgm: {e}')
+    for name, ddl in USER_SEARCH_INDEXES:
+        try:
+            with engine.connect() as conn:
+                conn.execute(text(ddl))
+                conn.commit()
+        except Exception as e:
+            print(f'⚠️ Could not create index {name}: {e}')
+
+    # Post / comment like counters used to be left at 0; fill them in once
+    # (afterwards the counter service keeps them current). Gated on a marker,
+    # not on likes_count = 0: a later run would overwrite counts that other
+    # workers have deltas for.
+    try:
+        with engine.begin() as conn:
+            if _first_run(conn, 'backfill_like_counters'):
+                for table, likes, fk in (('forum_posts', 'post_likes', 'post_id'),
+                                         ('forum_comments', 'comment_likes', 'comment_id')):
+                    conn.execute(text(
+                        f"UPDATE {table} AS t SET likes_count = c.n "
+                        f"FROM (SELECT {fk} AS id, count(*) AS n FROM {likes} GROUP BY {fk}) AS c "
+                        f"WHERE t.id = c.id AND coalesce(t.likes_count, 0) = 0"
+                    ))
+                print('✅ Backfilled post / comment like counters')
+    except Exception as e:
+        print(f'⚠️ Could not backfill like counters: {e}')
+
+    # Delta-sync change stamps and tombstones (alembic 008_sync_change_feed)
+    try:
+        from app.forum.sync import SYNC_DDL
+        with engine.begin() as conn:
+            for ddl in SYNC_DDL:
+                conn.execute(text(ddl))
+    except Exception as e:
+        print(f'⚠️ Could not install sync triggers: {e}')
+
+    # Following timelines start out empty; fill them from existing follows once
+    try:
+        from app.forum.timeline import SEED_SQL
+        with engine.begin() as conn:
+            if conn.execute(text("SELECT NOT EXISTS (SELECT 1 FROM timeline_entries)")).scalar():
+                seeded = conn.execute(text(SEED_SQL)).rowcount
+                if seeded:
+                    print(f'✅ Seeded {seeded} following-timeline entries')
+    except Exception as e:
+        print(f'⚠️ Could not seed following timelines: {e}')
+
+    # Resized image variants recorded per attachment (app/forum/imaging.py)
+    try:
+        from sqlalchemy import text
+        with engine.begin() as conn:
+            conn.execute(text('ALTER TABLE post_media ADD COLUMN IF NOT EXISTS variants JSONB'))
+    except Exception as e:
+        print(f'⚠️ Could not add post_media.variants: {e}')
+
+    # What a near-duplicate verdict may be reused for (alembic 018_moderation_verdict_scope)
+    try:
+        from sqlalchemy import text
+        with engine.begin() as conn:
+            conn.execute(text('ALTER TABLE moderation_verdicts ADD COLUMN IF NOT EXISTS content_type VARCHAR(10)'))
+            conn.execute(text('ALTER TABLE moderation_verdicts ADD COLUMN IF NOT EXISTS category VARCHAR(50)'))
+    except Exception as e:
+        print(f'⚠️ Could not add moderation_verdicts scope columns: {e}')
+
+    # create_all() skips indexes declared later on tables that already exist
+    try:
+        _create_missing_indexes()
+    except Exception as e:
+        print(f'⚠️ Could not create missing indexes: {e}')
+
     if mlflow is not None:
         try:
             mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
@@ -84,6 +323,18 @@ async def lifespan(fastapi_app: FastAPI):
     else:
         print('⚠️ MLflow module not available — skipping MLflow setup')
 
+    # Realtime push: one LISTEN connection per worker
+    try:
+        realtime_broker.start(asyncio.get_running_loop(), dedicated_connection)
+    except Exception as e:
+        print(f'⚠️ Realtime listener could not start: {e}')
+
+    # AI moderation workers (MODERATION_WORKERS per process, 0 = run them elsewhere)
+    try:
+        moderation_queue.start()
+    except Exception as e:
+        print(f'⚠️ Moderation workers could not start: {e}')
+
     # Start news scraper scheduler
     try:
         start_scheduler(interval_hours=6)
@@ -94,6 +345,11 @@ async def lifespan(fastapi_app: FastAPI):
 
     # Shutdown
     stop_scheduler()
+    await moderation_queue.stop()
+    realtime_broker.stop()
+    forum_media.shutdown_pool()
+    password_hashing.shutdown()
+    await async_engine.dispose()
     print('👋 Arrêt de WeatherGuardTN API...')
 
 fastapi_app = FastAPI(
@@ -106,6 +362,53 @@ fastapi_app = FastAPI(
     openapi_url='/openapi.json'
 )
 
+# Anonymous GETs of the public feeds are answered from memory (app/forum/cache.py).
+# Registered before CORS so cached responses still get the CORS headers.
+_public_inflight: dict = {}
+realtime_broker.on_invalidate(invalidate_public_responses)
+realtime_broker.on_invalidate(invalidate_principals)
+realtime_broker.on_invalidate(invalidate_block_sets)
+
+@fastapi_app.middleware('http')
+async def cache_public_feeds(request: Request, call_next):
+    scope = public_response_scope(request.url.path) if request.method == 'GET' else None
+    if scope is None or 'authorization' in request.headers:
+        return await call_next(request)
+
+    key = public_response_key(scope, request.url.path, request.url.query)
+    cached, status = public_responses.get(key), 'HIT'
+    if cached is None and key in _public_inflight:
+        # A burst of misses renders the page once; the others wait for it
+        await _public_inflight[key].wait()
+        cached = public_responses.get(key)
+    if cached is None:
+        status = 'MISS'
+        done = _public_inflight[key] = asyncio.Event()
+        try:
+            response = await call_next(request)
+            body = b''.join([chunk async for chunk in response.body_iterator])
+            # The news routes report their errors as 200 {"success": false, ...}
+            if response.status_code != 200 or body.startswith(b'{"success":false'):
+                return Response(body, status_code=response.status_code, headers=dict(response.headers))
+            cached = make_public_response(body, response.headers.get('content-type', 'application/json'))
+            public_responses.set(key, cached)
+        finally:
+            done.set()
+            if _public_inflight.get(key) is done:
+                del _public_inflight[key]
+
+    headers = {
+        'ETag': cached.etag, 'Last-Modified': cached.last_modified,
+        'Cache-Control': 'public, no-cache', 'Vary': 'Authorization', 'X-Cache': status,
+    }
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match:
+        if cached.etag in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]:
+            return Response(status_code=304, headers=headers)
+    elif request.headers.get('if-modified-since') == cached.last_modified:
+        return Response(status_code=304, headers=headers)
+    return Response(cached.body, media_type=cached.media_type, headers=headers)
+
 CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000,http://localhost:5173,http://localhost:80,http://frontend:80').split(',')
 
 fastapi_app.add_middleware(
@@ -119,6 +422,17 @@ fastapi_app.add_middleware(
 
 fastapi_app.add_middleware(SessionMiddleware, secret_key=os.getenv('FORUM_SECRET_KEY', 'weatherguardtn-admin-secret-2026'))
 
+# Refuse oversized uploads from Content-Length, before the multipart body is spooled
+_UPLOAD_BODY_LIMIT = forum_media.MAX_FILE_SIZE + 1024 * 1024   # room for the multipart envelope
+
+@fastapi_app.middleware('http')
+async def limit_upload_size(request: Request, call_next):
+    if request.method == 'POST' and request.url.path == '/api/forum/upload':
+        length = request.headers.get('content-length')
+        if length and length.isdigit() and int(length) > _UPLOAD_BODY_LIMIT:
+            return JSONResponse(status_code=413, content={'detail': 'File too large. Maximum size is 50 MB.'})
+    return await call_next(request)
+
 setup_admin(fastapi_app)
 
 @fastapi_app.exception_handler(Exception)
@@ -131,15 +445,16 @@ fastapi_app.include_router(google_auth_router, prefix='/api/auth', tags=['auth']
 fastapi_app.include_router(forum_router, prefix='/api/forum', tags=['forum'])
 fastapi_app.include_router(news.router)
 
-# Serve uploaded forum media
-UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads', 'forum')
+# Serve uploaded forum media (content-addressed, so cached as immutable).
+# With STATIC_ACCEL_REDIRECT=1 nginx sends the bytes from the /_accel/ locations.
+UPLOAD_DIR = forum_media.UPLOAD_DIR
 os.makedirs(UPLOAD_DIR, exist_ok=True)
-fastapi_app.mount('/api/forum/uploads', StaticFiles(directory=UPLOAD_DIR), name='forum-uploads')
+fastapi_app.mount('/api/forum/uploads', CachedStaticFiles(directory=UPLOAD_DIR, accel_prefix='/_accel/uploads/'), name='forum-uploads')
 
 # Serve custom static files (admin CSS)
 STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static')
 os.makedirs(STATIC_DIR, exist_ok=True)
-fastapi_app.mount('/static', StaticFiles(directory=STATIC_DIR), name='static')
+fastapi_app.mount('/static', CachedStaticFiles(directory=STATIC_DIR, accel_prefix='/_accel/static/'), name='static')
 
 @fastapi_app.get('/')
 def root():
@@ -1,8 +1,9 @@
-﻿from fastapi import APIRouter, Depends, BackgroundTasks
-from sqlalchemy.orm import Session
-from app.database import get_db
+﻿from fastapi import APIRouter, Depends, BackgroundTasks, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from sqlalchemy import text
 from app.scraper.scheduler import run_all_scrapers
+from app.forum.search import HEADLINE_OPTIONS, render_headline
 
 router = APIRouter(prefix="/api/news", tags=["news"])
 
@@ -81,10 +82,10 @@ RELEVANT_CATEGORIES = [
 ]
 
 @router.get("/")
-async def get_all_news(db: Session = Depends(get_db)):
+async def get_all_news(db: AsyncSession = Depends(get_async_db)):
     """Get all news articles from database"""
     try:
-        result = db.execute(text("""
+        result = await db.execute(text("""
             SELECT id, title, body, source_name, category, risk_level, 
                    governorates, published_at, scraped_at, source_url
             FROM news_articles 
@@ -93,7 +94,7 @@ async def get_all_news(db: Session = Depends(get_db)):
         """))
         
         articles = [_row_to_dict(row) for row in result if _is_relevant_db_article(row)]
-        count_result = db.execute(text("SELECT COUNT(*) FROM news_articles"))
+        count_result = await db.execute(text("SELECT COUNT(*) FROM news_articles"))
         total = count_result.scalar()
         
         return {
@@ -106,11 +107,11 @@ async def get_all_news(db: Session = Depends(get_db)):
         return {"success": False, "error": str(e), "articles": []}
 
 @router.get("/relevant")
-async def get_relevant_news(db: Session = Depends(get_db)):
+async def get_relevant_news(db: AsyncSession = Depends(get_async_db)):
     """Get news related to weather, infrastructure, school closures, community aid, alerts"""
     try:
         placeholders = ", ".join([f"'{c}'" for c in RELEVANT_CATEGORIES])
-        result = db.execute(text(f"""
+        result = await db.execute(text(f"""
             SELECT id, title, body, source_name, category, risk_level, 
                    governorates, published_at, scraped_at, source_url
             FROM news_articles 
@@ -135,10 +136,10 @@ async def get_relevant_news(db: Session = Depends(get_db)):
         return {"success": False, "error": str(e), "articles": []}
 
 @router.get("/alerts")
-async def get_alerts(db: Session = Depends(get_db)):
+async def get_alerts(db: AsyncSession = Depends(get_async_db)):
     """Get high-risk news alerts (orange, red, purple)"""
     try:
-        result = db.execute(text("""
+        result = await db.execute(text("""
             SELECT id, title, body, source_name, category, risk_level, 
                    governorates, published_at, scraped_at, source_url
             FROM news_articles 
@@ -157,14 +158,14 @@ async def get_alerts(db: Session = Depends(get_db)):
         return {"success": False, "error": str(e), "articles": []}
 
 @router.get("/by-region/{governorate}")
-async def get_news_by_region(governorate: str, db: Session = Depends(get_db)):
+async def get_news_by_region(governorate: str, db: AsyncSession = Depends(get_async_db)):
     """Get news articles filtered by governorate/region"""
     try:
-        result = db.execute(text("""
+        result = await db.execute(text("""
             SELECT id, title, body, source_name, category, risk_level, 
                    governorates, published_at, scraped_at, source_url
             FROM news_articles 
-            WHERE :gov = ANY(governorates)
+            WHERE governorates @> ARRAY[CAST(:gov AS varchar)]
             ORDER BY published_at DESC 
             LIMIT 30
         """), {"gov": governorate})
@@ -178,8 +179,49 @@ async def get_news_by_region(governorate: str, db: Session = Depends(get_db)):
     except Exception as e:
         return {"success": False, "error": str(e), "articles": []}
 
+@router.get("/search")
+async def search_news(q: str = Query(..., min_length=2, max_length=200),
+                      limit: int = Query(20, ge=1, le=50),
+                      offset: int = Query(0, ge=0),
+                      db: AsyncSession = Depends(get_async_db)):
+    """Full-text search over articles (title weighs more than body), best match first"""
+    try:
+        # Rank over the GIN-indexed search_vector; ts_headline only runs on the returned page
+        result = await db.execute(text("""
+            WITH query AS (
+                SELECT websearch_to_tsquery('french', :q) || websearch_to_tsquery('simple', :q) AS tsq
+            ), hits AS (
+                SELECT a.id, ts_rank_cd(a.search_vector, query.tsq) AS rank
+                FROM news_articles a, query
+                WHERE a.search_vector @@ query.tsq
+                ORDER BY rank DESC, a.scraped_at DESC
+                LIMIT :limit OFFSET :offset
+            )
+            SELECT a.id, a.title, a.body, a.source_name, a.category, a.risk_level,
+                   a.governorates, a.published_at, a.scraped_at, a.source_url,
+                   hits.rank,
+                   ts_headline('french', coalesce(a.title, ''), query.tsq, :opts),
+                   ts_headline('french', coalesce(a.body, ''), query.tsq, :opts)
+            FROM hits JOIN news_articles a ON a.id = hits.id, query
+            ORDER BY hits.rank DESC, a.scraped_at DESC
+        """), {"q": q, "limit": limit, "offset": offset, "opts": HEADLINE_OPTIONS})
+
+        articles = []
+        for row in result:
+            a = _row_to_dict(row)
+            a["rank"] = float(row[10])
+            a["title_highlight"] = render_headline(row[11])
+            a["body_highlight"] = render_headline(row[12])
+            a["category_label"] = CATEGORY_LABELS.get(a["category"], a["category"])
+            a["category_icon"] = CATEGORY_ICONS.get(a["category"], "📰")
+            articles.append(a)
+
+        return {"success": True, "articles": articles, "query": q, "count": len(articles)}
+    except Exception as e:
+        return {"success": False, "error": str(e), "articles": []}
+
 @router.post("/scrape-now")
-async def scrape_now(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def scrape_now(background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
     """Manually trigger all scrapers to fetch fresh news."""
     background_tasks.add_task(run_all_scrapers)
     return {
@@ -3,6 +3,10 @@ backend/scraper/scheduler.py
 Orchestrates all scrapers and runs them on a schedule (APScheduler).
 Sends region-based notifications when new articles match user governorates.
 Also exposes a manual /api/admin/scrape-now endpoint.
+Hosts the periodic forum maintenance jobs (profile counter reconciliation,
+sync tombstone pruning, write-behind engagement counter flushes, following
+timeline trimming, monthly partition maintenance, moderation cache pruning,
+spent stream ticket pruning).
 Plugs into FastAPI startup via start_scheduler().
 """
 from __future__ import annotations
@@ -13,8 +17,11 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
 from app.database import SessionLocal
-from app.forum import crud
+from app.forum import counters, crud, moderation_cache, partitions, timeline
+from app.forum.auth import prune_stream_tickets
 from app.forum.notifications import notify_users_about_news
+from app.forum.realtime import publish_invalidation
+from app.forum.sync import prune_tombstones
 from app.scraper import businessnews, mosaiquefm, jawharafm, shemsfm, tap
 from app.forum.schemas import ScraperRunResult
 
@@ -82,6 +89,9 @@ def run_all_scrapers() -> list[ScraperRunResult]:
                             risk_level=article_data.get("risk_level", "green"),
                             news_article_id=article.id,
                         )
+                        # Now, not with the next article: the next source's fetch can take
+                        # minutes, and an open transaction holds back /sync's horizon
+                        db.commit()
                 except Exception as e:
                     logger.error("Failed to save article %s: %s", url, e)
                     errors.append(f"{url}: {e}")
@@ -100,12 +110,98 @@ def run_all_scrapers() -> list[ScraperRunResult]:
                 source_name, new_count, skip_count, len(errors),
             )
 
+        # Public news feeds cached by the API workers are stale now
+        if any(r.articles_new for r in all_results):
+            publish_invalidation(db, "news")
+            db.commit()
+
     finally:
         db.close()
 
     return all_results
 
 
+def reconcile_profile_counters() -> int:
+    """Repair drift in the denormalized follower / following / post counters."""
+    db = SessionLocal()
+    try:
+        repaired = crud.reconcile_user_counters(db)
+        if repaired:
+            logger.warning("Profile counters: repaired %d drifted users", repaired)
+        return repaired
+    except Exception as e:
+        logger.error("Profile counter reconciliation failed: %s", e)
+        db.rollback()
+        return 0
+    finally:
+        db.close()
+
+
+def prune_sync_tombstones() -> int:
+    """Drop delta-sync tombstones past their retention window."""
+    db = SessionLocal()
+    try:
+        return prune_tombstones(db)
+    except Exception as e:
+        logger.error("Sync tombstone pruning failed: %s", e)
+        db.rollback()
+        return 0
+    finally:
+        db.close()
+
+
+def trim_timelines() -> int:
+    """Cap every following timeline at its newest entries."""
+    db = SessionLocal()
+    try:
+        return timeline.trim(db)
+    except Exception as e:
+        logger.error("Timeline trimming failed: %s", e)
+        db.rollback()
+        return 0
+    finally:
+        db.close()
+
+
+def maintain_partitions() -> dict:
+    """Create upcoming monthly partitions and retire the expired ones."""
+    db = SessionLocal()
+    try:
+        return partitions.maintain(db)
+    except Exception as e:
+        logger.error("Partition maintenance failed: %s", e)
+        db.rollback()
+        return {}
+    finally:
+        db.close()
+
+
+def prune_moderation_cache() -> int:
+    """Drop AI moderation verdicts nobody has reused for a while."""
+    db = SessionLocal()
+    try:
+        return moderation_cache.prune(db)
+    except Exception as e:
+        logger.error("Moderation cache pruning failed: %s", e)
+        db.rollback()
+        return 0
+    finally:
+        db.close()
+
+
+def prune_spent_stream_tickets() -> int:
+    """Drop redeemed /events tickets that have expired."""
+    db = SessionLocal()
+    try:
+        return prune_stream_tickets(db)
+    except Exception as e:
+        logger.error("Stream ticket pruning failed: %s", e)
+        db.rollback()
+        return 0
+    finally:
+        db.close()
+
+
 def start_scheduler(interval_hours: int = 6):
     """Call this from FastAPI lifespan startup."""
     if _scheduler.running:
@@ -119,6 +215,62 @@ def start_scheduler(interval_hours: int = 6):
         replace_existing=True,
         misfire_grace_time=300,
     )
+    _scheduler.add_job(
+        reconcile_profile_counters,
+        trigger=IntervalTrigger(hours=1),
+        id="reconcile_counters",
+        name="Forum profile counter reconciliation",
+        replace_existing=True,
+        misfire_grace_time=300,
+    )
+    _scheduler.add_job(
+        counters.flush,
+        trigger=IntervalTrigger(seconds=counters.FLUSH_SECONDS),
+        id="flush_counters",
+        name="Forum engagement counter flush",
+        replace_existing=True,
+        coalesce=True,
+    )
+    _scheduler.add_job(
+        prune_sync_tombstones,
+        trigger=IntervalTrigger(hours=24),
+        id="prune_sync_tombstones",
+        name="Forum delta-sync tombstone pruning",
+        replace_existing=True,
+        misfire_grace_time=3600,
+    )
+    _scheduler.add_job(
+        trim_timelines,
+        trigger=IntervalTrigger(hours=1),
+        id="trim_timelines",
+        name="Forum following-timeline trimming",
+        replace_existing=True,
+        misfire_grace_time=600,
+    )
+    _scheduler.add_job(
+        maintain_partitions,
+        trigger=IntervalTrigger(hours=24),
+        id="maintain_partitions",
+        name="Monthly partition creation and retention",
+        replace_existing=True,
+        misfire_grace_time=3600,
+    )
+    _scheduler.add_job(
+        prune_moderation_cache,
+        trigger=IntervalTrigger(hours=24),
+        id="prune_moderation_cache",
+        name="AI moderation verdict cache pruning",
+        replace_existing=True,
+        misfire_grace_time=3600,
+    )
+    _scheduler.add_job(
+        prune_spent_stream_tickets,
+        trigger=IntervalTrigger(hours=1),
+        id="prune_stream_tickets",
+        name="Spent stream ticket pruning",
+        replace_existing=True,
+        misfire_grace_time=600,
+    )
     _scheduler.start()
     logger.info("Scraper scheduler started (every %dh)", interval_hours)
 
@@ -132,3 +284,5 @@ def stop_scheduler():
     """Call from FastAPI shutdown event."""
     if _scheduler.running:
         _scheduler.shutdown(wait=False)
+    # Don't lose increments buffered since the last flush
+    counters.flush()
@@ -0,0 +1,175 @@
+"""
+backend/app/utils/password_hashing.py
+A dedicated, bounded executor for password hashing and verification.
+
+bcrypt is slow on purpose (tens to hundreds of ms of CPU per call). In the
+shared request threadpool, a burst of logins — everyone opening the app after
+a push alert — would take every thread and stall unrelated endpoints. Password
+work therefore runs on its own small thread pool; bcrypt releases the GIL, so
+the threads really do run in parallel. At most PASSWORD_HASH_QUEUE_LIMIT jobs
+may wait for a thread. Beyond that, callers get an immediate 503 with
+Retry-After instead of joining a backlog they would time out in anyway.
+
+Hashes whose scheme is deprecated, or whose cost is below
+PASSWORD_BCRYPT_ROUNDS, come back from verify() with a replacement the
+caller stores (rehash on login).
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from passlib.exc import UnknownHashError
+
+logger = logging.getLogger(__name__)
+
+WORKERS           = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+QUEUE_LIMIT       = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "32"))
+RETRY_AFTER       = os.getenv("PASSWORD_HASH_RETRY_AFTER_SECONDS", "2")
+# Raising it makes every existing hash "need update": it is replaced on the user's next login
+BCRYPT_ROUNDS     = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", "12"))
+SLOW_WAIT_SECONDS = float(os.getenv("PASSWORD_HASH_SLOW_WAIT_SECONDS", "1"))
+
+# Hashes in the `users` table (email sign-up and the admin login). Accounts
+# created before this used an unsalted SHA-256 hex digest: it still verifies
+# and is swapped for bcrypt_sha256 at the next successful login.
+users_context = CryptContext(
+    schemes=["bcrypt_sha256", "bcrypt", "hex_sha256"],
+    deprecated=["hex_sha256"],
+    bcrypt_sha256__default_rounds=BCRYPT_ROUNDS,
+    bcrypt_sha256__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+)
+
+
+class HashingStats:
+    """Per-operation counts, queue wait and hashing time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ops: dict = {}
+
+    def _op(self, op: str) -> dict:
+        return self._ops.setdefault(op, {
+            "calls": 0, "rejected": 0, "wait": deque(maxlen=1000), "run": deque(maxlen=1000),
+        })
+
+    def record(self, op: str, waited: float, ran: float):
+        with self._lock:
+            entry = self._op(op)
+            entry["calls"] += 1
+            entry["wait"].append(waited)
+            entry["run"].append(ran)
+        if waited >= SLOW_WAIT_SECONDS:
+            logger.warning("Password %s waited %.2fs for a hashing thread (%d pending)", op, waited, _pending)
+
+    def reject(self, op: str):
+        with self._lock:
+            self._op(op)["rejected"] += 1
+
+    def snapshot(self) -> dict:
+        def summary(samples):
+            if not samples:
+                return {"avg_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+            ordered = sorted(samples)
+            return {
+                "avg_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+                "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * .99))] * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2),
+            }
+
+        with self._lock:
+            ops = {
+                op: {"calls": e["calls"], "rejected": e["rejected"],
+                     "queue_wait": summary(e["wait"]), "hashing": summary(e["run"])}
+                for op, e in self._ops.items()
+            }
+        return {"workers": WORKERS, "queue_limit": QUEUE_LIMIT, "pending": _pending, "operations": ops}
+
+
+stats = HashingStats()
+
+_executor: Optional[ThreadPoolExecutor] = None
+_pending = 0
+_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="password-hash")
+        return _executor
+
+
+def shutdown():
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _release(_future=None):
+    global _pending
+    with _lock:
+        _pending -= 1
+
+
+async def run(op: str, fn: Callable, *args):
+    """Run fn(*args) on the hashing pool, or raise 503 if its queue is full."""
+    global _pending
+    executor = _get_executor()
+    with _lock:
+        if _pending >= WORKERS + QUEUE_LIMIT:
+            stats.reject(op)
+            raise HTTPException(
+                503, "Too many sign-in attempts right now, please try again in a moment.",
+                headers={"Retry-After": RETRY_AFTER},
+            )
+        _pending += 1
+    queued = time.perf_counter()
+
+    def job():
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            stats.record(op, started - queued, time.perf_counter() - started)
+
+    try:
+        future = executor.submit(job)
+    except RuntimeError:   # shut down
+        _release()
+        raise HTTPException(503, "Service is shutting down.")
+    # Released when the job finishes, even if the client went away meanwhile
+    future.add_done_callback(_release)
+    return await asyncio.wrap_future(future)
+
+
+async def hash(context: CryptContext, plain: str) -> str:
+    return await run("hash", context.hash, plain)
+
+
+def _verify(context: CryptContext, plain: str, hashed: Optional[str]) -> tuple[bool, Optional[str]]:
+    if not hashed:
+        # Unknown account: spend the same time as a real check
+        context.dummy_verify()
+        return False, None
+    try:
+        return context.verify_and_update(plain, hashed)
+    except (UnknownHashError, ValueError):
+        return False, None
+
+
+async def verify(context: CryptContext, plain: str, hashed: Optional[str]) -> tuple[bool, Optional[str]]:
+    """(matches, replacement hash to store or None)."""
+    return await run("verify", _verify, context, plain, hashed)
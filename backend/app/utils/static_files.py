@@ -0,0 +1,162 @@
+"""
+backend/app/utils/static_files.py
+StaticFiles with long-lived caching, used for the forum upload store and /static.
+
+- Content-addressed uploads (<sha256><ext>, derived/<sha256>/...) never change
+  under their URL: served `immutable` for a year, the hash is the strong ETag.
+- Every other file gets a strong ETag from its content hash (computed once per
+  mtime, in the lookup thread). A request carrying ?v=<that hash> — see
+  versioned_url() — is immutable too; unversioned URLs revalidate after an hour.
+- Byte ranges and If-Range come from Starlette's FileResponse, which keys them
+  on the ETag above, so video seeking gets 206s that caches can combine.
+- Text assets with a precompressed sibling (.br / .gz, written by
+  scripts/precompress_static.py) are sent as-is when the client accepts it.
+- With STATIC_ACCEL_REDIRECT=1 only headers leave Python: the body is an
+  X-Accel-Redirect to an `internal` nginx location that sends the file with
+  sendfile (see frontend/nginx.conf; nginx-simple.conf for a standalone nginx).
+"""
+from __future__ import annotations
+import hashlib
+import os
+import re
+import stat
+from email.utils import formatdate
+from functools import lru_cache
+from mimetypes import guess_type
+from urllib.parse import parse_qs, quote
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+ACCEL_REDIRECT = os.getenv("STATIC_ACCEL_REDIRECT", "0") == "1"
+
+IMMUTABLE   = "public, max-age=31536000, immutable"
+REVALIDATE  = "public, max-age=3600"
+
+# Siblings are looked up in this order of preference
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE  = {".css", ".js", ".mjs", ".map", ".json", ".svg", ".html", ".txt", ".xml"}
+
+_HASHED_NAME = re.compile(r"(?:^|/)([0-9a-f]{64})(?:\.[A-Za-z0-9]+)?$")
+_DERIVED     = re.compile(r"^derived/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}/")
+
+
+@lru_cache(maxsize=4096)
+def _content_hash(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(64 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=4096)
+def _siblings(path: str, mtime_ns: int) -> tuple:
+    """(encoding, path, stat) of precompressed copies at least as new as the original."""
+    found = []
+    for encoding, suffix in PRECOMPRESSED:
+        try:
+            st = os.stat(path + suffix)
+        except OSError:
+            continue
+        if st.st_mtime_ns >= mtime_ns:
+            found.append((encoding, path + suffix, st))
+    return tuple(found)
+
+
+def _accepted(request_headers: Headers) -> set:
+    """Content codings the client accepts (q=0 means refused)."""
+    accepted = set()
+    for part in request_headers.get("accept-encoding", "").split(","):
+        name, _, params = part.partition(";")
+        try:
+            q = float(params.strip().removeprefix("q=")) if params.strip() else 1.0
+        except ValueError:
+            q = 0.0
+        if name.strip() and q > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def versioned_url(mount: str, directory: str, name: str) -> str:
+    """`/static/x.css?v=<hash>` — cacheable forever, changes whenever the file does."""
+    path = os.path.join(directory, name)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return f"{mount}/{name}"
+    return f"{mount}/{name}?v={_content_hash(path, st.st_mtime_ns, st.st_size)[:16]}"
+
+
+class CachedStaticFiles(StaticFiles):
+    def __init__(self, *args, accel_prefix: str | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Internal nginx location mapped onto `directory`, e.g. "/_accel/uploads/"
+        self.accel_prefix = accel_prefix if ACCEL_REDIRECT else None
+
+    def lookup_path(self, path: str) -> tuple[str, os.stat_result | None]:
+        # Dot-paths (uploads being published into the store, precompress leftovers) are never served
+        if any(part.startswith(".") for part in path.replace("\\", "/").split("/")):
+            return "", None
+        # Runs in a worker thread: do the hashing and sibling stats here, not on the event loop
+        full_path, stat_result = super().lookup_path(path)
+        if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+            self._etag(full_path, stat_result)
+            if os.path.splitext(full_path)[1] in COMPRESSIBLE:
+                _siblings(full_path, stat_result.st_mtime_ns)
+        return full_path, stat_result
+
+    def _relative(self, full_path) -> str:
+        return os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+
+    def _etag(self, full_path, stat_result: os.stat_result) -> str:
+        named = _HASHED_NAME.search(self._relative(full_path))
+        if named:
+            return named.group(1)
+        return _content_hash(str(full_path), stat_result.st_mtime_ns, stat_result.st_size)
+
+    def _cache_control(self, relative: str, digest: str, scope: Scope) -> str:
+        if _HASHED_NAME.search(relative) or _DERIVED.match(relative):
+            return IMMUTABLE
+        version = parse_qs(scope.get("query_string", b"").decode()).get("v", [""])[0]
+        return IMMUTABLE if version and digest.startswith(version) else REVALIDATE
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        relative = self._relative(full_path)
+        digest   = self._etag(full_path, stat_result)
+        media_type = guess_type(str(full_path))[0] or "application/octet-stream"
+        headers = {"etag": f'"{digest}"', "cache-control": self._cache_control(relative, digest, scope)}
+
+        if self.accel_prefix:
+            # nginx answers Range / gzip_static itself; Python only decides the headers
+            headers["x-accel-redirect"] = quote(self.accel_prefix + relative)
+            headers["last-modified"] = formatdate(stat_result.st_mtime, usegmt=True)
+            response = Response(status_code=status_code, headers=headers, media_type=media_type)
+        else:
+            path = full_path
+            if os.path.splitext(full_path)[1] in COMPRESSIBLE:
+                siblings = _siblings(str(full_path), stat_result.st_mtime_ns)
+                if siblings:
+                    headers["vary"] = "Accept-Encoding"
+                    accepted = _accepted(request_headers)
+                    for encoding, sibling, sibling_stat in siblings:
+                        if encoding in accepted:
+                            path, stat_result = sibling, sibling_stat
+                            headers["content-encoding"] = encoding
+                            headers["etag"] = f'"{digest}-{encoding}"'
+                            break
+            response = FileResponse(path, status_code=status_code, headers=headers,
+                                    media_type=media_type, stat_result=stat_result)
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
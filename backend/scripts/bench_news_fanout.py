@@ -0,0 +1,107 @@
+"""
+Time the news notification fan-out (notify_users_about_news) for one large
+governorate, next to the alternatives: chunked COPY, FK checks deferred to
+commit, and the bare insert with no FK checks or triggers (the floor). Each
+variant runs in its own transaction that is rolled back, and the seeded users
+are deleted at the end, so it is safe to point at a real database.
+
+Usage: python -m scripts.bench_news_fanout [users] [repeats] [copy_chunk]
+"""
+import io
+import statistics
+import sys
+import time
+import uuid
+
+from sqlalchemy import text
+
+from app.database import SessionLocal, engine
+from app.forum import partitions
+from app.forum.notifications import notify_users_about_news
+
+users   = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+chunk   = int(sys.argv[3]) if len(sys.argv) > 3 else 5000
+tag     = uuid.uuid4().hex[:8]
+gov     = f"fanout-{tag}"
+
+FOREIGN_KEYS = [
+    "notifications_user_id_fkey", "notifications_actor_id_fkey", "notifications_post_id_fkey",
+    "notifications_comment_id_fkey", "notifications_news_article_id_fkey",
+]
+
+
+def fanout(db, article_id):
+    notify_users_about_news(db, title="bench", governorates=[gov], risk_level="red", news_article_id=article_id)
+
+
+def chunked_copy(db, article_id):
+    ids = db.execute(text("SELECT id FROM forum_users WHERE governorate = :g AND is_active"), {"g": gov}).scalars().all()
+    cursor = db.connection().connection.cursor()
+    for start in range(0, len(ids), chunk):
+        rows = io.StringIO("".join(
+            f"{uuid.uuid4()}\t{uid}\tnews_alert\t{article_id}\tbench\tf\n" for uid in ids[start:start + chunk]
+        ))
+        cursor.copy_expert(
+            "COPY notifications (id, user_id, type, news_article_id, message, is_read) FROM STDIN", rows,
+        )
+
+
+def deferred(db, article_id):
+    for name in FOREIGN_KEYS:
+        db.execute(text(f"ALTER TABLE notifications ALTER CONSTRAINT {name} DEFERRABLE INITIALLY DEFERRED"))
+    started = time.perf_counter()
+    fanout(db, article_id)
+    statement = time.perf_counter() - started
+    db.execute(text("SET CONSTRAINTS ALL IMMEDIATE"))   # runs the queued checks, as COMMIT would
+    return statement
+
+
+def floor(db, article_id):
+    db.execute(text("ALTER TABLE notifications DISABLE TRIGGER ALL"))
+    fanout(db, article_id)
+
+
+VARIANTS = [
+    ("INSERT ... SELECT (as shipped)", fanout),
+    (f"COPY in chunks of {chunk}",     chunked_copy),
+    ("FK checks deferred to commit",   deferred),
+    ("no FK checks / triggers (floor)", floor),
+]
+
+with engine.begin() as conn:
+    conn.execute(text(
+        "INSERT INTO forum_users (id, username, email, hashed_password, governorate, is_active) "
+        "SELECT gen_random_uuid(), :tag || '_' || i, :tag || '_' || i || '@example.invalid', '-', :gov, true "
+        "FROM generate_series(1, :n) AS i"
+    ), {"tag": f"fanout_{tag}", "gov": gov, "n": users})
+    article_id = conn.execute(text(
+        "INSERT INTO news_articles (id, title, source_name, source_url) "
+        "VALUES (gen_random_uuid(), 'bench', 'bench', :url) RETURNING id"
+    ), {"url": f"https://example.invalid/{tag}"}).scalar()
+    conn.execute(text("ANALYZE forum_users"))
+
+db = SessionLocal()
+partitions.ensure_partitions(db, "notifications")
+db.commit()
+try:
+    print(f"{users} recipients, {repeats} runs each (median / min)")
+    for label, variant in VARIANTS:
+        times, statements = [], []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            statement = variant(db, article_id)
+            times.append(time.perf_counter() - started)
+            if statement is not None:
+                statements.append(statement)
+            db.rollback()
+        line = f"  {label:34} {statistics.median(times):.3f}s / {min(times):.3f}s"
+        if statements:
+            line += f"   (statement alone {statistics.median(statements):.3f}s)"
+        print(line)
+finally:
+    db.rollback()
+    db.close()
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM news_articles WHERE id = :id"), {"id": article_id})
+        conn.execute(text("DELETE FROM forum_users WHERE governorate = :g"), {"g": gov})
@@ -0,0 +1,85 @@
+"""
+Load-test the hot read endpoints of a running API: C concurrent clients loop
+over the paths for D seconds; prints requests/sec, p50 / p99 latency and
+errors per path. Run it against a build before and after a change (same
+database, same worker count) to compare.
+
+Requests carry a dummy bearer token by default so the anonymous response
+cache (main.py) is bypassed and every request reaches the database; pass
+--cached to measure the cache instead, --token for a real user's token.
+
+Usage: python -m scripts.bench_reads [--url http://localhost:8000] [--clients 500]
+                                     [--seconds 30] [--token JWT] [--cached] [path ...]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import defaultdict
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/forum/posts",
+    "/api/forum/posts?sort=hot",
+    "/api/news/",
+    "/api/news/relevant",
+    "/api/news/alerts",
+    "/api/news/by-region/Tunis",
+]
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--url", default="http://localhost:8000")
+parser.add_argument("--clients", type=int, default=500)
+parser.add_argument("--seconds", type=float, default=30)
+parser.add_argument("--token", default="bench")
+parser.add_argument("--cached", action="store_true")
+parser.add_argument("paths", nargs="*", default=DEFAULT_PATHS)
+args = parser.parse_args()
+
+latencies = defaultdict(list)
+errors    = defaultdict(int)
+
+
+async def client(http: httpx.AsyncClient, offset: int, deadline: float):
+    i = offset
+    while time.perf_counter() < deadline:
+        path = args.paths[i % len(args.paths)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            r = await http.get(path)
+            ok = r.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            latencies[path].append(time.perf_counter() - started)
+        else:
+            errors[path] += 1
+
+
+def pct(values, p):
+    return sorted(values)[min(len(values) - 1, int(len(values) * p))] * 1000 if values else 0.0
+
+
+async def main():
+    headers = {} if args.cached else {"Authorization": f"Bearer {args.token}"}
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    async with httpx.AsyncClient(base_url=args.url, headers=headers, limits=limits, timeout=60) as http:
+        deadline = time.perf_counter() + args.seconds
+        await asyncio.gather(*(client(http, n, deadline) for n in range(args.clients)))
+
+    every = [v for values in latencies.values() for v in values]
+    print(f"{args.clients} clients, {args.seconds:.0f}s against {args.url}")
+    print(f"{'path':32} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for path in args.paths:
+        values = latencies[path]
+        print(f"{path:32} {len(values) / args.seconds:8.1f} {pct(values, .5):8.1f} "
+              f"{pct(values, .99):8.1f} {errors[path]:7}")
+    print(f"{'total':32} {len(every) / args.seconds:8.1f} {pct(every, .5):8.1f} "
+          f"{pct(every, .99):8.1f} {sum(errors.values()):7}")
+    if every:
+        print(f"mean {statistics.mean(every) * 1000:.1f} ms")
+
+
+asyncio.run(main())
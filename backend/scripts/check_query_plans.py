@@ -0,0 +1,221 @@
+"""
+Plan regression check for the hot forum / news queries: seeds synthetic rows,
+ANALYZEs, and asserts via EXPLAIN that each query is answered from the index
+it was built for (alembic 004–014). Everything runs in one transaction that
+is rolled back, seed rows and statistics included, but it does take locks:
+point it at a dev or CI database, not production.
+
+Exits 1 if any query stopped using its index. tests/test_query_plans.py runs
+the same checks under pytest.
+
+Usage: python -m scripts.check_query_plans [--scale 1.0] [--verbose]
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import text
+
+from app.database import engine
+from app.forum.partitions import create_partition_sql, is_partitioned, month_start
+
+GOVERNORATES = ["Tunis", "Ariana", "Ben Arous", "Manouba", "Nabeul", "Zaghouan", "Bizerte", "Béja",
+                "Jendouba", "Le Kef", "Siliana", "Sousse", "Monastir", "Mahdia", "Sfax", "Kairouan",
+                "Kasserine", "Sidi Bouzid", "Gabès", "Médenine", "Tataouine", "Gafsa", "Tozeur", "Kébili"]
+CATEGORIES = ["alert", "weather", "infrastructure", "help", "info"]
+
+
+ROW_COUNTS = dict(users=2000, posts=20000, comments=50000, likes=50000, shares=5000,
+                  notifications=50000, messages=20000, articles=5000)
+
+
+def row_counts(scale: float) -> SimpleNamespace:
+    return SimpleNamespace(**{k: max(1, int(v * scale)) for k, v in ROW_COUNTS.items()})
+
+
+# Deterministic ids: md5('<kind><i>')::uuid, so queries can name one row. User 42
+# owns every 10th post / comment / like / share / notification: the checks run as
+# that heavy user, where a small bitmap scan + sort is no longer the cheaper plan.
+HEAVY = "CASE WHEN i % 10 = 0 THEN 42 ELSE {} END"
+
+
+def seed_statements(scale: float = 1.0) -> list:
+    """The INSERTs that fill every table in TABLES; `scale` multiplies the row counts."""
+    c = row_counts(scale)
+    return [
+        f"""INSERT INTO forum_users (id, username, email, hashed_password, governorate, created_at)
+            SELECT md5('plan-u' || i)::uuid, 'plancheck_' || i, 'plancheck_' || i || '@example.invalid', '!',
+                   (:govs)[1 + i % {len(GOVERNORATES)}], now()
+            FROM generate_series(1, {c.users}) i""",
+        f"""INSERT INTO forum_posts (id, author_id, title, body, category, governorate, is_published, is_deleted,
+                                     likes_count, comments_count, shares_count, created_at)
+            SELECT md5('plan-p' || i)::uuid, md5('plan-u' || ({HEAVY.format(f"1 + i % {c.users}")}))::uuid, 'title ' || i, 'body',
+                   (:cats)[1 + i % {len(CATEGORIES)}], (:govs)[1 + i % {len(GOVERNORATES)}],
+                   i % 10 <> 0, i % 50 = 0, i % 7, i % 5, i % 3, now() - i * interval '1 minute'
+            FROM generate_series(1, {c.posts}) i""",
+        f"""INSERT INTO forum_comments (id, post_id, author_id, body, is_deleted, created_at)
+            SELECT md5('plan-c' || i)::uuid, md5('plan-p' || (1 + i % {c.posts}))::uuid,
+                   md5('plan-u' || ({HEAVY.format(f"1 + (i * 7) % {c.users}")}))::uuid, 'comment', i % 20 = 0, now() - i * interval '1 minute'
+            FROM generate_series(1, {c.comments}) i""",
+        f"""INSERT INTO post_likes (post_id, user_id, created_at)
+            SELECT DISTINCT ON (p, u) md5('plan-p' || p)::uuid, md5('plan-u' || u)::uuid, now() - i * interval '1 minute'
+            FROM (SELECT i, 1 + i % {c.posts} AS p, {HEAVY.format(f"1 + (i * 13) % {c.users}")} AS u
+                  FROM generate_series(1, {c.likes}) i) s""",
+        f"""INSERT INTO post_shares (id, post_id, user_id, created_at)
+            SELECT md5('plan-s' || i)::uuid, md5('plan-p' || (1 + i % {c.posts}))::uuid,
+                   md5('plan-u' || ({HEAVY.format(f"1 + (i * 17) % {c.users}")}))::uuid, now() - i * interval '1 minute'
+            FROM generate_series(1, {c.shares}) i""",
+        f"""INSERT INTO notifications (id, user_id, type, message, is_read, created_at)
+            SELECT md5('plan-n' || i)::uuid, md5('plan-u' || ({HEAVY.format(f"1 + i % {c.users}")}))::uuid, 'like', 'liked your post',
+                   i % 4 <> 0, now() - i * interval '1 minute'
+            FROM generate_series(1, {c.notifications}) i""",
+        f"""INSERT INTO messages (id, sender_id, receiver_id, body, is_read, created_at)
+            SELECT md5('plan-m' || i)::uuid, md5('plan-u' || (1 + i % {c.users}))::uuid,
+                   md5('plan-u' || (1 + (i * 31) % {c.users}))::uuid, 'hello', i % 3 = 0, now() - i * interval '1 minute'
+            FROM generate_series(1, {c.messages}) i""",
+        f"""INSERT INTO news_articles (id, source_name, source_url, title, body, category, governorates, risk_level,
+                                       published_at, scraped_at)
+            SELECT md5('plan-a' || i)::uuid, 'plancheck', 'https://plancheck.invalid/' || i, 'article ' || i, 'body',
+                   'meteo', ARRAY[(:govs)[1 + i % {len(GOVERNORATES)}], (:govs)[1 + (i * 5) % {len(GOVERNORATES)}]]::varchar[],
+                   'green', now() - i * interval '1 hour', now() - i * interval '1 hour'
+            FROM generate_series(1, {c.articles}) i""",
+    ]
+
+
+TABLES = ["forum_users", "forum_posts", "forum_comments", "post_likes", "post_shares",
+          "notifications", "messages", "news_articles"]
+
+# The heavy user and a post (see the seed)
+USER = "md5('plan-u42')::uuid"
+POST = "md5('plan-p42')::uuid"
+LIVE = "is_published = true AND is_deleted = false"
+
+
+def checks(scale: float = 1.0) -> dict:
+    """name -> (acceptable indexes, query as the app issues it), for rows seeded at `scale`."""
+    # One of the heavy user's conversations (see the messages seed)
+    other = f"md5('plan-u{1 + (41 * 31) % row_counts(scale).users}')::uuid"
+    return {
+        "feed: new": (
+            {"ix_forum_posts_feed_new"},
+            f"SELECT * FROM forum_posts WHERE {LIVE} ORDER BY created_at DESC, id LIMIT 20"),
+        "feed: new, by governorate": (
+            {"ix_forum_posts_feed_governorate"},
+            f"SELECT * FROM forum_posts WHERE {LIVE} AND governorate = 'Sfax' ORDER BY created_at DESC, id LIMIT 20"),
+        # Five categories: walking the feed index and filtering finds a page quickly
+        "feed: new, by category": (
+            {"ix_forum_posts_feed_new"},
+            f"SELECT * FROM forum_posts WHERE {LIVE} AND category = 'alert' ORDER BY created_at DESC, id LIMIT 20"),
+        "feed: hot": (
+            {"ix_forum_posts_hot"},
+            f"SELECT * FROM forum_posts WHERE {LIVE} ORDER BY hot_score DESC, id LIMIT 20"),
+        "post: comment thread": (
+            {"ix_forum_comments_post_created"},
+            f"SELECT * FROM forum_comments WHERE post_id = {POST} AND is_deleted = false ORDER BY created_at"),
+        # A prolific author's posts are also found quickly by filtering the feed index
+        "activity: posts": (
+            {"ix_forum_posts_author_created", "ix_forum_posts_author_id", "ix_forum_posts_feed_new"},
+            f"SELECT id, created_at FROM forum_posts WHERE author_id = {USER} AND {LIVE} "
+            f"ORDER BY created_at DESC, id DESC LIMIT 20"),
+        "activity: comments": (
+            {"ix_forum_comments_author_created"},
+            f"SELECT id, created_at FROM forum_comments WHERE author_id = {USER} AND is_deleted = false "
+            f"ORDER BY created_at DESC, id DESC LIMIT 20"),
+        "activity: likes": (
+            {"ix_post_likes_user_created"},
+            f"SELECT post_id, created_at FROM post_likes WHERE user_id = {USER} ORDER BY created_at DESC, post_id DESC LIMIT 20"),
+        "activity: shares": (
+            {"ix_post_shares_user_created"},
+            f"SELECT post_id, created_at FROM post_shares WHERE user_id = {USER} ORDER BY created_at DESC, post_id DESC LIMIT 20"),
+        "notifications: all": (
+            {"ix_notifications_user_created"},
+            f"SELECT * FROM notifications WHERE user_id = {USER} ORDER BY created_at DESC LIMIT 50"),
+        "notifications: unread": (
+            {"ix_notifications_user_unread"},
+            f"SELECT * FROM notifications WHERE user_id = {USER} AND is_read = false ORDER BY created_at DESC LIMIT 50"),
+        "notifications: unread count": (
+            {"ix_notifications_user_unread"},
+            f"SELECT count(*) FROM notifications WHERE user_id = {USER} AND is_read = false"),
+        "messages: conversation": (
+            {"ix_messages_conversation"},
+            f"SELECT * FROM messages WHERE (sender_id = {USER} AND receiver_id = {other}) "
+            f"OR (sender_id = {other} AND receiver_id = {USER}) ORDER BY created_at"),
+        "news: latest": (
+            {"ix_news_articles_published_at"},
+            "SELECT * FROM news_articles ORDER BY published_at DESC LIMIT 50"),
+        "news: by region": (
+            {"ix_news_articles_governorates", "ix_news_articles_published_at"},
+            "SELECT * FROM news_articles WHERE governorates @> ARRAY['Sfax']::varchar[] ORDER BY published_at DESC LIMIT 30"),
+        "users: governorate fan-out": (
+            {"ix_forum_users_governorate"},
+            "SELECT id FROM forum_users WHERE governorate IN ('Sfax', 'Gabès') AND is_active = true"),
+    }
+
+
+def index_names(node: dict) -> set:
+    names = {node["Index Name"]} if "Index Name" in node else set()
+    for child in node.get("Plans", ()):
+        names |= index_names(child)
+    return names
+
+
+def parent_indexes(conn, names: set) -> set:
+    """Partition indexes reported under the partitioned-table index they belong to."""
+    if not names:
+        return names
+    return set(conn.execute(text(
+        "SELECT coalesce(p.relname, c.relname) FROM pg_class c "
+        "LEFT JOIN pg_inherits i ON i.inhrelid = c.oid LEFT JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE c.relname = ANY(:names)"
+    ), {"names": list(names)}).scalars())
+
+
+def seed(conn, scale: float = 1.0):
+    """Fill and ANALYZE the tables inside the caller's transaction (roll it back afterwards)."""
+    if is_partitioned(conn, "notifications"):
+        # The seed reaches back ~5 weeks, into months a fresh database has no partition for
+        this_month = month_start(datetime.now(timezone.utc).date())
+        for offset in (-2, -1, 0):
+            conn.execute(text(create_partition_sql("notifications", month_start(this_month, offset))))
+    for statement in seed_statements(scale):
+        conn.execute(text(statement), {"govs": GOVERNORATES, "cats": CATEGORIES})
+    for table in TABLES:
+        conn.execute(text(f"ANALYZE {table}"))
+
+
+def indexes_used(conn, query: str) -> set:
+    plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {query}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return parent_indexes(conn, index_names(plan[0]["Plan"]))
+
+
+def main(scale: float = 1.0, verbose: bool = False) -> int:
+    failures = 0
+    plans = checks(scale)
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            seed(conn, scale)
+            for name, (expected, query) in plans.items():
+                used = indexes_used(conn, query)
+                ok = bool(used & expected)
+                failures += not ok
+                print(f"{'ok  ' if ok else 'FAIL'}  {name:<30} {', '.join(sorted(used)) or 'no index (seq scan)'}")
+                if verbose or not ok:
+                    for line in conn.execute(text(f"EXPLAIN {query}")).scalars():
+                        print(f"        {line}")
+        finally:
+            trans.rollback()
+    print(f"\n{len(plans) - failures}/{len(plans)} queries use their index")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier on the seed row counts")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+    sys.exit(main(args.scale, args.verbose))
@@ -0,0 +1,42 @@
+"""
+Generate resized variants for image attachments uploaded before the image
+pool existed (post_media.variants IS NULL) and record them.
+
+Usage: python -m scripts.generate_media_variants [workers]
+"""
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from app.database import SessionLocal
+from app.forum import imaging, media
+from app.forum.models import PostMedia
+
+workers = int(sys.argv[1]) if len(sys.argv) > 1 else media.IMAGE_WORKERS
+
+db = SessionLocal()
+try:
+    pending = [
+        (m.id, media.local_path(m.file_url))
+        for m in db.query(PostMedia).filter(PostMedia.file_type == "image", PostMedia.variants.is_(None))
+    ]
+    pending = [(media_id, path) for media_id, path in pending if path]
+    print(f"{len(pending)} images without variants")
+
+    done = skipped = 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        results = pool.map(imaging.generate, [p for _, p in pending], [media.UPLOAD_DIR] * len(pending))
+        for (media_id, _), manifest in zip(pending, results):
+            if not manifest:
+                skipped += 1
+                continue
+            db.query(PostMedia).filter(PostMedia.id == media_id).update(
+                {PostMedia.variants: media.variant_urls(manifest)}, synchronize_session=False,
+            )
+            done += 1
+            if done % 100 == 0:
+                db.commit()
+    db.commit()
+    print(f"{done} recorded, {skipped} skipped (animated or unreadable)")
+finally:
+    db.close()
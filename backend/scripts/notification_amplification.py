@@ -0,0 +1,52 @@
+"""
+Measure notification rows written per event with coalescing and news digests.
+Everything runs in one transaction that is rolled back, so it is safe to point
+at a real database.
+
+Usage: python -m scripts.notification_amplification [likers] [news_users] [articles]
+"""
+import sys
+import uuid
+
+from app.database import SessionLocal
+from app.forum.models import ForumPost, ForumUser, Notification
+from app.forum.notifications import notify_users_about_news, send_notification
+
+likers   = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+readers  = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+articles = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+tag      = uuid.uuid4().hex[:8]
+gov      = f"amplification-{tag}"
+
+
+def user(i):
+    return ForumUser(username=f"amp_{tag}_{i}", email=f"amp_{tag}_{i}@example.invalid",
+                     hashed_password="-", governorate=gov)
+
+
+db = SessionLocal()
+try:
+    author = user("author")
+    people = [user(i) for i in range(max(likers, readers))]
+    db.add_all([author, *people])
+    db.flush()
+    post = ForumPost(author_id=author.id, title="amplification", body="-", category="general")
+    db.add(post)
+    db.flush()
+
+    for p in people[:likers]:
+        send_notification(db, user_id=author.id, type="post_like", actor_id=p.id,
+                          actor_name=p.username, post_id=post.id)
+    like_rows = db.query(Notification).filter_by(user_id=author.id).count()
+    latest = db.query(Notification.message).filter_by(user_id=author.id).scalar()
+    print(f"likes:  {likers} events -> {like_rows} row(s)   e.g. {latest!r}")
+
+    for a in range(articles):
+        notify_users_about_news(db, title=f"Bulletin {a}", governorates=[gov], risk_level="green")
+    news_rows = (db.query(Notification)
+                 .filter(Notification.user_id.in_([p.id for p in people[:readers]]),
+                         Notification.type == "news_update").count())
+    print(f"news:   {articles} articles x {readers} users = {articles * readers} events -> {news_rows} row(s)")
+finally:
+    db.rollback()
+    db.close()
@@ -0,0 +1,29 @@
+"""
+Convert a notifications table created before partitioning into the monthly
+partitioned one (app/forum/partitions.py, same steps as alembic 014). Startup
+does not do this itself: it copies every row and locks notifications until
+it commits, so run it once in a quiet window. Does nothing if the table is
+already partitioned.
+
+Usage: python -m scripts.partition_notifications
+"""
+import time
+
+from sqlalchemy import text
+
+from app.database import engine
+from app.forum import partitions
+
+with engine.begin() as conn:
+    if conn.execute(text("SELECT to_regclass('notifications')")).scalar() is None:
+        raise SystemExit("No notifications table: start the app once to create the schema.")
+    if partitions.is_partitioned(conn, "notifications"):
+        raise SystemExit("notifications is already partitioned.")
+    rows = conn.execute(text("SELECT count(*) FROM notifications")).scalar()
+    print(f"Converting notifications ({rows} rows)...")
+    started = time.perf_counter()
+    partitions.convert_notifications(conn)
+    names = sorted(partitions.partitions(conn, "notifications"))
+
+print(f"Done in {time.perf_counter() - started:.1f}s: {len(names)} partitions ({names[0]} .. {names[-1]}).")
+print("Months past FORUM_NOTIFICATION_RETENTION_MONTHS go at the scheduler's next maintenance run.")
@@ -0,0 +1,54 @@
+"""
+Write .gz (and .br, if the brotli package is installed) next to every
+compressible file under the given directories, so CachedStaticFiles and nginx
+gzip_static can send them without compressing per request. Only rewrites a
+sibling that is older than its source; tiny files are skipped.
+
+Usage: python -m scripts.precompress_static [dir ...]   (default: backend/static)
+"""
+import gzip
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from app.utils.static_files import COMPRESSIBLE
+
+MIN_SIZE = 1024
+
+default = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+roots = sys.argv[1:] or [default]
+encoders = {".gz": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+if brotli is not None:
+    encoders[".br"] = lambda data: brotli.compress(data, quality=11)
+else:
+    print("brotli not installed: writing .gz only")
+
+written = skipped = 0
+for root in roots:
+    for folder, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(folder, name)
+            if os.path.splitext(name)[1] not in COMPRESSIBLE or os.path.getsize(path) < MIN_SIZE:
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            for suffix, encode in encoders.items():
+                target = path + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                    skipped += 1
+                    continue
+                packed = encode(data)
+                if len(packed) >= len(data):
+                    continue
+                tmp = target + ".tmp"
+                with open(tmp, "wb") as f:
+                    f.write(packed)
+                os.replace(tmp, target)
+                written += 1
+                print(f"{target}: {len(data)} -> {len(packed)} bytes")
+
+print(f"{written} written, {skipped} up to date")
@@ -0,0 +1,138 @@
+"""
+Hammer the single-statement toggles from many threads at once and check that
+the stored rows and counters agree afterwards (once the write-behind like
+counters are flushed), and that no statement deadlocked.
+Creates throwaway users, a post with a comment, an article and a news comment,
+and deletes them at the end.
+
+Usage: python -m scripts.toggle_stress [threads] [rounds] [users]
+"""
+import random
+import sys
+import threading
+import time
+import uuid
+
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app.forum import counters, crud
+from app.forum.models import (
+    CommentLike, ForumComment, ForumPost, ForumUser, NewsArticle, NewsComment, NewsCommentLike,
+    NewsReaction, PostLike, UserFollow,
+)
+
+threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+rounds  = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+users   = int(sys.argv[3]) if len(sys.argv) > 3 else 4   # few users = many collisions
+tag     = uuid.uuid4().hex[:8]
+
+db = SessionLocal()
+people = [ForumUser(username=f"stress_{tag}_{i}", email=f"stress_{tag}_{i}@example.invalid",
+                    hashed_password="-") for i in range(users)]
+db.add_all(people)
+db.flush()
+post    = ForumPost(author_id=people[0].id, title="stress", body="-", category="general",
+                    is_published=True)
+article = NewsArticle(title=f"stress {tag}", source_name="stress",
+                      source_url=f"https://example.invalid/{tag}")
+db.add_all([post, article])
+db.flush()
+comment = NewsComment(article_id=article.id, author_id=people[0].id, body="-", ai_approved=True)
+forum_comment = ForumComment(post_id=post.id, author_id=people[0].id, body="-")
+db.add_all([comment, forum_comment])
+db.commit()
+ids      = [p.id for p in people]
+names    = [p.username for p in people]
+post_id, article_id, comment_id, forum_comment_id = post.id, article.id, comment.id, forum_comment.id
+db.close()
+
+errors = []
+
+
+def worker(seed):
+    rnd = random.Random(seed)
+    s = SessionLocal()
+    for _ in range(rounds):
+        me, other = rnd.sample(range(len(ids)), 2)
+        op = rnd.randrange(9)
+        try:
+            # The news helpers commit themselves; the forum ones leave it to the route
+            if op == 0:
+                crud.upsert_reaction(s, article_id, ids[me], rnd.choice(["👍", "🔥"]))
+            elif op == 1:
+                crud.like_comment(s, comment_id, ids[me])
+            elif op == 2:
+                added = crud.like_post(s, post_id, ids[me])[1]
+                s.commit()
+                if added:   # as the route does: bump by what the statement reported
+                    counters.bump("forum_posts", "likes_count", post_id, +1)
+            elif op == 3:
+                removed = crud.unlike_post(s, post_id, ids[me])
+                s.commit()
+                if removed:
+                    counters.bump("forum_posts", "likes_count", post_id, -1)
+            elif op == 4:
+                added = crud.like_forum_comment(s, forum_comment_id, ids[me])[1]
+                s.commit()
+                if added:
+                    counters.bump("forum_comments", "likes_count", forum_comment_id, +1)
+            elif op == 5:
+                removed = crud.unlike_forum_comment(s, forum_comment_id, ids[me])
+                s.commit()
+                if removed:
+                    counters.bump("forum_comments", "likes_count", forum_comment_id, -1)
+            else:
+                toggle = (crud.follow_user, crud.unfollow_user, crud.block_user)[op - 6]
+                toggle(s, ids[me], names[other])
+                s.commit()
+        except Exception as e:
+            errors.append(f"op {op}: {e!r}")
+            s.rollback()
+    s.close()
+
+
+started = time.perf_counter()
+pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+for t in pool:
+    t.start()
+for t in pool:
+    t.join()
+elapsed = time.perf_counter() - started
+counters.flush()
+
+db = SessionLocal()
+try:
+    checks = []
+    for uid in ids:
+        user = db.get(ForumUser, uid)
+        checks.append((f"{user.username} followers", user.followers_count,
+                       db.query(UserFollow).filter_by(following_id=uid).count()))
+        checks.append((f"{user.username} following", user.following_count,
+                       db.query(UserFollow).filter_by(follower_id=uid).count()))
+    checks.append(("post likes", db.get(ForumPost, post_id).likes_count,
+                   db.query(PostLike).filter_by(post_id=post_id).count()))
+    checks.append(("article reactions", db.get(NewsArticle, article_id).likes_count,
+                   db.query(func.count()).select_from(NewsReaction).filter_by(article_id=article_id).scalar()))
+    checks.append(("news comment likes", db.get(NewsComment, comment_id).likes_count,
+                   db.query(NewsCommentLike).filter_by(comment_id=comment_id).count()))
+    checks.append(("forum comment likes", db.get(ForumComment, forum_comment_id).likes_count,
+                   db.query(CommentLike).filter_by(comment_id=forum_comment_id).count()))
+
+    # Users toggling each other lock their rows in id order, so nothing should abort
+    print(f"{threads} threads x {rounds} rounds on {users} users in {elapsed:.1f}s, "
+          f"{len(errors)} statements aborted")
+    for e in errors[:5]:
+        print("  ", e)
+    bad = len(errors)
+    for label, stored, actual in checks:
+        ok = stored == actual
+        bad += not ok
+        print(f"  {'ok  ' if ok else 'DIFF'} {label:32} stored={stored:<5} actual={actual}")
+    print("all counters consistent" if not bad else f"{bad} failures")
+finally:
+    db.query(NewsArticle).filter_by(id=article_id).delete()
+    db.query(ForumPost).filter_by(id=post_id).delete()
+    db.query(ForumUser).filter(ForumUser.id.in_(ids)).delete(synchronize_session=False)
+    db.commit()
+    db.close()
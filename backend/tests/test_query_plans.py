@@ -0,0 +1,33 @@
+"""
+Each hot forum / news query must still be answered from the index built for it.
+Seeds and ANALYZEs the rows of scripts/check_query_plans.py in one transaction,
+checks every query's EXPLAIN, then rolls everything back.
+"""
+import pytest
+
+from conftest import requires_postgres
+from scripts import check_query_plans as plans
+
+pytestmark = requires_postgres
+
+CHECKS = plans.checks()
+
+
+@pytest.fixture(scope="module")
+def seeded(engine):
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            plans.seed(conn)
+            yield conn
+        finally:
+            trans.rollback()
+
+
+@pytest.mark.parametrize("name", list(CHECKS))
+def test_query_uses_its_index(seeded, name):
+    expected, query = CHECKS[name]
+    used = plans.indexes_used(seeded, query)
+    assert used & expected, (
+        f"{name}: {', '.join(sorted(used)) or 'no index (seq scan)'}; expected one of {', '.join(sorted(expected))}"
+    )
@@ -0,0 +1,138 @@
+"""
+Concurrent like / unlike / follow / block toggles must leave every counter equal
+to COUNT(*) of its rows (once the write-behind like counters are flushed) and
+must never abort on a deadlock. scripts/toggle_stress.py is the same check with
+knobs, for longer runs.
+"""
+import random
+import threading
+import uuid
+
+import pytest
+from sqlalchemy import func
+
+from conftest import requires_postgres
+
+pytestmark = requires_postgres
+
+THREADS, ROUNDS, USERS = 12, 60, 4   # few users = many collisions
+
+
+@pytest.fixture
+def stage(engine):
+    from app.database import SessionLocal
+    from app.forum.models import ForumComment, ForumPost, ForumUser, NewsArticle, NewsComment
+
+    tag = uuid.uuid4().hex[:8]
+    db = SessionLocal()
+    people = [ForumUser(username=f"toggle_{tag}_{i}", email=f"toggle_{tag}_{i}@example.invalid",
+                        hashed_password="-") for i in range(USERS)]
+    db.add_all(people)
+    db.flush()
+    post    = ForumPost(author_id=people[0].id, title="toggle", body="-", category="general", is_published=True)
+    article = NewsArticle(title=f"toggle {tag}", source_name="toggle", source_url=f"https://example.invalid/{tag}")
+    db.add_all([post, article])
+    db.flush()
+    comment       = ForumComment(post_id=post.id, author_id=people[0].id, body="-")
+    news_comment  = NewsComment(article_id=article.id, author_id=people[0].id, body="-", ai_approved=True)
+    db.add_all([comment, news_comment])
+    db.commit()
+    ids = dict(users=[p.id for p in people], names=[p.username for p in people], post=post.id,
+               comment=comment.id, article=article.id, news_comment=news_comment.id)
+    try:
+        yield db, ids
+    finally:
+        db.rollback()
+        db.query(NewsArticle).filter_by(id=article.id).delete()
+        db.query(ForumPost).filter_by(id=post.id).delete()
+        db.query(ForumUser).filter(ForumUser.id.in_(ids["users"])).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+def _toggle(s, rnd, ids):
+    """One random toggle, bumping the like counters the way the routes do."""
+    from app.forum import counters, crud
+
+    users, names = ids["users"], ids["names"]
+    me, other = rnd.sample(range(len(users)), 2)
+    op = rnd.randrange(9)
+    if op == 0:
+        crud.upsert_reaction(s, ids["article"], users[me], rnd.choice(["👍", "🔥"]))   # commits and bumps
+    elif op == 1:
+        crud.like_comment(s, ids["news_comment"], users[me])
+    elif op in (2, 3):
+        if op == 2:
+            changed = crud.like_post(s, ids["post"], users[me])[1]
+        else:
+            changed = crud.unlike_post(s, ids["post"], users[me])
+        s.commit()
+        if changed:
+            counters.bump("forum_posts", "likes_count", ids["post"], +1 if op == 2 else -1)
+    elif op in (4, 5):
+        if op == 4:
+            changed = crud.like_forum_comment(s, ids["comment"], users[me])[1]
+        else:
+            changed = crud.unlike_forum_comment(s, ids["comment"], users[me])
+        s.commit()
+        if changed:
+            counters.bump("forum_comments", "likes_count", ids["comment"], +1 if op == 4 else -1)
+    else:
+        (crud.follow_user, crud.unfollow_user, crud.block_user)[op - 6](s, users[me], names[other])
+        s.commit()
+
+
+def test_concurrent_toggles_keep_counters_consistent(stage):
+    from app.database import SessionLocal
+    from app.forum import counters
+    from app.forum.models import (
+        CommentLike, ForumComment, ForumPost, ForumUser, NewsArticle, NewsComment, NewsCommentLike,
+        NewsReaction, PostLike, UserFollow,
+    )
+
+    db, ids = stage
+    errors = []
+    start = threading.Barrier(THREADS)
+
+    def worker(seed):
+        rnd, s = random.Random(seed), SessionLocal()
+        start.wait()
+        try:
+            for _ in range(ROUNDS):
+                try:
+                    _toggle(s, rnd, ids)
+                except Exception as e:
+                    errors.append(repr(e))
+                    s.rollback()
+        finally:
+            s.close()
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    counters.flush()
+
+    # Users toggling each other lock their rows in id order, so nothing should abort
+    assert errors == []
+
+    db.expire_all()   # the fixture loaded these rows before the threads ran
+
+    def count(model, **where):
+        return db.query(func.count()).select_from(model).filter_by(**where).scalar()
+
+    stored, actual = {}, {}
+    for uid, name in zip(ids["users"], ids["names"]):
+        user = db.get(ForumUser, uid)
+        stored[f"{name} followers"], actual[f"{name} followers"] = user.followers_count, count(UserFollow, following_id=uid)
+        stored[f"{name} following"], actual[f"{name} following"] = user.following_count, count(UserFollow, follower_id=uid)
+    stored["post likes"]          = db.get(ForumPost, ids["post"]).likes_count
+    actual["post likes"]          = count(PostLike, post_id=ids["post"])
+    stored["forum comment likes"] = db.get(ForumComment, ids["comment"]).likes_count
+    actual["forum comment likes"] = count(CommentLike, comment_id=ids["comment"])
+    stored["article reactions"]   = db.get(NewsArticle, ids["article"]).likes_count
+    actual["article reactions"]   = count(NewsReaction, article_id=ids["article"])
+    stored["news comment likes"]  = db.get(NewsComment, ids["news_comment"]).likes_count
+    actual["news comment likes"]  = count(NewsCommentLike, comment_id=ids["news_comment"])
+    assert stored == actual
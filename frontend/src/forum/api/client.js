@@ -53,6 +53,7 @@ export const usersAPI = {
 // ── Posts ─────────────────────────────────────────────────────────────
 export const postsAPI = {
   list:    (params)   => api.get("/posts", { params }).then((r) => r.data),
+  trending: ()        => api.get("/posts/trending").then((r) => r.data),
   get:     (id)       => api.get(`/posts/${id}`).then((r) => r.data),
   check:   (data)     => api.post("/posts/check", data).then((r) => r.data),
   create:  (data)     => api.post("/posts", data).then((r) => r.data),
@@ -101,6 +102,18 @@ export const notifsAPI = {
   read:       (id)     => api.post(`/notifications/${id}/read`).then((r) => r.data),
 };
 
+// ── Realtime (server-sent events) ────────────────────────────────────
+// EventSource can't set headers, and a query string ends up in access logs: the
+// stream opens with a short-lived, single-use ticket instead of the access token.
+// A ticket only works once, so reconnect by calling this again, not by the
+// EventSource's own retry. Resolves to null when there is no session.
+export async function openEventStream() {
+  const token = localStorage.getItem("wg_token") || localStorage.getItem("forum_access_token");
+  if (!token || typeof EventSource === "undefined") return null;
+  const { ticket } = await api.post("/events/ticket").then((r) => r.data);
+  return new EventSource(`${BASE}/events?ticket=${encodeURIComponent(ticket)}`);
+}
+
 // ── Messages ─────────────────────────────────────────────────────────
 export const messagesAPI = {
   conversations: ()        => api.get("/messages").then((r) => r.data),
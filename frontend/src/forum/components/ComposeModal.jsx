@@ -45,6 +45,7 @@ export default function ComposeModal({ onClose, onPublished }) {
   const [aiStatus, setAiStatus] = useState(null);
   const [submitting, setSubmitting] = useState(false);
   const [error, setError] = useState(null);
+  const [pending, setPending] = useState(false);   // created, held for moderation
   const [dragOver, setDragOver] = useState(false);
   const fileInputRef = useRef(null);
 
@@ -146,6 +147,12 @@ export default function ComposeModal({ onClose, onPublished }) {
       // Cleanup previews
       mediaFiles.forEach((f) => { if (f.preview) URL.revokeObjectURL(f.preview); });
       onPublished?.(post);
+      // 202: the post waits for moderation, so say so instead of closing as if it were live
+      if (!post.is_published) {
+        setAiStatus(null);
+        setPending(true);
+        return;
+      }
       onClose();
     } catch (e) {
       const detail = e.response?.data?.detail;
@@ -572,6 +579,33 @@ export default function ComposeModal({ onClose, onPublished }) {
             )}
           </div>
 
+          {/* Held for moderation */}
+          {pending && (
+            <div
+              style={{
+                padding: "14px 16px",
+                borderRadius: 12,
+                fontSize: 13,
+                display: "flex",
+                gap: 10,
+                alignItems: "flex-start",
+                background: t.warningBg,
+                border: `1px solid ${t.warningText}40`,
+                marginBottom: 16,
+              }}
+            >
+              <span style={{ fontSize: 18 }}>⏳</span>
+              <div>
+                <div style={{ fontWeight: 600, color: t.warningText, marginBottom: 4 }}>
+                  {__('pendingReview')}
+                </div>
+                <div style={{ color: t.textSecondary, fontSize: 12 }}>
+                  {__('pendingReviewInfo')}
+                </div>
+              </div>
+            </div>
+          )}
+
           {/* AI status */}
           {aiStatus && aiStatus !== "checking" && (
             <div
@@ -662,41 +696,45 @@ export default function ComposeModal({ onClose, onPublished }) {
             onMouseEnter={(e) => { e.target.style.background = t.bgHover; e.target.style.borderColor = t.textMuted; e.target.style.color = t.text; }}
             onMouseLeave={(e) => { e.target.style.background = "transparent"; e.target.style.borderColor = t.border; e.target.style.color = t.textMuted; }}
           >
-            {__('cancel')}
+            {pending ? __('close') : __('cancel')}
           </button>
 
-          <button
-            onClick={check}
-            disabled={aiStatus === "checking" || uploadInProgress}
-            className="compose-btn"
-            style={{
-              border: `1px solid ${t.accent}`,
-              background: "transparent",
-              color: t.accent,
-              opacity: aiStatus === "checking" || uploadInProgress ? 0.5 : 1,
-            }}
-            onMouseEnter={(e) => { if (aiStatus !== "checking" && !uploadInProgress) { e.target.style.background = t.accentBg; e.target.style.transform = "translateY(-1px)"; } }}
-            onMouseLeave={(e) => { if (aiStatus !== "checking" && !uploadInProgress) { e.target.style.background = "transparent"; e.target.style.transform = "translateY(0)"; } }}
-          >
-            🤖 {__('checkWithAI')}
-          </button>
+          {!pending && (
+            <button
+              onClick={check}
+              disabled={aiStatus === "checking" || uploadInProgress}
+              className="compose-btn"
+              style={{
+                border: `1px solid ${t.accent}`,
+                background: "transparent",
+                color: t.accent,
+                opacity: aiStatus === "checking" || uploadInProgress ? 0.5 : 1,
+              }}
+              onMouseEnter={(e) => { if (aiStatus !== "checking" && !uploadInProgress) { e.target.style.background = t.accentBg; e.target.style.transform = "translateY(-1px)"; } }}
+              onMouseLeave={(e) => { if (aiStatus !== "checking" && !uploadInProgress) { e.target.style.background = "transparent"; e.target.style.transform = "translateY(0)"; } }}
+            >
+              🤖 {__('checkWithAI')}
+            </button>
+          )}
 
-          <button
-            onClick={submit}
-            disabled={submitting || !aiStatus || aiStatus === "checking" || !aiStatus.approved || uploadInProgress || hasErrors}
-            className="compose-btn"
-            style={{
-              background: `linear-gradient(135deg, ${t.accent}, ${t.isDark ? '#0f6e56' : '#15803d'})`,
-              color: "white",
-              border: "none",
-              fontWeight: 600,
-              opacity: (submitting || !aiStatus || aiStatus === "checking" || !aiStatus.approved || uploadInProgress || hasErrors) ? 0.5 : 1,
-            }}
-            onMouseEnter={(e) => { if (!submitting && aiStatus && aiStatus !== "checking" && aiStatus.approved && !uploadInProgress) e.target.style.transform = "translateY(-1px)"; }}
-            onMouseLeave={(e) => { if (!submitting && aiStatus && aiStatus !== "checking" && aiStatus.approved && !uploadInProgress) e.target.style.transform = "translateY(0)"; }}
-          >
-            {submitting ? __('publishing') : `📮 ${__('publishFiles')}${uploadedUrls.length > 0 ? ` (${uploadedUrls.length} file${uploadedUrls.length > 1 ? "s" : ""})` : ""}`}
-          </button>
+          {!pending && (
+            <button
+              onClick={submit}
+              disabled={submitting || !aiStatus || aiStatus === "checking" || !aiStatus.approved || uploadInProgress || hasErrors}
+              className="compose-btn"
+              style={{
+                background: `linear-gradient(135deg, ${t.accent}, ${t.isDark ? '#0f6e56' : '#15803d'})`,
+                color: "white",
+                border: "none",
+                fontWeight: 600,
+                opacity: (submitting || !aiStatus || aiStatus === "checking" || !aiStatus.approved || uploadInProgress || hasErrors) ? 0.5 : 1,
+              }}
+              onMouseEnter={(e) => { if (!submitting && aiStatus && aiStatus !== "checking" && aiStatus.approved && !uploadInProgress) e.target.style.transform = "translateY(-1px)"; }}
+              onMouseLeave={(e) => { if (!submitting && aiStatus && aiStatus !== "checking" && aiStatus.approved && !uploadInProgress) e.target.style.transform = "translateY(0)"; }}
+            >
+              {submitting ? __('publishing') : `📮 ${__('publishFiles')}${uploadedUrls.length > 0 ? ` (${uploadedUrls.length} file${uploadedUrls.length > 1 ? "s" : ""})` : ""}`}
+            </button>
+          )}
         </div>
       </div>
     </div>
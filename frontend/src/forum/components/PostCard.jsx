@@ -280,6 +280,31 @@ export default function PostCard({ post: initial, onProfileClick, user }) {
                     />
                   );
                 }
+                // Resized copies (thumb 320px / feed 960px / full 2048px) once the server has made them
+                const variants = item.variants || {};
+                if (variants.feed) {
+                  const origin = fullUrl.slice(0, fullUrl.length - url.length);
+                  const srcSet = (format) => ["thumb", "feed", "full"]
+                    .filter((name) => variants[name])
+                    .map((name) => `${origin}${variants[name][format]} ${variants[name].width}w`)
+                    .join(", ");
+                  const sizes = "(max-width: 680px) 100vw, 640px";
+                  return (
+                    <picture key={i}>
+                      <source type="image/webp" srcSet={srcSet("webp")} sizes={sizes} />
+                      <img
+                        src={`${origin}${variants.feed.jpeg}`}
+                        srcSet={srcSet("jpeg")}
+                        sizes={sizes}
+                        width={variants.feed.width}
+                        height={variants.feed.height}
+                        alt=""
+                        style={{ width: "100%", height: "auto", borderRadius: 8, maxHeight: 360, objectFit: "cover" }}
+                        loading="lazy"
+                      />
+                    </picture>
+                  );
+                }
                 return (
                   <img
                     key={i}
@@ -27,6 +27,7 @@ function ForumInner({ onBack, existingUser, onProfileClick, onMyProfile }) {
     { value: "weather_alert", label: __("weatherAlert"), icon: "⚠️" },
   ];
   const [posts, setPosts] = useState([]);
+  const [pendingPosts, setPendingPosts] = useState([]);   // own posts held for moderation
   const [loading, setLoading] = useState(true);
   const [page, setPage] = useState(1);
   const [totalPages, setTotalPages] = useState(1);
@@ -46,6 +47,7 @@ function ForumInner({ onBack, existingUser, onProfileClick, onMyProfile }) {
       if (governorate) params.governorate = governorate;
       const data = await postsAPI.list(params);
       setPosts(data.items);
+      setPendingPosts((p) => p.filter((q) => !data.items.some((i) => i.id === q.id)));
       setTotalPages(data.pages);
     } catch {
       /* ignore */
@@ -71,6 +73,11 @@ function ForumInner({ onBack, existingUser, onProfileClick, onMyProfile }) {
   };
 
   const handlePublished = (newPost) => {
+    // Not in the public feed until moderation approves it: show it to the author as pending
+    if (!newPost.is_published) {
+      setPendingPosts((p) => [newPost, ...p]);
+      return;
+    }
     setPosts((p) => [newPost, ...p]);
   };
 
@@ -193,6 +200,22 @@ function ForumInner({ onBack, existingUser, onProfileClick, onMyProfile }) {
           </div>
         )}
 
+        {/* Own posts awaiting moderation */}
+        {pendingPosts.length > 0 && (
+          <div style={{ display: "flex", flexDirection: "column", gap: 8, marginBottom: "1rem" }}>
+            {pendingPosts.map((p) => (
+              <div key={p.id} style={{ padding: "12px 16px", background: t.bgCard, borderRadius: 16, border: `1px dashed ${t.warningText}`, display: "flex", alignItems: "center", gap: 12 }}>
+                <span style={{ fontSize: 11, fontWeight: 600, color: t.warningText, background: t.warningBg, padding: "3px 10px", borderRadius: 999, whiteSpace: "nowrap" }}>
+                  ⏳ {__('pendingReview')}
+                </span>
+                <span style={{ fontSize: 14, fontWeight: 600, color: t.text, overflow: "hidden", textOverflow: "ellipsis", whiteSpace: "nowrap" }}>
+                  {p.title}
+                </span>
+              </div>
+            ))}
+          </div>
+        )}
+
         {/* Feed */}
         {loading ? (
           <div style={{ display: "flex", flexDirection: "column", gap: 16 }}>
@@ -1,10 +1,14 @@
 // frontend/src/hooks/useNotifications.js
-// Polls /api/forum/notifications every 30 seconds.
+// Live updates over /api/forum/events; falls back to polling every 30 seconds
+// while the stream is down (and a slow safety poll while it is up).
 
 import { useState, useEffect, useCallback, useRef } from "react";
-import { notifsAPI } from "../forum/api/client";
+import { notifsAPI, openEventStream } from "../forum/api/client";
 
-const POLL_INTERVAL = 30_000; // 30s
+const POLL_INTERVAL = 30_000;        // 30s, stream unavailable
+const STREAM_POLL_INTERVAL = 300_000; // 5min, stream connected
+const RECONNECT_DELAY = 5_000;        // after the stream drops
+const PUSH_EVENTS = ["notification", "news_alert", "news_update"];
 
 export function useNotifications() {
   const [notifications, setNotifications] = useState([]);
@@ -24,13 +28,70 @@ export function useNotifications() {
     }
   }, []);
 
-  // Start polling
+  // Start the stream, poll only as a fallback
   useEffect(() => {
     setLoading(true);
     fetchNotifications().finally(() => setLoading(false));
 
-    intervalRef.current = setInterval(fetchNotifications, POLL_INTERVAL);
-    return () => clearInterval(intervalRef.current);
+    const poll = (every) => {
+      clearInterval(intervalRef.current);
+      intervalRef.current = setInterval(fetchNotifications, every);
+    };
+    poll(POLL_INTERVAL);
+
+    const onPush = (e) => {
+      const data = e.data ? JSON.parse(e.data) : null;
+      // News fan-outs don't carry the row, refetch to pick it up
+      if (!data || !data.id) {
+        fetchNotifications();
+        return;
+      }
+      // Coalesced rows ("X and 3 others…") come back with an id we may already hold
+      setNotifications((prev) => {
+        const existing = prev.find((n) => n.id === data.id);
+        if (!existing || existing.is_read) setUnreadCount((c) => c + 1);
+        return [{ ...data, is_read: false }, ...prev.filter((n) => n.id !== data.id)].slice(0, 30);
+      });
+    };
+
+    // Each connection needs a fresh ticket, so reconnects go through connect()
+    let source = null;
+    let stopped = false;
+    let retry = null;
+    const connect = async () => {
+      let next = null;
+      try {
+        next = await openEventStream();
+      } catch (_) {
+        // ticket request failed: retry below
+      }
+      if (stopped) {
+        if (next) next.close();
+        return;
+      }
+      if (!next) {
+        retry = setTimeout(connect, POLL_INTERVAL);
+        return;
+      }
+      source = next;
+      source.onopen = () => poll(STREAM_POLL_INTERVAL);
+      source.onerror = () => {
+        poll(POLL_INTERVAL);
+        // The browser's own retry would reuse the spent ticket
+        source.close();
+        clearTimeout(retry);
+        retry = setTimeout(connect, RECONNECT_DELAY);
+      };
+      PUSH_EVENTS.forEach((type) => source.addEventListener(type, onPush));
+    };
+    connect();
+
+    return () => {
+      stopped = true;
+      clearInterval(intervalRef.current);
+      clearTimeout(retry);
+      if (source) source.close();
+    };
   }, [fetchNotifications]);
 
   const openPanel = useCallback(() => {
@@ -187,6 +187,8 @@ const arTn = {
   checkWithAI: "تحقق مع الذكاء الاصطناعي",
   publishing: "نشر…",
   publishFiles: "نشر",
+  pendingReview: "في انتظار المراجعة",
+  pendingReviewInfo: "تبعث المنشور للمراجعة. باش يظهر في الصفحة كي يتقبل، وتوصلك إشعار.",
   sending: "إرسال...",
 
   postShared: "تمت المشاركة!",
@@ -202,6 +202,8 @@ const en = {
   checkWithAI: "Check with AI",
   publishing: "Publishing…",
   publishFiles: "Publish",
+  pendingReview: "Pending review",
+  pendingReviewInfo: "Your post was sent for moderation. It will appear in the feed once approved, and you will get a notification.",
   sending: "Sending...",
 
   // PostCard
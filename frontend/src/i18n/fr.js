@@ -187,6 +187,8 @@ const fr = {
   checkWithAI: "Vérifier avec l'IA",
   publishing: "Publication…",
   publishFiles: "Publier",
+  pendingReview: "En attente de validation",
+  pendingReviewInfo: "Votre post a été envoyé en modération. Il apparaîtra dans le fil une fois approuvé, et vous recevrez une notification.",
   sending: "Envoi...",
 
   postShared: "Post partagé !",